@@ -0,0 +1,730 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from utils.async_transport import AsyncTransport
+from utils.batch_poller import AdaptiveInterval, BatchSnapshot, TERMINAL_BATCH_STATUSES
+from utils.html_report import aggregate_tests
+from utils.perf_stats import execution_durations, expected_durations, parse_timestamp
+from utils.readiness import ReadinessGate
+from utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from cli_manager import CLIManager
+
+
+async def _nothing() -> None:
+    """Stands in for an optional call in asyncio.gather()."""
+    return None
+
+
+class AsyncCLIManager:
+    """
+    Async variant of CLIManager.
+
+    Every API call is dispatched through an AsyncTransport, so independent
+    calls awaited together (a poll tick, report inputs, preflight) overlap
+    instead of running back to back. Authentication, sessions and response
+    handling stay in the wrapped CLIManager.
+    """
+
+    def __init__(self, manager: "CLIManager", transport: AsyncTransport | None = None) -> None:
+        self.manager = manager
+        self.transport = transport or AsyncTransport()
+
+    async def get_project_data(self, project_id: str) -> dict[str, int]:
+        return await self.transport.call(self.manager.get_project_data, project_id)
+
+    async def get_project_name(self, project_id: str) -> str:
+        return await self.transport.call(self.manager.get_project_name, project_id)
+
+    async def get_brain_status(self, project_id: str) -> bool:
+        return await self.transport.call(self.manager.get_brain_status, project_id)
+
+    async def get_user_profile(self) -> Dict[str, Any]:
+        return await self.transport.call(self.manager.get_user_profile)
+
+    async def get_user_plan_type(self) -> str:
+        return await self.transport.call(self.manager.get_user_plan_type)
+
+    async def get_test_results(self, project_id: str, payload: list) -> Any:
+        # Not manager.get_test_results: it drives the manager's event loop, which is this one
+        await self.wait_for_brain(project_id)
+        return await self.transport.call(self.manager._post_test_results, project_id, payload)
+
+    async def get_batch_test_reports_list(self, project_id: str, limit: int = 20, offset: int = 0) -> Any:
+        return await self.transport.call(self.manager.get_batch_test_reports_list, project_id, limit, offset)
+
+    async def get_batch_report_details(self, batch_report_id: str) -> Any:
+        return await self.transport.call(self.manager.get_batch_report_details, batch_report_id)
+
+    async def get_batch_executions(self, batch_report_id: str, limit: int = 20, offset: int = 0) -> Any:
+        return await self.transport.call(self.manager.get_batch_executions, batch_report_id, limit, offset)
+
+    async def list_batch_executions(self, batch_report_id: str, normalize: bool = True, spill_screenshots: bool = False) -> List[Dict[str, Any]]:
+        return await self.transport.call(
+            lambda: list(self.manager.iter_batch_executions(batch_report_id, normalize=normalize, spill_screenshots=spill_screenshots))
+        )
+
+    async def delete_batch_report(self, batch_report_id: str) -> Any:
+        return await self.transport.call(self.manager.delete_batch_report, batch_report_id)
+
+    async def get_folders(self, project_id: str) -> List[Dict[str, Any]]:
+        return await self.transport.call(self.manager.get_folders, project_id)
+
+    async def find_folder_name(self, project_id: str, folder_id: str) -> str | None:
+        return await self.transport.call(self.manager.find_folder_name, project_id, folder_id)
+
+    async def wait_for_brain(self, project_id: str) -> None:
+        """
+        Wait until the project's brain is ready.
+
+        Uses jittered exponential backoff up to the manager's ready_timeout and
+        shares a short-lived readiness record with other invocations on the
+        same project (see ReadinessGate).
+        """
+        gate = ReadinessGate(self.manager._metadata_cache, deadline=self.manager.ready_timeout)
+        with tracer.async_span("wait_for_brain", "readiness", project_id=project_id):
+            await gate.wait(
+                f"project:{project_id}:brain-ready",
+                lambda: self.get_brain_status(project_id),
+                description=f"Brain of project {project_id}"
+            )
+
+    async def preflight(
+        self,
+        project_id: str,
+        folder_id: str | None = None,
+        history: bool = False,
+        fingerprints: bool = False,
+        fingerprint_folder_id: str | None = None
+    ) -> Dict[str, Any]:
+        """
+        Wait for the brain while resolving run metadata in parallel.
+
+        Returns:
+            Dictionary with ``folder_name`` (when folder_id is given),
+            ``expected_durations`` (when history is True) and ``fingerprints``
+            of the chats in ``fingerprint_folder_id`` (or the whole project)
+            when fingerprints is True
+        """
+        _, folder_name, expected, chat_fingerprints = await asyncio.gather(
+            self.wait_for_brain(project_id),
+            self.find_folder_name(project_id, folder_id) if folder_id else _nothing(),
+            self.expected_durations(project_id) if history else _nothing(),
+            self.chat_fingerprints(project_id, fingerprint_folder_id) if fingerprints else _nothing()
+        )
+        return {"folder_name": folder_name, "expected_durations": expected, "fingerprints": chat_fingerprints}
+
+    async def chat_fingerprints(self, project_id: str, folder_id: str | None = None) -> Dict[str, str]:
+        """Script fingerprint by chat ID; empty when the chats cannot be listed, so runs do not fail on it."""
+        try:
+            chats = await self.transport.call(self.manager.list_chats, project_id, folder_id)
+        except Exception:
+            return {}
+        return {chat["chat_id"]: chat["fingerprint"] for chat in chats}
+
+    async def report_durations(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Server-side test durations of one finished batch report, cached for good once computed."""
+        batch_report_id = report["batch_report_id"]
+        cache = self.manager._metadata_cache
+        cache_key = f"report:{batch_report_id}:durations"
+        durations = cache.get(cache_key)
+        if durations is None:
+            stored = await self.stored_report(batch_report_id)
+            executions = stored[1] if stored else await self.list_batch_executions(batch_report_id, normalize=False)
+            durations = execution_durations(executions)
+            cache.set(cache_key, durations, self.manager.REPORT_DURATIONS_TTL)
+        return {
+            "batch_report_id": batch_report_id,
+            "timestamp_started": report.get("timestamp_started"),
+            "durations": durations,
+        }
+
+    async def duration_history(self, project_id: str, reports: int = 20) -> List[Dict[str, Any]]:
+        """
+        Test durations of the project's latest finished batch reports, oldest first.
+
+        Reports whose executions cannot be fetched are skipped.
+        """
+        listing = await self.get_batch_test_reports_list(project_id, limit=reports, offset=0)
+        finished = [
+            report for report in listing.get("reports", [])
+            if (report.get("status") or "").lower() in TERMINAL_BATCH_STATUSES
+        ]
+        collected = await asyncio.gather(*(self.report_durations(report) for report in finished), return_exceptions=True)
+        history = [entry for entry in collected if not isinstance(entry, Exception)]
+        history.sort(key=lambda entry: parse_timestamp(entry["timestamp_started"]) or 0.0)
+        return history
+
+    async def expected_durations(self, project_id: str, reports: int = 10) -> Dict[str, float]:
+        """Median duration per chat over recent runs; empty when no history is available."""
+        cache = self.manager._metadata_cache
+        cache_key = f"project:{project_id}:expected-durations:{reports}"
+        expected = cache.get(cache_key)
+        if expected is None:
+            try:
+                expected = expected_durations(await self.duration_history(project_id, reports))
+            except Exception:
+                return {}
+            cache.set(cache_key, expected, self.manager.EXPECTED_DURATIONS_TTL)
+        return expected
+
+    async def batch_origins(self, reports: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        What started each batch (``kind`` "project", "folder" or "chat", and ``folder_id``), by batch report ID.
+
+        Origins come from the results store, which records the batches this
+        CLI triggers, or from a ``folder_id`` on the report itself. Batches of
+        unknown origin are left out.
+        """
+        store = self.manager._results_store
+        origins = await self.transport.call(store.get_batch_origins, [report["batch_report_id"] for report in reports]) if store else {}
+        for report in reports:
+            if report["batch_report_id"] not in origins and report.get("folder_id"):
+                origins[report["batch_report_id"]] = {"kind": "folder", "folder_id": report["folder_id"]}
+        return origins
+
+    async def full_batch_reports(
+        self,
+        project_id: str,
+        count: int,
+        before: float | None = None,
+        single_test: bool = False,
+        page_size: int = 200,
+        max_pages: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        The project's latest ``count`` finished full batches, newest first.
+
+        Full batches are project or folder runs, as opposed to the per-chat
+        batches of single-script, shard, rerun and --changed-only runs. The
+        origin of a batch decides (see batch_origins); a batch of unknown
+        origin counts as full when it ran more than one test, or any number
+        with ``single_test`` (for projects that only have one test). With
+        ``before`` batches completed later are skipped too. The listing is
+        paged until enough batches are found; duplicates from reports added
+        meanwhile are skipped.
+        """
+        selected: Dict[str, Dict[str, Any]] = {}
+        for page in range(max_pages):
+            listing = await self.get_batch_test_reports_list(project_id, limit=page_size, offset=page * page_size)
+            batch_reports = [
+                report for report in listing.get("reports", [])
+                if (report.get("status") or "").lower() in TERMINAL_BATCH_STATUSES
+            ]
+            origins = await self.batch_origins(batch_reports)
+            for report in batch_reports:
+                origin = origins.get(report["batch_report_id"])
+                if origin is not None:
+                    if origin["kind"] == "chat":
+                        continue
+                elif (report.get("total_chats") or 0) <= 1 and not single_test:
+                    continue
+                if before is not None:
+                    completed = parse_timestamp(report.get("timestamp_completed")) or parse_timestamp(report.get("timestamp_started"))
+                    if completed is None or completed > before:
+                        continue
+                selected.setdefault(report["batch_report_id"], report)
+            if len(selected) >= count or len(listing.get("reports", [])) < page_size:
+                break
+        return sorted(
+            selected.values(),
+            key=lambda report: (parse_timestamp(report.get("timestamp_started")) or 0.0, report["batch_report_id"]),
+            reverse=True
+        )[:count]
+
+    async def shard_history(self, project_id: str, before: float, reports: int = 10) -> List[Dict[str, Any]]:
+        """
+        Test durations of the latest full batches completed before ``before``, oldest first.
+
+        Unlike duration_history() this reads neither the expected-durations
+        cache nor per-chat batches, which other shards create while nodes
+        start (see full_batch_reports), so nodes given the same cutoff read
+        the same reports.
+        """
+        latest = await self.full_batch_reports(project_id, reports, before=before)
+        collected = await asyncio.gather(*(self.report_durations(report) for report in latest), return_exceptions=True)
+        history = [entry for entry in collected if not isinstance(entry, Exception)]
+        history.sort(key=lambda entry: (parse_timestamp(entry["timestamp_started"]) or 0.0, entry["batch_report_id"]))
+        return history
+
+    async def chats_preflight(
+        self,
+        project_id: str,
+        folder_id: str | None = None,
+        reports: int = 50,
+        history_before: float | None = None
+    ) -> Dict[str, Any]:
+        """
+        Wait for the brain while listing the chats to run and loading their historical durations.
+
+        With ``history_before`` the durations come from shard_history() (full
+        batches completed before that time), and ``history`` lists the batch
+        report IDs they were taken from.
+
+        Returns:
+            Dictionary with ``chats``, ``expected_durations``, ``history`` and ``folder_name`` (when folder_id is given)
+        """
+        async def durations() -> Tuple[Dict[str, float], List[str] | None]:
+            if history_before is None:
+                return await self.expected_durations(project_id, reports), None
+            history = await self.shard_history(project_id, history_before, reports)
+            return expected_durations(history), [entry["batch_report_id"] for entry in history]
+
+        _, chats, (expected, history), folder_name = await asyncio.gather(
+            self.wait_for_brain(project_id),
+            self.transport.call(self.manager.list_chats, project_id, folder_id),
+            durations(),
+            self.find_folder_name(project_id, folder_id) if folder_id else _nothing()
+        )
+        return {"chats": chats, "expected_durations": expected, "history": history, "folder_name": folder_name}
+
+    async def rerun_preflight(self, project_id: str, batch_report_id: str) -> Tuple[Any, List[Dict[str, Any]], str, Dict[str, Any] | None]:
+        """
+        Wait for the brain while loading the batch to rerun.
+
+        ``batch_report_id`` may be "last" for the project's latest finished
+        project or folder batch; per-chat batches, such as those of an earlier
+        rerun, are skipped (see full_batch_reports).
+
+        Returns:
+            Tuple of (report, raw executions, project name, folder) where
+            folder is ``{"folder_id", "folder_name"}`` for a folder batch
+        """
+        async def load() -> Tuple[Any, List[Dict[str, Any]], str, Dict[str, Any] | None]:
+            report_id = batch_report_id
+            if report_id == "last":
+                finished = await self.full_batch_reports(project_id, 1)
+                if not finished and len(await self.transport.call(self.manager.list_chats, project_id)) <= 1:
+                    # With a single test, project runs cannot be told from per-chat runs by their size
+                    finished = await self.full_batch_reports(project_id, 1, single_test=True)
+                if not finished:
+                    raise RuntimeError(f"No finished project or folder batch report found for project {project_id}")
+                report_id = finished[0]["batch_report_id"]
+            report, executions, project_name = await self.collect_report_inputs(project_id, report_id)
+            origin = (await self.batch_origins([dict(report, batch_report_id=report_id)])).get(report_id)
+            folder = None
+            if origin and origin["kind"] == "folder":
+                folder = {"folder_id": origin["folder_id"], "folder_name": await self.find_folder_name(project_id, origin["folder_id"])}
+            return report, executions, project_name, folder
+
+        _, inputs = await asyncio.gather(self.wait_for_brain(project_id), load())
+        return inputs
+
+    async def start_chats(self, project_id: str, chat_ids: List[str]) -> List[Dict[str, Any]]:
+        """Trigger one single-script batch per chat concurrently; returns one state per chat."""
+        async def start(chat_id: str) -> Dict[str, Any]:
+            state = {"chat_id": chat_id, "batch_report_id": None, "status": "running", "error": None}
+            try:
+                data = await self.transport.call(self.manager.trigger_chat, project_id, chat_id)
+                state["batch_report_id"] = data["batch_report_id"]
+            except Exception as e:
+                state["status"] = "error"
+                state["error"] = str(e)
+            return state
+        return list(await asyncio.gather(*(start(chat_id) for chat_id in chat_ids)))
+
+    async def advance_chats(self, states: List[Dict[str, Any]], snapshot: BatchSnapshot) -> int:
+        """
+        Run one poll tick of every running per-chat batch against one shared snapshot.
+
+        Returns:
+            Number of changed executions
+        """
+        async def advance(state: Dict[str, Any]) -> int:
+            try:
+                batch_report, chunks = await self.poll_tick(state["batch_report_id"])
+            except Exception as e:
+                state["status"] = "error"
+                state["error"] = str(e)
+                return 0
+            _, changes = snapshot.apply(execution for _, chunk in chunks for execution in chunk)
+            if snapshot.is_complete(state["chat_id"]) or (batch_report.get("status") or "").lower() in TERMINAL_BATCH_STATUSES:
+                state["status"] = "done"
+                self.manager.release_batch_pages(state["batch_report_id"])
+            return changes
+
+        with tracer.async_span("poll_tick", "poll", batches=sum(1 for state in states if state["status"] == "running")):
+            changes = await asyncio.gather(*(advance(state) for state in states if state["status"] == "running"))
+        return sum(changes)
+
+    async def list_batch_execution_windows(
+        self,
+        batch_report_id: str,
+        windows: List[Tuple[int, int]] = (),
+        start: int = 0
+    ) -> List[Tuple[int, List[Dict[str, Any]]]]:
+        return await self.transport.call(self.manager.list_batch_execution_windows, batch_report_id, list(windows), start)
+
+    async def poll_tick(
+        self,
+        batch_report_id: str,
+        fetch_executions: bool = True,
+        plan: Tuple[List[Tuple[int, int]], int] = ((), 0)
+    ) -> Tuple[Any, List[Tuple[int, List[Dict[str, Any]]]] | None]:
+        """Fetch the batch report and, optionally, the execution chunks of a fetch plan concurrently."""
+        if not fetch_executions:
+            return await self.get_batch_report_details(batch_report_id), None
+        batch_report, chunks = await asyncio.gather(
+            self.get_batch_report_details(batch_report_id),
+            self.list_batch_execution_windows(batch_report_id, *plan)
+        )
+        return batch_report, chunks
+
+    async def run_targets(
+        self,
+        targets: List[Dict[str, Any]],
+        parallelism: int = 1,
+        on_update: Callable[[List[Dict[str, Any]]], None] | None = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Trigger every target concurrently and poll all of their batches from a single loop.
+        
+        Returns one state dictionary per target holding its batch report ID,
+        BatchSnapshot, final status and any error raised while running it.
+        """
+        states = []
+        for target in targets:
+            label = target["project_id"] + (f"/{target['folder_id']}" if target.get("folder_id") else "")
+            states.append({
+                "target": target,
+                "label": label,
+                "batch_report_id": None,
+                "batch_status": None,
+                "folder_name": None,
+                "status": "waiting",
+                "error": None,
+                "prefetch": True,
+                "snapshot": BatchSnapshot(self.manager._normalize_execution),
+            })
+        
+        # One readiness wait per project, however many targets share it
+        await asyncio.gather(*(self.wait_for_brain(project_id) for project_id in {t["project_id"] for t in targets}))
+        await asyncio.gather(*(self._start_target(state, parallelism) for state in states))
+        if on_update:
+            on_update(states)
+        
+        interval = AdaptiveInterval()
+        while any(state["status"] == "running" for state in states):
+            active = [state for state in states if state["status"] == "running"]
+            changes = await asyncio.gather(*(self._advance_target(state) for state in active))
+            if on_update:
+                on_update(states)
+            if not any(state["status"] == "running" for state in states):
+                break
+            await asyncio.sleep(interval.next(sum(changes) > 0))
+        return states
+
+    async def _start_target(self, state: Dict[str, Any], parallelism: int) -> None:
+        target = state["target"]
+        try:
+            if target.get("folder_id"):
+                data, state["folder_name"] = await asyncio.gather(
+                    self.transport.call(self.manager.trigger_run, target["project_id"], folder_id=target["folder_id"], parallelism=parallelism),
+                    self.find_folder_name(target["project_id"], target["folder_id"])
+                )
+            else:
+                data = await self.transport.call(self.manager.trigger_run, target["project_id"], parallelism=parallelism)
+            state["batch_report_id"] = await self.transport.call(self.manager._resolve_batch_report_id, target["project_id"], data)
+            state["status"] = "running"
+        except Exception as e:
+            state["status"] = "error"
+            state["error"] = str(e)
+
+    async def _advance_target(self, state: Dict[str, Any]) -> int:
+        try:
+            batch_report, changes, finished = await self.advance_batch(state["batch_report_id"], state["snapshot"], prefetch=state["prefetch"])
+        except Exception as e:
+            state["status"] = "error"
+            state["error"] = str(e)
+            return 0
+        state["prefetch"] = changes > 0
+        state["batch_status"] = batch_report.get("status", "").lower() or None
+        if finished:
+            state["status"] = "done"
+        return changes
+
+    async def advance_batch(self, batch_report_id: str, snapshot: BatchSnapshot, prefetch: bool = True) -> Tuple[Any, int, bool]:
+        """
+        Run one poll tick of a batch against its snapshot.
+
+        While the batch is moving (prefetch) the report and execution list are
+        fetched in parallel; otherwise executions are only fetched when the
+        report counters say something changed. Only the ranges of the list
+        that still hold pending executions are requested (see
+        BatchSnapshot.fetch_plan), and the batch's cached responses are
+        released once polling is finished.
+
+        Returns:
+            Tuple of (batch report, number of changed executions, whether polling is finished)
+        """
+        with tracer.async_span("poll_tick", "poll", batch_report_id=batch_report_id, prefetch=prefetch) as span:
+            plan = snapshot.fetch_plan(self.manager._page_size)
+            batch_report, chunks = await self.poll_tick(batch_report_id, fetch_executions=prefetch, plan=plan)
+            batch_status = batch_report.get("status", "").lower()
+            span["batch_status"] = batch_status
+
+            changes = 0
+            finished = batch_status in TERMINAL_BATCH_STATUSES
+            if snapshot.needs_executions(batch_report):
+                if chunks is None:
+                    chunks = await self.list_batch_execution_windows(batch_report_id, *plan)
+                seen, changes = snapshot.apply(execution for _, chunk in chunks for execution in chunk)
+                snapshot.record_positions(chunks)
+                span["executions"] = seen
+                span["changes"] = changes
+                if not snapshot.known_executions:
+                    finished = True
+            snapshot.record_report(batch_report)
+            if finished:
+                self.manager.release_batch_pages(batch_report_id)
+            return batch_report, changes, finished
+
+    async def find_batch_execution(self, batch_report_id: str, chat_id: str) -> Tuple[Dict[str, Any] | None, bool]:
+        return await self.transport.call(self.manager.find_batch_execution, batch_report_id, chat_id)
+
+    async def advance_single(self, batch_report_id: str, snapshot: BatchSnapshot, tracking: Dict[str, Any]) -> Tuple[Any, int, bool]:
+        """
+        Run one poll tick of a single-script batch.
+
+        The batch report and the chat's own execution are fetched in
+        parallel. If the server turns out to ignore the chat filter,
+        ``tracking["fallback"]`` is set and later ticks go back to the
+        counter-driven full listing. The last raw execution seen is kept in
+        ``tracking["execution"]`` so callers can reuse its title.
+
+        Returns:
+            Tuple of (batch report, number of changed executions, whether polling is finished)
+        """
+        if tracking.get("fallback"):
+            batch_report = await self.get_batch_report_details(batch_report_id)
+            executions = None
+            if snapshot.needs_executions(batch_report):
+                executions = await self.list_batch_executions(batch_report_id, normalize=False)
+        else:
+            with tracer.async_span("poll_tick", "poll", batch_report_id=batch_report_id, single=True):
+                batch_report, (execution, started) = await asyncio.gather(
+                    self.get_batch_report_details(batch_report_id),
+                    self.find_batch_execution(batch_report_id, snapshot.chat_id)
+                )
+            if execution is None and started:
+                tracking["fallback"] = True
+                executions = await self.list_batch_executions(batch_report_id, normalize=False)
+            else:
+                executions = [execution] if execution else []
+
+        changes = 0
+        if executions is not None:
+            for execution in executions:
+                if execution.get("chat_id") == snapshot.chat_id:
+                    tracking["execution"] = execution
+            _, changes = snapshot.apply(executions)
+        snapshot.record_report(batch_report)
+        finished = bool(snapshot.completed) or batch_report.get("status", "").lower() in TERMINAL_BATCH_STATUSES
+        if finished:
+            self.manager.release_batch_pages(batch_report_id)
+        return batch_report, changes, finished
+
+    async def sync_project(self, project_id: str, page_size: int = 50, page_workers: int = 4, limit: int | None = None) -> Dict[str, Any]:
+        """
+        Store every batch report started since the project's sync cursor.
+
+        Report list pages are requested newest first, one page at first and
+        then ``page_workers`` at a time, until a page reaches reports older
+        than the cursor. Reports not yet stored complete are then refreshed
+        concurrently: finished ones with all of their executions, running
+        ones without them.
+
+        With ``limit`` only the newest ``limit`` reports are listed. When that
+        stops the listing before it reached the cursor, the cursor is left
+        where it was, so a later sync still covers the older reports.
+
+        Returns:
+            Summary with the number of reports listed, refreshed and completed
+        """
+        store = self.manager._results_store
+        cursor = await self.transport.call(store.get_cursor, project_id)
+        listed: List[Dict[str, Any]] = []
+        offset = 0
+        window = 1
+        reached_end = False
+        truncated = False
+        if limit is not None:
+            page_size = min(page_size, max(1, limit))
+        while not reached_end:
+            if limit is not None:
+                window = max(1, min(window, -(-(limit - len(listed)) // page_size)))
+            pages = await asyncio.gather(*(
+                self.get_batch_test_reports_list(project_id, limit=page_size, offset=offset + i * page_size)
+                for i in range(window)
+            ))
+            offset += window * page_size
+            window = page_workers
+            for page in pages:
+                reports = page.get("reports", [])
+                for report in reports:
+                    started = parse_timestamp(report.get("timestamp_started"))
+                    if cursor is not None and started is not None and started < cursor:
+                        reached_end = True
+                        break
+                    listed.append(report)
+                if reached_end or len(reports) < page_size:
+                    reached_end = True
+                    break
+                if limit is not None and len(listed) >= limit:
+                    del listed[limit:]
+                    reached_end = truncated = True
+                    break
+
+        complete = await self.transport.call(lambda: {r["batch_report_id"] for r in listed if store.is_complete(r["batch_report_id"])})
+        refresh = [report for report in listed if report["batch_report_id"] not in complete]
+        outcomes = await asyncio.gather(*(self._sync_report(project_id, report) for report in refresh), return_exceptions=True)
+
+        # Next time, start from the oldest report that still has to be refreshed
+        unfinished = [
+            parse_timestamp(report.get("timestamp_started"))
+            for report, outcome in zip(refresh, outcomes)
+            if outcome is not True
+        ]
+        unfinished = [started for started in unfinished if started is not None]
+        seen = [started for started in (parse_timestamp(r.get("timestamp_started")) for r in listed) if started is not None]
+        # A truncated listing did not see the reports between the window and the cursor
+        if not truncated:
+            if unfinished:
+                cursor = min(unfinished)
+            elif seen:
+                cursor = max(seen + ([cursor] if cursor is not None else []))
+        await self.transport.call(store.set_cursor, project_id, cursor)
+
+        return {
+            "project_id": project_id,
+            "reports_listed": len(listed),
+            "reports_refreshed": len(refresh),
+            "reports_completed": sum(1 for outcome in outcomes if outcome is True),
+            "reports_stored": await self.transport.call(store.count_reports, project_id),
+            "errors": [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)],
+        }
+
+    async def _sync_report(self, project_id: str, report: Dict[str, Any]) -> bool:
+        """Store one report; returns True when it is now stored complete."""
+        store = self.manager._results_store
+        if (report.get("status") or "").lower() not in TERMINAL_BATCH_STATUSES:
+            await self.transport.call(store.put_report, project_id, report)
+            return False
+        executions = await self.list_batch_executions(report["batch_report_id"], normalize=False, spill_screenshots=True)
+        await self.transport.call(store.put_report, project_id, report, executions)
+        return True
+
+    async def history_inputs(self, project_id: str, reports: int = 30) -> Dict[str, Any]:
+        """
+        The project's latest batch reports, oldest first, with a per-test aggregate of each.
+
+        With the results store the latest ``reports`` reports are synced
+        first and read from the store; only reports without a cached aggregate
+        have their executions aggregated. Without the store everything
+        comes from the API.
+
+        Returns:
+            Dictionary with ``project_name``, ``reports``, ``aggregates`` (in
+            report order), the number of ``cached`` aggregates and ``errors``
+        """
+        store = self.manager._results_store
+        if store is not None:
+            await self.sync_project(project_id, limit=reports)
+            listed, project_name = await asyncio.gather(
+                self.transport.call(store.list_reports, project_id, reports),
+                self.get_project_name(project_id)
+            )
+        else:
+            listing, project_name = await asyncio.gather(
+                self.get_batch_test_reports_list(project_id, limit=reports, offset=0),
+                self.get_project_name(project_id)
+            )
+            listed = listing.get("reports", [])
+        listed.sort(key=lambda report: parse_timestamp(report.get("timestamp_started")) or 0.0)
+
+        outcomes = await asyncio.gather(*(self.report_aggregate(project_id, report) for report in listed), return_exceptions=True)
+        return {
+            "project_name": project_name,
+            "reports": listed,
+            "aggregates": [outcome[0] for outcome in outcomes if not isinstance(outcome, Exception)],
+            "cached": sum(1 for outcome in outcomes if not isinstance(outcome, Exception) and outcome[1]),
+            "errors": [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)],
+        }
+
+    async def report_aggregate(self, project_id: str, report: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Per-test aggregate of one batch report, and whether it was cached in the results store."""
+        batch_report_id = report["batch_report_id"]
+        store = self.manager._results_store
+        if store is not None:
+            cached = await self.transport.call(store.get_aggregate, batch_report_id)
+            if cached is not None:
+                return cached, True
+
+        stored = await self.stored_report(batch_report_id)
+        if stored is not None:
+            executions = stored[1]
+        else:
+            executions = await self.list_batch_executions(batch_report_id, normalize=False, spill_screenshots=True)
+            await self._store_finished(project_id, report, executions)
+        aggregate = aggregate_tests(executions)
+
+        if store is not None and (stored is not None or (report.get("status") or "").lower() in TERMINAL_BATCH_STATUSES):
+            try:
+                await self.transport.call(store.put_aggregate, batch_report_id, aggregate)
+            except Exception:
+                pass
+        return aggregate, False
+
+    async def collect_many_report_inputs(self, batches: List[Tuple[str, str]]) -> List[Any]:
+        """Collect report inputs for several (project_id, batch_report_id) pairs; failures are returned as exceptions."""
+        return await asyncio.gather(
+            *(self.collect_report_inputs(project_id, batch_report_id) for project_id, batch_report_id in batches),
+            return_exceptions=True
+        )
+
+    async def collect_report_inputs(self, project_id: str, batch_report_id: str) -> Tuple[Any, List[Dict[str, Any]], str]:
+        """
+        Fetch everything a batch report needs (details, raw executions, project name) concurrently.
+
+        Screenshots are moved to the screenshot store as executions arrive.
+        """
+        with tracer.async_span("collect_report_inputs", "report", batch_report_id=batch_report_id) as span:
+            stored, project_name = await asyncio.gather(
+                self.stored_report(batch_report_id),
+                self.get_project_name(project_id)
+            )
+            if stored is not None:
+                batch_report, executions = stored
+            else:
+                batch_report, executions = await asyncio.gather(
+                    self.get_batch_report_details(batch_report_id),
+                    self.list_batch_executions(batch_report_id, normalize=False, spill_screenshots=True)
+                )
+                await self._store_finished(project_id, batch_report, executions)
+            span["executions"] = len(executions)
+            span["from_store"] = stored is not None
+        return batch_report, executions, project_name
+
+    async def stored_report(self, batch_report_id: str) -> Tuple[Any, List[Dict[str, Any]]] | None:
+        """A complete report and its executions from the results store, if it has them."""
+        store = self.manager._results_store
+        if store is None:
+            return None
+
+        def load():
+            if not store.is_complete(batch_report_id):
+                return None
+            return store.get_report(batch_report_id), store.list_executions(batch_report_id)
+        return await self.transport.call(load)
+
+    async def _store_finished(self, project_id: str, batch_report: Dict[str, Any], executions: List[Dict[str, Any]]) -> None:
+        """Keep a finished report that was fetched anyway, so later reports and queries skip the API."""
+        store = self.manager._results_store
+        if store is None or (batch_report.get("status") or "").lower() not in TERMINAL_BATCH_STATUSES:
+            return
+        try:
+            await self.transport.call(store.put_report, project_id, batch_report, executions)
+        except Exception:
+            # The store is an optimization; a failed write must not fail the report
+            pass
@@ -0,0 +1,139 @@
+"""
+End-to-end benchmark of CLI commands against the local mock BarkoAgent server.
+
+Every command runs in a fresh interpreter against benchmarks/mock_server.py.
+For each one the suite reports wall time, the number of API requests, the
+bytes the server sent (after compression) and the peak RSS of the process.
+
+Usage:
+    python benchmarks/bench_cli.py --executions 1000 --duration 5
+    python benchmarks/bench_cli.py --executions 50000 --output-size 200 --commands run-all-scripts
+    python benchmarks/bench_cli.py --json results.json
+
+Compare the JSON of two runs to spot regressions.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.mock_server import MockBarkoServer  # noqa: E402
+
+PROJECT_ID = "bench"
+COMPLETED_BATCH_ID = "bench-completed"
+
+
+def scenarios(project_id: str = PROJECT_ID):
+    return {
+        "help": ["--help"],
+        "get-folders": ["get-folders", f"--project-id={project_id}"],
+        "get-project-data": ["get-project-data", f"--project-id={project_id}"],
+        "get-batch-test-reports-list": ["get-batch-test-reports-list", f"--project-id={project_id}"],
+        "get-batch-report-details": ["get-batch-report-details", f"--batch-report-id={COMPLETED_BATCH_ID}"],
+        "get-batch-executions": ["get-batch-executions", f"--batch-report-id={COMPLETED_BATCH_ID}"],
+        "run-single-script": ["run-single-script", f"--project-id={project_id}", f"--chat-id={project_id}-chat-00000", "--junit", "--html"],
+        "run-folder": ["run-folder", f"--project-id={project_id}", "--folder-id=folder-0", "--junit", "--html"],
+        "run-all-scripts": ["run-all-scripts", f"--project-id={project_id}", "--junit", "--html"],
+        "run-many": ["run-many", f"--target={project_id}", f"--target={project_id}-2", "--junit", "--html"],
+    }
+
+
+def run_command(argv, server: MockBarkoServer, cache_dir: Path):
+    """Run ``runner.py argv`` in a scratch directory; return wall time, peak RSS and server stats."""
+    with tempfile.TemporaryDirectory(prefix="barko-bench-") as workdir, tempfile.TemporaryFile() as stderr:
+        env = dict(os.environ, URL=server.url, TOKEN="bench-token", BARKO_CACHE_DIR=str(cache_dir))
+        env.pop("BARKO_NO_CACHE", None)
+        server.reset_stats()
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, str(ROOT / "runner.py"), *argv],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        # wait4 gives the resource usage of exactly this child
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+        stderr.seek(0)
+        error = stderr.read().decode("utf-8", "replace").strip()
+    totals = server.totals()
+    return {
+        "wall_s": round(wall, 3),
+        "requests": totals["requests"],
+        "not_modified": totals["not_modified"],
+        "bytes": totals["bytes"],
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        "exit_code": process.returncode,
+        "error": error.splitlines()[-1] if process.returncode not in (0, 1) and error else None,
+        "endpoints": {name: dict(stat) for name, stat in server.stats.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executions", type=int, default=1000, help="executions per project batch (10 to 50000)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds until a triggered batch completes")
+    parser.add_argument("--output-size", type=int, default=2000, help="characters of output per execution")
+    parser.add_argument("--screenshot-size", type=int, default=0, help="screenshot bytes per failed execution")
+    parser.add_argument("--failure-every", type=int, default=10)
+    parser.add_argument("--folders", type=int, default=4)
+    parser.add_argument("--no-etag", action="store_true", help="disable ETag/304 support on the mock server")
+    parser.add_argument("--no-gzip", action="store_true", help="disable gzip responses on the mock server")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the metadata cache between commands")
+    parser.add_argument("--commands", nargs="*", help="scenarios to run (default: all)")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    all_scenarios = scenarios()
+    selected = args.commands or list(all_scenarios)
+    unknown = [name for name in selected if name not in all_scenarios]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(all_scenarios)})")
+
+    server = MockBarkoServer(
+        executions=args.executions,
+        duration=args.duration,
+        output_size=args.output_size,
+        screenshot_size=args.screenshot_size,
+        failure_every=args.failure_every,
+        folders=args.folders,
+        etag=not args.no_etag,
+        gzip_responses=not args.no_gzip
+    )
+    results = {}
+    with server, tempfile.TemporaryDirectory(prefix="barko-bench-cache-") as shared_cache:
+        server.create_batch(
+            PROJECT_ID,
+            server.chat_ids(PROJECT_ID),
+            started=time.time() - args.duration - 1,
+            batch_report_id=COMPLETED_BATCH_ID
+        )
+        print(f"{'command':<30} {'wall s':>8} {'requests':>9} {'304s':>6} {'KiB sent':>10} {'peak RSS MB':>12}")
+        for name in selected:
+            if args.warm_cache:
+                result = run_command(all_scenarios[name], server, Path(shared_cache))
+            else:
+                with tempfile.TemporaryDirectory(prefix="barko-bench-cache-") as cache_dir:
+                    result = run_command(all_scenarios[name], server, Path(cache_dir))
+            results[name] = result
+            line = (
+                f"{name:<30} {result['wall_s']:>8.2f} {result['requests']:>9} {result['not_modified']:>6} "
+                f"{result['bytes'] / 1024:>10.1f} {result['peak_rss_mb']:>12.1f}"
+            )
+            if result["error"]:
+                line += f"  FAILED: {result['error']}"
+            print(line)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({"config": vars(args), "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Compare the in-process HTML report renderer with the former Node subprocess path.
+
+Usage:
+    python benchmarks/bench_html_report.py --executions 5000 --reports 20
+
+Both renderers are fed the same synthetic batch data. The script reports
+wall time and peak Python memory for each, and checks that both documents
+are equivalent once the generation timestamp is ignored.
+"""
+import argparse
+import base64
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.html_report import write_all_reports_html  # noqa: E402
+from utils.screenshots import ScreenshotStore  # noqa: E402
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "utils" / "report_template.js"
+GENERATED_ON = re.compile(r"<p>Generated on: [^<]*</p>")
+
+
+def _png(seed: int, size: int) -> str:
+    payload = b"\x89PNG\r\n\x1a\n" + (seed % 50).to_bytes(2, "big") * (size // 2)
+    return base64.b64encode(payload).decode("ascii")
+
+
+def make_data(report_count: int, execution_count: int, output_size: int, screenshot_size: int):
+    reports = []
+    executions = []
+    per_report = max(1, execution_count // report_count)
+    for r in range(report_count):
+        batch_report_id = f"batch-{r:05d}"
+        failed = 0
+        for i in range(per_report):
+            status = "failed" if (i + r) % 7 == 0 else "passed"
+            failed += status == "failed"
+            executions.append({
+                "batch_report_id": batch_report_id,
+                "chat_id": f"chat-{i:05d}",
+                "chat_title": f"Test case {i % 500}",
+                "status": status,
+                "output": "x" * output_size,
+                "error_message": f"Step {i % 13} failed: element not found" if status == "failed" else None,
+                "images": [{"b64": _png(i, screenshot_size)}] if status == "failed" and screenshot_size else [],
+            })
+        reports.append({
+            "batch_report_id": batch_report_id,
+            "status": "completed",
+            "total_chats": per_report,
+            "total_passed": per_report - failed,
+            "total_failed": failed,
+            "timestamp_started": f"2024-03-{(r % 28) + 1:02d}T10:{r % 60:02d}:00Z",
+            "timestamp_completed": f"2024-03-{(r % 28) + 1:02d}T11:{r % 60:02d}:00Z",
+        })
+    return reports, executions
+
+
+def render_with_node(reports, executions, project_name, output_path: Path) -> None:
+    """The report generation path used before the Python renderer existed."""
+    report_data = {"reports": reports, "executions": executions, "projectName": project_name}
+    node_script = f'''
+const {{ generateAllReportsHTML }} = require('{TEMPLATE_PATH.as_posix()}');
+const fs = require('fs');
+
+const data = {json.dumps(report_data)};
+const html = generateAllReportsHTML(data.reports, data.executions, data.projectName);
+
+fs.writeFileSync('{output_path.as_posix()}', html, 'utf-8');
+'''
+    script_path = output_path.with_suffix(".js")
+    script_path.write_text(node_script)
+    try:
+        subprocess.run(["node", str(script_path)], check=True, capture_output=True, text=True, timeout=300)
+    finally:
+        script_path.unlink()
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=10)
+    parser.add_argument("--executions", type=int, default=2000)
+    parser.add_argument("--output-size", type=int, default=2000)
+    parser.add_argument("--screenshot-size", type=int, default=20000)
+    parser.add_argument("--spill-screenshots", action="store_true", help="also time the renderer with screenshots moved to disk")
+    args = parser.parse_args()
+
+    reports, executions = make_data(args.reports, args.executions, args.output_size, args.screenshot_size)
+    workdir = Path(tempfile.mkdtemp(prefix="barko-html-bench-"))
+    try:
+        python_path = workdir / "python.html"
+        python_time, python_peak = measure(write_all_reports_html, reports, executions, "Benchmark", python_path)
+        print(f"python renderer: {python_time:8.3f}s  peak {python_peak / 1e6:8.1f} MB  size {python_path.stat().st_size / 1e6:.2f} MB")
+
+        if args.spill_screenshots:
+            spilled_path = workdir / "spilled.html"
+            store = ScreenshotStore(workdir / "screenshots")
+
+            def render_spilled():
+                write_all_reports_html(reports, (store.spill(dict(e)) for e in executions), "Benchmark", spilled_path)
+
+            spilled_time, spilled_peak = measure(render_spilled)
+            print(f"python + spill:  {spilled_time:8.3f}s  peak {spilled_peak / 1e6:8.1f} MB  size {spilled_path.stat().st_size / 1e6:.2f} MB")
+
+        if shutil.which("node") is None:
+            print("node not found, skipping the Node comparison")
+            return 0
+
+        node_path = workdir / "node.html"
+        node_time, node_peak = measure(render_with_node, reports, executions, "Benchmark", node_path)
+        print(f"node subprocess: {node_time:8.3f}s  peak {node_peak / 1e6:8.1f} MB  size {node_path.stat().st_size / 1e6:.2f} MB")
+        print(f"speedup:         {node_time / python_time:8.1f}x")
+
+        python_html = GENERATED_ON.sub("", python_path.read_text(encoding="utf-8"))
+        node_html = GENERATED_ON.sub("", node_path.read_text(encoding="utf-8"))
+        equivalent = python_html == node_html
+        print(f"equivalent output: {equivalent}")
+        return 0 if equivalent else 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Compare the streaming JUnit writer with the former ElementTree + minidom path.
+
+Usage:
+    python benchmarks/bench_junit_xml.py --tests 10000 --output-size 20000
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from xml.dom import minidom
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.junit_xml import write_junit_xml  # noqa: E402
+
+
+def make_results(count: int, output_size: int):
+    chunk = "Step passed\x1b[0m: clicked element\n"
+    output = (chunk * (output_size // len(chunk) + 1))[:output_size]
+    return [
+        {"id": f"chat-{i}", "name": f"Test case {i}", "failed": i % 10 == 0, "time": 1.5, "output": output}
+        for i in range(count)
+    ]
+
+
+def write_with_minidom(output_path: Path, results) -> None:
+    """The JUnit generation path used before the streaming writer existed."""
+    testsuites = ET.Element("testsuites")
+    testsuite = ET.SubElement(testsuites, "testsuite")
+    for result in results:
+        testcase = ET.SubElement(testsuite, "testcase")
+        testcase.set("name", result["name"])
+        testcase.set("time", f"{result['time']:.3f}")
+        sanitized = "".join(char for char in str(result["output"]) if ord(char) >= 32 or char in "\n\r\t")
+        if result["failed"]:
+            failure = ET.SubElement(testcase, "failure")
+            failure.text = sanitized
+        system_out = ET.SubElement(testcase, "system-out")
+        system_out.text = "".join(char for char in str(result["output"]) if ord(char) >= 32 or char in "\n\r\t")
+    rough_string = ET.tostring(testsuites, encoding="unicode")
+    output_path.write_text(minidom.parseString(rough_string).toprettyxml(indent="  "), encoding="utf-8")
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=10000)
+    parser.add_argument("--output-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = make_results(args.tests, args.output_size)
+    with tempfile.TemporaryDirectory(prefix="barko-junit-bench-") as workdir:
+        streaming_time, streaming_peak = measure(
+            lambda: write_junit_xml(Path(workdir) / "streaming.xml", results, project_name="Benchmark")
+        )
+        minidom_time, minidom_peak = measure(write_with_minidom, Path(workdir) / "minidom.xml", results)
+
+    print(f"streaming writer: {streaming_time:8.3f}s  peak {streaming_peak / 1e6:8.1f} MB")
+    print(f"minidom:          {minidom_time:8.3f}s  peak {minidom_peak / 1e6:8.1f} MB")
+    print(f"speedup:          {minidom_time / streaming_time:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Measure cold-start cost of the CLI per command.
+
+Each command's ``--help`` is run in a fresh interpreter with ``-X importtime``;
+the cumulative import time of every top-level module and the process wall time
+are reported, along with the slowest imports.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --commands config run-all-scripts --top 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from runner import COMMANDS  # noqa: E402
+
+
+def run_once(args):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="0")
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", str(ROOT / "runner.py"), *args],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"runner.py {' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+    return wall, parse_importtime(completed.stderr)
+
+
+def parse_importtime(stderr: str):
+    """Return ``{module: cumulative microseconds}`` for top-level imports."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        # Nested imports are indented beyond the single leading space
+        if name.startswith("  "):
+            continue
+        modules[name.strip()] = int(cumulative_us)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--commands", nargs="*", help="commands to measure (default: all)")
+    parser.add_argument("--top", type=int, default=5, help="number of slowest imports to list per command")
+    args = parser.parse_args()
+
+    commands = args.commands or sorted(COMMANDS)
+    cases = [("(top-level)", ["--help"])] + [(name, [name, "--help"]) for name in commands]
+
+    # Warm the bytecode cache so every case measures imports, not compilation
+    run_once(["--help"])
+
+    print(f"{'command':<30} {'wall ms':>9} {'import ms':>10}  slowest imports")
+    for label, argv in cases:
+        walls = []
+        imports = []
+        modules = {}
+        for _ in range(args.repeat):
+            wall, modules = run_once(argv)
+            walls.append(wall * 1000)
+            imports.append(sum(modules.values()) / 1000)
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        summary = ", ".join(f"{name} {us / 1000:.1f}" for name, us in slowest)
+        print(f"{label:<30} {statistics.median(walls):>9.1f} {statistics.median(imports):>10.1f}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Local mock of the BarkoAgent API used by the benchmarks.
+
+Implements every endpoint CLIManager calls and simulates batches of a
+configurable size whose executions complete over a configurable time, with
+synthetic outputs and screenshots. Request counts and response bytes are
+recorded per endpoint so benchmarks can report them.
+
+Usage (standalone, for manual runs against the CLI):
+    python benchmarks/mock_server.py --port 8765 --executions 5000 --duration 10
+    URL=http://127.0.0.1:8765 TOKEN=test python runner.py run-all-scripts --project-id=bench --junit
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class MockBatch:
+    """A batch whose executions finish one after another over ``duration`` seconds."""
+
+    def __init__(
+        self,
+        batch_report_id: str,
+        project_id: str,
+        chat_ids: List[str],
+        duration: float,
+        failure_every: int,
+        output_size: int,
+        screenshot_size: int,
+        started: Optional[float] = None
+    ):
+        self.batch_report_id = batch_report_id
+        self.project_id = project_id
+        self.chat_ids = chat_ids
+        self.duration = duration
+        self.failure_every = failure_every
+        self.output_size = output_size
+        self.screenshot_size = screenshot_size
+        self.started = time.time() if started is None else started
+
+    def completed_at(self, index: int) -> float:
+        return self.started + self.duration * (index + 1) / max(1, len(self.chat_ids))
+
+    def completed_count(self, now: float) -> int:
+        if not self.chat_ids:
+            return 0
+        if now >= self.completed_at(len(self.chat_ids) - 1):
+            return len(self.chat_ids)
+        elapsed = max(0.0, now - self.started)
+        return min(len(self.chat_ids), int(elapsed * len(self.chat_ids) / max(self.duration, 1e-9)))
+
+    def failed(self, index: int) -> bool:
+        return self.failure_every > 0 and index % self.failure_every == 0
+
+    def report(self, now: float) -> Dict[str, Any]:
+        done = self.completed_count(now)
+        # Executions 0, n, 2n ... fail
+        failed = -(-done // self.failure_every) if self.failure_every > 0 else 0
+        finished = done == len(self.chat_ids)
+        return {
+            "batch_report_id": self.batch_report_id,
+            "project_id": self.project_id,
+            "status": "completed" if finished else "running",
+            "total_chats": len(self.chat_ids),
+            "total_passed": done - failed,
+            "total_failed": failed,
+            "timestamp_started": _iso(self.started),
+            "timestamp_completed": _iso(self.completed_at(len(self.chat_ids) - 1)) if finished else None,
+        }
+
+    def execution(self, index: int, now: float, screenshot: Optional[str]) -> Dict[str, Any]:
+        chat_id = self.chat_ids[index]
+        done = index < self.completed_count(now)
+        failed = done and self.failed(index)
+        started_at = self.started + self.duration * index / max(1, len(self.chat_ids))
+        return {
+            "batch_report_id": self.batch_report_id,
+            "chat_id": chat_id,
+            "chat_title": f"Test case {chat_id}",
+            "title": f"Test case {chat_id}",
+            "status": ("failed" if failed else "passed") if done else "running",
+            "output": _output(index, self.output_size) if done else "",
+            "error_message": f"Step {index % 13} failed: element not found" if failed else None,
+            "images": [{"b64": screenshot}] if failed and screenshot else [],
+            "timestamp_started": _iso(started_at),
+            "timestamp_completed": _iso(self.completed_at(index)) if done else None,
+        }
+
+
+def _output(index: int, size: int) -> str:
+    line = f"[{index}] Step passed: clicked element #{index % 97}\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _screenshot(size: int) -> Optional[str]:
+    if not size:
+        return None
+    payload = b"\x89PNG\r\n\x1a\n" + hashlib.sha256(str(size).encode()).digest() * (size // 32 + 1)
+    return base64.b64encode(payload[:size]).decode("ascii")
+
+
+class MockBarkoServer:
+    """
+    Threaded HTTP server implementing the BarkoAgent endpoints used by the CLI.
+
+    Args:
+        executions: Number of chats per project, and so executions per full batch
+        duration: Seconds a batch takes from trigger to the last completed execution
+        output_size: Characters of output per completed execution
+        screenshot_size: Bytes of screenshot attached to each failed execution (0 for none)
+        failure_every: Every n-th execution fails (0 for none)
+        folders: Number of folders per project; chats are spread over them evenly
+        ready_after: Seconds after start-up before brain_status reports ready
+        etag: Answer If-None-Match on batch reports and executions with 304
+        gzip_responses: Compress responses when the client accepts gzip
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        executions: int = 100,
+        duration: float = 5.0,
+        output_size: int = 2000,
+        screenshot_size: int = 0,
+        failure_every: int = 10,
+        folders: int = 4,
+        ready_after: float = 0.0,
+        etag: bool = True,
+        gzip_responses: bool = True
+    ):
+        self.executions = executions
+        self.duration = duration
+        self.output_size = output_size
+        self.screenshot_size = screenshot_size
+        self.failure_every = failure_every
+        self.folders = max(1, folders)
+        self.etag = etag
+        self.gzip_responses = gzip_responses
+        self.ready_at = time.time() + ready_after
+        self.batches: Dict[str, MockBatch] = {}
+        # Bump a chat's version to change its script (its chat entries)
+        self.script_versions: Dict[str, int] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._screenshot = _screenshot(screenshot_size)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockBarkoServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-barko", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockBarkoServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # -- data -------------------------------------------------------------
+
+    def chat_ids(self, project_id: str, folder_id: Optional[str] = None) -> List[str]:
+        ids = [f"{project_id}-chat-{i:05d}" for i in range(self.executions)]
+        if folder_id is None:
+            return ids
+        folder_index = int(folder_id.rsplit("-", 1)[-1]) if folder_id.rsplit("-", 1)[-1].isdigit() else 0
+        return [chat_id for i, chat_id in enumerate(ids) if i % self.folders == folder_index]
+
+    def create_batch(self, project_id: str, chat_ids: List[str], started: Optional[float] = None, batch_report_id: Optional[str] = None) -> MockBatch:
+        batch = MockBatch(
+            batch_report_id or str(uuid.uuid4()),
+            project_id,
+            chat_ids,
+            self.duration,
+            self.failure_every,
+            self.output_size,
+            self.screenshot_size,
+            started=started
+        )
+        with self._lock:
+            self.batches[batch.batch_report_id] = batch
+        return batch
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {}
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": sum(s["requests"] for s in self.stats.values()),
+                "bytes": sum(s["bytes"] for s in self.stats.values()),
+                "not_modified": sum(s["not_modified"] for s in self.stats.values()),
+            }
+
+    def _record(self, endpoint: str, size: int, status: int) -> None:
+        with self._lock:
+            entry = self.stats.setdefault(endpoint, {"requests": 0, "bytes": 0, "not_modified": 0})
+            entry["requests"] += 1
+            entry["bytes"] += size
+            entry["not_modified"] += status == 304
+
+    # -- routing ----------------------------------------------------------
+
+    def route(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[str, int, Any]:
+        """Return (endpoint name, status, JSON body) for a request."""
+        now = time.time()
+        if method == "GET" and path == "/api/chats/brain_status":
+            return "brain_status", 200, {"ready": now >= self.ready_at}
+        if method == "GET" and path == "/api/users/profile":
+            return "profile", 200, {"email": "bench@example.com", "usage": {"plan": {"type": "pro"}}}
+
+        match = re.fullmatch(r"/api/general/get-data/([^/]+)", path)
+        if method == "GET" and match:
+            project_id = match.group(1)
+            chats = [
+                {"chat_id": chat_id, "title": f"Test case {chat_id}", "folder_id": f"folder-{i % self.folders}"}
+                for i, chat_id in enumerate(self.chat_ids(project_id))
+            ]
+            project = {"idx": 0, "project_id": project_id, "name": f"Bench {project_id}"}
+            entries = [
+                {"chat_id": c["chat_id"], "content": f"Open the page, step set v{self.script_versions.get(c['chat_id'], 0)}"}
+                for c in chats
+            ]
+            return "get-data", 200, [[], [project], chats, [], entries]
+
+        match = re.fullmatch(r"/api/folders/([^/]+)", path)
+        if method == "GET" and match:
+            project_id = match.group(1)
+            folders = [{"id": f"folder-{i}", "name": f"Folder {i}", "project_id": project_id} for i in range(self.folders)]
+            return "folders", 200, folders
+
+        match = re.fullmatch(r"/api/chats/run_script/([^/]+)/([^/]+)", path)
+        if method == "POST" and match:
+            batch = self.create_batch(match.group(1), [match.group(2)])
+            return "run_script", 200, {"batch_report_id": batch.batch_report_id, "status": "started"}
+        if method == "POST" and path == "/api/chats/run_script":
+            project_id = query.get("project_id", "")
+            batch = self.create_batch(project_id, self.chat_ids(project_id))
+            return "run_script", 200, {"batch_report_id": batch.batch_report_id, "status": "started"}
+
+        match = re.fullmatch(r"/api/chats/run_folder/([^/]+)/([^/]+)", path)
+        if method == "POST" and match:
+            batch = self.create_batch(match.group(1), self.chat_ids(match.group(1), match.group(2)))
+            return "run_folder", 200, {"batch_report_id": batch.batch_report_id, "status": "started"}
+
+        if method == "POST" and path == "/api/chats/script_results":
+            results = []
+            for item in body or []:
+                chat_id = item.get("chat_id") if isinstance(item, dict) else str(item)
+                results.append({"chat_id": chat_id, "status": "passed", "output": _output(0, self.output_size)})
+            return "script_results", 200, results
+
+        match = re.fullmatch(r"/api/chats/project_reports/([^/]+)", path)
+        if method == "GET" and match:
+            limit = int(query.get("limit", 20))
+            offset = int(query.get("offset", 0))
+            with self._lock:
+                batches = [b for b in self.batches.values() if b.project_id == match.group(1)]
+            batches.sort(key=lambda b: b.started, reverse=True)
+            page = batches[offset:offset + limit]
+            return "project_reports", 200, {"reports": [b.report(now) for b in page], "total": len(batches)}
+
+        match = re.fullmatch(r"/api/chats/batch_report/([^/]+)/executions", path)
+        if method == "GET" and match:
+            batch = self.batches.get(match.group(1))
+            if batch is None:
+                return "executions", 404, {"detail": "Batch report not found"}
+            limit = int(query.get("limit", 20))
+            offset = int(query.get("offset", 0))
+            indexes = range(offset, min(len(batch.chat_ids), offset + limit))
+            executions = [batch.execution(i, now, self._screenshot) for i in indexes]
+            return "executions", 200, {"executions": executions, "total": len(batch.chat_ids)}
+
+        match = re.fullmatch(r"/api/chats/batch_report/([^/]+)", path)
+        if match:
+            batch = self.batches.get(match.group(1))
+            if batch is None:
+                return "batch_report", 404, {"detail": "Batch report not found"}
+            if method == "DELETE":
+                with self._lock:
+                    self.batches.pop(batch.batch_report_id, None)
+                return "delete_batch_report", 200, {"deleted": batch.batch_report_id}
+            if method == "GET":
+                return "batch_report", 200, batch.report(now)
+
+        return "unknown", 404, {"detail": f"No mock for {method} {path}"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _handle(self, method: str) -> None:
+                url = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"null") if length else None
+                endpoint, status, payload = server.route(method, url.path, query, body)
+
+                data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+                etag = f'"{hashlib.md5(data).hexdigest()}"' if server.etag and endpoint in ("batch_report", "executions") else None
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    server._record(endpoint, 0, 304)
+                    return
+
+                encoding = None
+                if server.gzip_responses and "gzip" in self.headers.get("Accept-Encoding", "") and len(data) > 512:
+                    data = gzip.compress(data, compresslevel=5)
+                    encoding = "gzip"
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+                server._record(endpoint, len(data), status)
+
+            def do_GET(self) -> None:
+                self._handle("GET")
+
+            def do_POST(self) -> None:
+                self._handle("POST")
+
+            def do_DELETE(self) -> None:
+                self._handle("DELETE")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--executions", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--output-size", type=int, default=2000)
+    parser.add_argument("--screenshot-size", type=int, default=0)
+    parser.add_argument("--failure-every", type=int, default=10)
+    parser.add_argument("--folders", type=int, default=4)
+    parser.add_argument("--ready-after", type=float, default=0.0)
+    parser.add_argument("--no-etag", action="store_true")
+    parser.add_argument("--no-gzip", action="store_true")
+    args = parser.parse_args()
+
+    server = MockBarkoServer(
+        args.host, args.port, args.executions, args.duration, args.output_size, args.screenshot_size,
+        args.failure_every, args.folders, args.ready_after, etag=not args.no_etag, gzip_responses=not args.no_gzip
+    )
+    print(f"Mock BarkoAgent API listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
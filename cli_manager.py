@@ -1,36 +1,81 @@
-import json
 import os
 from pathlib import Path
 import re
+import sys
 import time
-import subprocess
-from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Set, Tuple, TypeVar
 
 import requests
-import polling2
-import click
 from dotenv import load_dotenv
-from rich.console import Console
 from utils.report_paths import ReportPathManager
-from utils.junit_xml import generate_junit_xml
+from utils.env_config import update_env_file
+from utils.pagination import iter_chunked, iter_pages, iter_paginated, map_bounded
+from utils.batch_poller import AdaptiveInterval, BatchSnapshot
+from utils.etag_cache import ETagCache
+from utils.metadata_cache import MetadataCache, default_cache_dir
+from utils.http_transport import HTTPTransport
+from utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+    from async_cli_manager import AsyncCLIManager
+    from rich.console import Console
+    from utils.results_store import ResultsStore
+    from utils.screenshots import ScreenshotStore
+
+T = TypeVar("T")
 
 
 class CLIManager:
+    # How long metadata fetched from the API stays valid in the persistent cache (seconds)
+    PROJECT_NAME_TTL = 24 * 60 * 60
+    PLAN_TYPE_TTL = 60 * 60
+    FOLDERS_TTL = 10 * 60
+    EXPECTED_DURATIONS_TTL = 60 * 60
+    # Durations of a finished batch never change
+    REPORT_DURATIONS_TTL = 30 * 24 * 60 * 60
+
     def __init__(self, skip_validation: bool = False) -> None:
         load_dotenv('.env')
-        self.requests_session = requests.Session()
         self.__env_path = Path(".env")
         self.__token = os.getenv("TOKEN")
         self.__token_expiry = None
         self._dashboard_mode: bool = False
-        self._console = Console(highlight=False)
+        self.__console: "Console | None" = None
         self._dashboard_lines = 0
+        self._page_size = 200
+        self._page_workers = 4
+        # Calls the async layer keeps in flight; each may fan out into page fetches
+        self._io_concurrency = 8
+        self._etag_cache = ETagCache()
+        # Execution pages each batch poll requested last, to drop the ones it stops requesting
+        self._polled_pages: Dict[str, Set[str]] = {}
+        self._aio: "AsyncCLIManager | None" = None
+        self.__page_pool: "ThreadPoolExecutor | None" = None
+        self.__screenshot_store: "ScreenshotStore | None" = None
+        self.__results_store: "ResultsStore | None" = None
+        self.ready_timeout: float | None = float(os.getenv("BARKO_READY_TIMEOUT", "900"))
+        # The global --format; status messages move to stderr when stdout carries machine-readable output
+        self.output_format = "json"
         endpoint_to_verify = os.getenv("URL")
 
         # Verify the URL is valid and correct (skip for config command)
         if not skip_validation:
             self.__verify_correct_environment(endpoint_to_verify)
         self.__endpoint = endpoint_to_verify
+        self._metadata_cache = self.__create_metadata_cache()
+        pool_size = int(os.getenv("BARKO_HTTP_POOL_SIZE", self._io_concurrency * self._page_workers))
+        self._http = HTTPTransport(self.__endpoint, self.__token, pool_size=pool_size)
+        self.requests_session = self._http.session
+
+    def __create_metadata_cache(self) -> MetadataCache:
+        # The results store is namespaced like the cache and reopened for new credentials
+        self.__results_store = None
+        return MetadataCache(
+            MetadataCache.namespace_for(self.__endpoint, self.__token),
+            enabled=not os.getenv("BARKO_NO_CACHE")
+        )
 
 
     @classmethod
@@ -42,29 +87,15 @@ class CLIManager:
         return reg_ex_result is not None
 
     def configure(self, token: str | None = None, url: str | None = None) -> Dict[str, str]:
-        current: Dict[str, str] = {}
-        if self.__env_path.exists():
-            for line in self.__env_path.read_text().splitlines():
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    current[key.strip()] = value.strip()
-
-        if url is not None:
-            current["URL"] = url
-        if token is not None:
-            current["TOKEN"] = token
-
-        lines = [f"URL={current.get('URL', '')}", f"TOKEN={current.get('TOKEN', '')}"]
-        self.__env_path.write_text("\n".join(lines))
+        current = update_env_file(self.__env_path, token=token, url=url)
         self.__endpoint = current.get("URL")
         self.__token = current.get("TOKEN")
+        self._metadata_cache = self.__create_metadata_cache()
+        self._http.set_base_url(self.__endpoint)
+        self._http.set_token(self.__token)
         return current
     def get_project_data(self, project_id: str) -> dict[str, int]:
-        headers = {
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-        res = self.requests_session.get(f'{self.__endpoint}/api/general/get-data/{project_id}', headers=headers, timeout=10)
+        res = self._http.get(f'/api/general/get-data/{project_id}')
         res.raise_for_status()
         raw_data = res.json()
         # Clean out the data for output
@@ -82,77 +113,166 @@ class CLIManager:
         return formatted_data
 
     def get_brain_status(self, project_id: str) -> bool:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-
-        res = self.requests_session.get(f'{self.__endpoint}/api/chats/brain_status?project_id={project_id}', headers=headers, timeout=10)
+        res = self._http.get('/api/chats/brain_status', 'status', params={"project_id": project_id})
         res.raise_for_status()
         brain_state = res.json()
         return bool(brain_state['ready'])
 
     def get_user_profile(self) -> Dict[str, Any]:
-        headers = {
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-        res = self.requests_session.get(f'{self.__endpoint}/api/users/profile', headers=headers, timeout=10)
+        res = self._http.get('/api/users/profile')
         res.raise_for_status()
         return res.json()
 
     def get_user_plan_type(self) -> str:
+        cached = self._metadata_cache.get("user:plan-type")
+        if cached is not None:
+            return cached
         try:
             profile = self.get_user_profile()
-            return profile.get('usage', {}).get('plan', {}).get('type', 'free')
+            plan_type = profile.get('usage', {}).get('plan', {}).get('type', 'free')
         except Exception:
             return 'free'
+        self._metadata_cache.set("user:plan-type", plan_type, self.PLAN_TYPE_TTL)
+        return plan_type
+
+    @property
+    def aio(self) -> "AsyncCLIManager":
+        """Async variant of this manager sharing its session and credentials."""
+        if self._aio is None:
+            from async_cli_manager import AsyncCLIManager
+            from utils.async_transport import AsyncTransport
+            self._aio = AsyncCLIManager(self, AsyncTransport(max_concurrency=self._io_concurrency))
+        return self._aio
+
+    def _run(self, coro: Awaitable[T]) -> T:
+        return self.aio.transport.run(coro)
+
+    @property
+    def _page_pool(self) -> "ThreadPoolExecutor":
+        """Pool the concurrent page fetches run on, shared by every poll of this manager."""
+        if self.__page_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            # Every call of the async layer may be fetching pages at once
+            self.__page_pool = ThreadPoolExecutor(max_workers=self._io_concurrency * self._page_workers, thread_name_prefix="barko-pages")
+        return self.__page_pool
+
+    def close(self) -> None:
+        """Shut down the event loop and thread pools kept for the life of the command, and the HTTP session."""
+        if self._aio is not None:
+            self._aio.transport.close()
+            self._aio = None
+        if self.__page_pool is not None:
+            self.__page_pool.shutdown(wait=False, cancel_futures=True)
+            self.__page_pool = None
+        self._http.close()
+
+    @property
+    def _console(self) -> "Console":
+        """Console of the progress output, on stderr when stdout carries machine-readable output (like _notice)."""
+        stderr = self.output_format != "json"
+        if self.__console is None or self.__console.stderr != stderr:
+            from rich.console import Console
+            self.__console = Console(highlight=False, stderr=stderr)
+        return self.__console
+
+    @property
+    def _screenshot_store(self) -> "ScreenshotStore":
+        if self.__screenshot_store is None:
+            from utils.screenshots import ScreenshotStore
+            # Absolute paths keep references valid for reports rendered later from the results store
+            self.__screenshot_store = ScreenshotStore(ReportPathManager().get_screenshot_dir().resolve())
+        return self.__screenshot_store
+
+    @property
+    def _results_store(self) -> "ResultsStore | None":
+        """Local store of synced batch reports for this account, or None when caching is disabled."""
+        if os.getenv("BARKO_NO_CACHE"):
+            return None
+        if self.__results_store is None:
+            from utils.results_store import ResultsStore
+            namespace = MetadataCache.namespace_for(self.__endpoint, self.__token)
+            self.__results_store = ResultsStore(default_cache_dir() / "results" / f"{namespace}.sqlite3")
+        return self.__results_store
+
+    def _require_store(self) -> "ResultsStore":
+        if self._results_store is None:
+            raise RuntimeError("The results store is disabled (BARKO_NO_CACHE is set)")
+        return self._results_store
+
+    def sync_results(self, project_id: str) -> Dict[str, Any]:
+        """
+        Bring the local results store up to date with the project's batch reports.
+
+        Only reports started since the last sync cursor are listed, and only
+        reports not yet stored complete have their executions fetched.
+        """
+        self._require_store()
+        return self._run(self.aio.sync_project(project_id))
+
+    def get_stored_reports(self, project_id: str, limit: int | None = 20, offset: int = 0) -> Dict[str, Any]:
+        store = self._require_store()
+        return {"reports": store.list_reports(project_id, limit, offset), "total": store.count_reports(project_id)}
+
+    def get_stored_executions(self, batch_report_id: str, limit: int | None = 20, offset: int = 0) -> Dict[str, Any]:
+        store = self._require_store()
+        return {"executions": store.list_executions(batch_report_id, limit, offset), "total": store.count_executions(batch_report_id)}
+
+    def get_project_name(self, project_id: str) -> str:
+        # The name is all reports need, so a cache hit skips the full get-data download
+        cache_key = f"project:{project_id}:name"
+        cached = self._metadata_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        try:
+            project_data = self.get_project_data(project_id)
+        except Exception:
+            return f"Project_{project_id}"
+        project_name = project_data.get('name', f'Project_{project_id}')
+        self._metadata_cache.set(cache_key, project_name, self.PROJECT_NAME_TTL)
+        return project_name
+
+    def find_folder_name(self, project_id: str, folder_id: str) -> str | None:
+        cache_key = f"project:{project_id}:folder-index"
+        index = self._metadata_cache.get(cache_key)
+        if index is None or folder_id not in index:
+            # Unknown folders may have been created since the index was cached, so rebuild it
+            try:
+                folders_data = self.get_folders(project_id)
+            except Exception:
+                return 'folder'
+            index = {}
+            for folder in folders_data:
+                name = folder.get('name', folder.get('title', 'folder'))
+                for key in ('id', '_id'):
+                    if folder.get(key):
+                        index.setdefault(str(folder[key]), name)
+            self._metadata_cache.set(cache_key, index, self.FOLDERS_TTL)
+        return index.get(folder_id)
+
+    def clear_cache(self, project_id: str | None = None) -> int:
+        """Invalidate cached metadata for one project, or everything cached for this account."""
+        if project_id is not None:
+            return self._metadata_cache.invalidate(prefix=f"project:{project_id}:")
+        return self._metadata_cache.invalidate()
 
     def run_single_script(self, project_id: str, chat_id: str, junit: bool = False, html: bool = False, return_data: bool = True) -> Any:
         # Poll brain_status until ready
-        polling2.poll(
-            lambda: self.get_brain_status(project_id) == True,
-            step=2,
-            poll_forever=True
-        )
+        self._run(self.aio.wait_for_brain(project_id))
         self._dashboard_mode = junit
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-        res = self.requests_session.post(f'{self.__endpoint}/api/chats/run_script/{project_id}/{chat_id}', json={"generate_report": True}, headers=headers, timeout=10)
-        res.raise_for_status()
-        data = res.json()
+        data = self.trigger_chat(project_id, chat_id)
         
         batch_report_id = None
         
         if junit or html:
-            batch_report_id = data.get("batch_report_id")
-            if not batch_report_id:
-                time.sleep(2)
-                reports_data = self.get_batch_test_reports_list(project_id, limit=1, offset=0)
-                reports = reports_data.get("reports", [])
-                if not reports:
-                    raise RuntimeError("No batch reports found. The batch report may still be initializing.")
-                batch_report_id = reports[0]["batch_report_id"]
+            batch_report_id = self._resolve_batch_report_id(project_id, data)
         
         test_title = None
         if junit:
-            results, failure_detected, failure_error = self._poll_batch_executions(batch_report_id, html=html, project_id=project_id, chat_id=chat_id, is_single=True)
-            if failure_error:
-                raise failure_error
+            results, failure_detected, test_title = self._track_single_execution(batch_report_id, chat_id)
             
             data["results"] = results
             data["failed"] = failure_detected
             
-            if batch_report_id:
-                executions_response = self.get_batch_executions(batch_report_id, limit=1, offset=0)
-                executions = executions_response.get('executions', [])
-                if executions:
-                    test_title = executions[0].get('title', executions[0].get('chat_title', None))
-            
             self._generate_junit_xml_report(
                 results=results,
                 project_id=project_id,
@@ -162,12 +282,7 @@ class CLIManager:
             )
         
         if html and batch_report_id:
-            if not test_title and batch_report_id:
-                executions_response = self.get_batch_executions(batch_report_id, limit=1, offset=0)
-                executions = executions_response.get('executions', [])
-                if executions:
-                    test_title = executions[0].get('title', executions[0].get('chat_title', None))
-            
+            # Without a title from polling, the report falls back to the title of the fetched execution
             self._generate_html_report(
                 project_id, 
                 batch_report_id, 
@@ -179,42 +294,105 @@ class CLIManager:
         if return_data:
             return data
 
-    def run_all_scripts(self, project_id: str, generate_report: bool = None, junit: bool = False, html: bool = False, return_data: bool = True, parallelism: int = 1) -> Any:
-        # Poll brain_status until ready
-        polling2.poll(
-            lambda: self.get_brain_status(project_id) == True,
-            step=2,
-            poll_forever=True
-        )
-        self._dashboard_mode = junit
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-        res = self.requests_session.post(f'{self.__endpoint}/api/chats/run_script?project_id={project_id}', json={"generate_report": True, "parallelism": parallelism}, headers=headers, timeout=10)
+    def trigger_chat(self, project_id: str, chat_id: str) -> Dict[str, Any]:
+        """Start a single-script batch for one chat."""
+        res = self._http.post(f'/api/chats/run_script/{project_id}/{chat_id}', 'run', json={"generate_report": True})
         res.raise_for_status()
         data = res.json()
+        self._record_batch_origin(project_id, data, "chat")
+        return data
+
+    def _record_batch_origin(self, project_id: str, data: Dict[str, Any], kind: str, folder_id: str | None = None) -> None:
+        """Remember what started a triggered batch (see ResultsStore.put_batch_origin), when the response names it."""
+        store = self._results_store
+        batch_report_id = data.get("batch_report_id") if isinstance(data, dict) else None
+        if store is not None and batch_report_id:
+            store.put_batch_origin(batch_report_id, project_id, kind, folder_id)
+
+    def list_chats(self, project_id: str, folder_id: str | None = None) -> List[Dict[str, Any]]:
+        """
+        The chats (tests) of a project, or of one of its folders.
+
+        Each chat gets a ``fingerprint`` of its script (its chat entries),
+        see utils.fingerprints.script_fingerprints.
+
+        Raises:
+            RuntimeError: When folder_id is given but the project data does not say which folder a chat is in
+        """
+        from utils.fingerprints import script_fingerprints
+
+        res = self._http.get(f'/api/general/get-data/{project_id}')
+        res.raise_for_status()
+        raw_data = res.json()
+        chats = raw_data[2]
+        if folder_id is not None:
+            if not any("folder_id" in chat for chat in chats):
+                raise RuntimeError("The project data does not include the folder of each chat, so tests cannot be selected by folder")
+            chats = [chat for chat in chats if str(chat.get("folder_id")) == str(folder_id)]
+        fingerprints = script_fingerprints((chat["chat_id"] for chat in chats), raw_data[4])
+        for chat in chats:
+            chat["fingerprint"] = fingerprints[chat["chat_id"]]
+        return chats
+
+    def trigger_run(self, project_id: str, folder_id: str | None = None, parallelism: int = 1) -> Dict[str, Any]:
+        """Start a batch for a whole project, or for one folder when folder_id is given."""
+        payload = {"generate_report": True, "parallelism": parallelism}
+        if folder_id is None:
+            res = self._http.post('/api/chats/run_script', 'run', params={"project_id": project_id}, json=payload)
+            res.raise_for_status()
+            data = res.json()
+            self._record_batch_origin(project_id, data, "project")
+            return data
+
+        res = self._http.post(f'/api/chats/run_folder/{project_id}/{folder_id}', 'run', json=payload)
+        try:
+            res.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            try:
+                error_detail = res.json()
+                raise RuntimeError(f"Server error: {error_detail}") from e
+            except:
+                raise RuntimeError(f"Server error: {res.text}") from e
+        data = res.json()
+        self._record_batch_origin(project_id, data, "folder", folder_id)
+        return data
+
+    def _resolve_batch_report_id(self, project_id: str, data: Dict[str, Any]) -> str:
+        batch_report_id = data.get("batch_report_id")
+        if not batch_report_id:
+            time.sleep(2)
+            reports_data = self.get_batch_test_reports_list(project_id, limit=1, offset=0)
+            reports = reports_data.get("reports", [])
+            if not reports:
+                raise RuntimeError("No batch reports found. The batch report may still be initializing.")
+            batch_report_id = reports[0]["batch_report_id"]
+        return batch_report_id
+
+    def run_all_scripts(self, project_id: str, generate_report: bool = None, junit: bool = False, html: bool = False, return_data: bool = True, parallelism: int = 1) -> Any:
+        # Wait for the brain while loading historical durations for the dashboard ETA
+        preflight = self._run(self.aio.preflight(project_id, history=junit, fingerprints=junit and self._results_store is not None))
+        self._dashboard_mode = junit
+        data = self.trigger_run(project_id, parallelism=parallelism)
         
         batch_report_id = None
         
         if junit or html:
-            batch_report_id = data.get("batch_report_id")
-            if not batch_report_id:
-                time.sleep(2)
-                reports_data = self.get_batch_test_reports_list(project_id, limit=1, offset=0)
-                reports = reports_data.get("reports", [])
-                if not reports:
-                    raise RuntimeError("No batch reports found. The batch report may still be initializing.")
-                batch_report_id = reports[0]["batch_report_id"]
+            batch_report_id = self._resolve_batch_report_id(project_id, data)
         
         if junit:
-            results, failure_detected, failure_error = self._poll_batch_executions(batch_report_id, html=html, project_id=project_id)
+            results, failure_detected, failure_error = self._poll_batch_executions(
+                batch_report_id,
+                html=html,
+                project_id=project_id,
+                expected=preflight.get("expected_durations"),
+                parallelism=parallelism
+            )
             if failure_error:
                 raise failure_error
             
             data["results"] = results
             data["failed"] = failure_detected
+            self._record_fingerprints(project_id, preflight["fingerprints"], results, batch_report_id)
             
             self._generate_junit_xml_report(
                 results=results,
@@ -234,103 +412,496 @@ class CLIManager:
         if return_data:
             return data
 
-    def _build_dashboard_text(self, results: List[Dict[str, Any]], pending: List[Dict[str, Any]] = []) -> str:
-        from rich.markup import escape
-        ordered = sorted(results, key=lambda r: (not r["failed"], r["name"]))
-        failed = [r for r in ordered if r["failed"]]
-        passed = [r for r in ordered if not r["failed"]]
-        total = len(ordered) + len(pending)
+    def run_shard(
+        self,
+        project_id: str,
+        shard: int,
+        shards: int,
+        folder_id: str | None = None,
+        junit: bool = False,
+        html: bool = False,
+        return_data: bool = True,
+        history_before: float | None = None
+    ) -> Any:
+        """
+        Run this node's share of a project's (or folder's) tests.
+
+        The chats are split into ``shards`` groups of similar expected
+        duration (see utils.sharding.balance_shards) using the durations of
+        the full batches completed before ``history_before`` (default: now),
+        and only group ``shard`` (1-based) is run, one single-script batch
+        per chat. Nodes given the same cutoff compute the same split.
+
+        Returns:
+            Dictionary with the shard, its chats and their batch report IDs,
+            the batch reports the durations came from, plus ``results`` and
+            ``failed`` when junit is set
+        """
+        from utils.sharding import balance_shards
+
+        if history_before is None:
+            history_before = time.time()
+        preflight = self._run(self.aio.chats_preflight(project_id, folder_id=folder_id, history_before=history_before))
+        self._dashboard_mode = junit
+        chat_ids = sorted({chat["chat_id"] for chat in preflight["chats"]})
+        expected = preflight["expected_durations"]
+        mine = balance_shards(chat_ids, expected, shards)[shard - 1]
+
+        fingerprints = {chat["chat_id"]: chat["fingerprint"] for chat in preflight["chats"]}
+        run = self._run_chat_batches(project_id, mine["chat_ids"], expected, follow=junit, fingerprints=fingerprints)
+        data: Dict[str, Any] = {
+            "shard": f"{shard}/{shards}",
+            "chats_total": len(chat_ids),
+            "expected_seconds": mine["expected_seconds"],
+            "history": preflight["history"],
+            "batches": run["batches"],
+        }
+        # Shards write their own report files, so artifacts of all nodes can be collected side by side
+        shard_name = f"{preflight.get('folder_name') or 'folder'} " if folder_id else ""
+        shard_name += f"shard {shard} of {shards}"
+
+        if junit:
+            data["results"] = run["results"]
+            data["failed"] = run["failed"]
+            self._generate_junit_xml_report(
+                results=run["results"],
+                project_id=project_id,
+                batch_report_id=None,
+                report_type="shard",
+                folder_name=shard_name
+            )
+
+        if html:
+            self._render_chat_reports(project_id, run["started"], lambda project_name: ReportPathManager().get_shard_report_path(project_name, shard_name))
+
+        if return_data:
+            return data
+
+    def rerun_failed(self, project_id: str, batch_report_id: str, junit: bool = False, html: bool = False, return_data: bool = True) -> Any:
+        """
+        Rerun only the failed tests of a finished batch and merge the outcome with its passes.
+
+        The failed chats are triggered concurrently, one single-script batch
+        each, and followed as one run. JUnit and HTML reports cover the whole
+        original batch: its passes plus the rerun results, with the original
+        failure kept for any chat whose rerun could not be started. They
+        replace the reports of the original batch: the folder reports for a
+        batch this CLI started for one folder, the project's otherwise.
+
+        Args:
+            project_id: The project ID
+            batch_report_id: The batch to rerun, or "last" for the project's latest finished project or folder batch
+        """
+        from utils.perf_stats import server_duration
+
+        original, executions, project_name, folder = self._run(self.aio.rerun_preflight(project_id, batch_report_id))
+        batch_report_id = original.get("batch_report_id", batch_report_id)
+        failed_ids = list(dict.fromkeys(e.get("chat_id", "") for e in executions if (e.get("status") or "").lower() == "failed"))
+        folder_name = (folder["folder_name"] or 'folder') if folder else None
+        self._dashboard_mode = junit
+        data: Dict[str, Any] = {
+            "rerun_of": batch_report_id,
+            "folder_id": folder["folder_id"] if folder else None,
+            "rerun_chats": failed_ids,
+            "batches": [],
+        }
+        if not failed_ids:
+            self._notice(f"\x1b[1mNo failed tests in batch {batch_report_id}\x1b[0m")
+
+        # Reuse the original durations for the rerun ETA
+        durations = {e.get("chat_id", ""): server_duration(e) for e in executions}
+        expected = {chat_id: durations[chat_id] for chat_id in failed_ids if durations.get(chat_id) is not None}
+        run = self._run_chat_batches(project_id, failed_ids, expected, follow=junit)
+        data["batches"] = run["batches"]
+        rerun_ids = {state["chat_id"] for state in run["started"]}
+
+        if junit:
+            previous = BatchSnapshot(self._normalize_execution)
+            previous.apply(e for e in executions if e.get("chat_id") not in rerun_ids)
+            results = previous.completed + run["results"]
+            data["results"] = results
+            data["failed"] = any(result["failed"] for result in results)
+            self._generate_junit_xml_report(
+                results=results,
+                project_id=project_id,
+                batch_report_id=batch_report_id,
+                report_type="folder" if folder else "all",
+                folder_name=folder_name
+            )
+
+        if html:
+            collected, _ = self._collect_chat_reports(project_id, run["started"])
+            merged = [e for e in executions if e.get("chat_id") not in rerun_ids]
+            for chat_id in (state["chat_id"] for state in run["started"]):
+                # A rerun that cannot be loaded keeps its original failure
+                merged.extend(collected[chat_id][1] if chat_id in collected else (e for e in executions if e.get("chat_id") == chat_id))
+            # Present the original batch and its reruns as one logical report
+            failed_count = sum(1 for e in merged if (e.get("status") or "").lower() == "failed")
+            report = dict(original, total_failed=failed_count, total_passed=len(merged) - failed_count)
+            path_manager = ReportPathManager()
+            if folder:
+                output_filename = path_manager.get_folder_report_path(project_name, folder_name, batch_report_id)
+            else:
+                output_filename = path_manager.get_all_reports_path(project_name, batch_report_id)
+            self._render_html_report([report], merged, project_name, output_filename)
+
+        if return_data:
+            return data
+
+    def run_changed(self, project_id: str, folder_id: str | None = None, junit: bool = False, html: bool = False, return_data: bool = True) -> Any:
+        """
+        Run only the tests whose script changed since they last passed.
+
+        Each chat's script is fingerprinted (see
+        utils.fingerprints.script_fingerprints) and compared with the
+        fingerprint recorded in the results store at its last run. New,
+        changed and previously failing chats are triggered, one
+        single-script batch each, and followed until they complete so their
+        outcome can be recorded. The other chats are carried forward: the
+        JUnit report lists them as skipped, the HTML report covers the
+        executed tests only.
+
+        Returns:
+            Dictionary with the selected and carried forward chats, their
+            batch report IDs, plus ``results`` and ``failed`` when junit is set
+        """
+        from utils.fingerprints import select_changed
+
+        store = self._require_store()
+        preflight = self._run(self.aio.chats_preflight(project_id, folder_id=folder_id))
+        self._dashboard_mode = junit
+        recorded = store.get_fingerprints(project_id)
+        selected, carried = select_changed(preflight["chats"], recorded)
+        fingerprints = {chat["chat_id"]: chat["fingerprint"] for chat in selected}
+        self._notice(f"\x1b[1mRunning {len(selected)} new or changed tests, {len(carried)} unchanged since their last pass\x1b[0m")
+
+        run = self._run_chat_batches(project_id, list(fingerprints), preflight["expected_durations"], fingerprints=fingerprints)
+        results = run["results"]
+
+        data: Dict[str, Any] = {
+            "selected": [chat["chat_id"] for chat in selected],
+            "carried_forward": [
+                {"chat_id": chat["chat_id"], "batch_report_id": recorded[chat["chat_id"]]["batch_report_id"]}
+                for chat in carried
+            ],
+            "batches": run["batches"],
+        }
+
+        if junit:
+            skipped = [
+                {
+                    "id": chat["chat_id"],
+                    "name": chat.get("title") or chat["chat_id"],
+                    "status": "skipped",
+                    "failed": False,
+                    "complete": True,
+                    "skipped": f"Unchanged since passing run {recorded[chat['chat_id']]['batch_report_id'] or 'unknown'}",
+                    "output": "",
+                    "time": 0.0,
+                }
+                for chat in carried
+            ]
+            data["results"] = results + skipped
+            data["failed"] = run["failed"]
+            self._generate_junit_xml_report(
+                results=results + skipped,
+                project_id=project_id,
+                batch_report_id=None,
+                report_type="folder" if folder_id else "all",
+                folder_name=preflight.get("folder_name")
+            )
+
+        if html:
+            path_manager = ReportPathManager()
+            self._render_chat_reports(project_id, run["started"], lambda project_name: (
+                path_manager.get_folder_report_path(project_name, preflight.get("folder_name") or 'folder')
+                if folder_id else path_manager.get_all_reports_path(project_name)
+            ))
+
+        if return_data:
+            return data
+
+    def _run_chat_batches(
+        self,
+        project_id: str,
+        chat_ids: List[str],
+        expected: Dict[str, float] | None = None,
+        follow: bool = True,
+        fingerprints: Dict[str, str] | None = None
+    ) -> Dict[str, Any]:
+        """
+        Trigger one single-script batch per chat and, with ``follow``, poll them until every chat completed.
+
+        Shared by the commands that run their tests one batch each (shards,
+        reruns and --changed-only). The outcome of followed chats is recorded
+        against their script ``fingerprints`` (by chat ID) when given.
+
+        Returns:
+            Dictionary with ``batches`` (summary entry per chat), ``started``
+            (states of the chats whose batch started), ``results`` and ``failed``
+        """
+        states = self._run(self.aio.start_chats(project_id, chat_ids)) if chat_ids else []
+        started = [state for state in states if state["batch_report_id"]]
+        results, failure_detected = self._poll_chat_batches(started, expected) if follow and started else ([], False)
+        if fingerprints:
+            self._record_fingerprints(project_id, fingerprints, results, {state["chat_id"]: state["batch_report_id"] for state in started})
+        return {
+            "batches": [
+                {"chat_id": state["chat_id"], "batch_report_id": state["batch_report_id"], "error": state["error"]}
+                for state in states
+            ],
+            "started": started,
+            "results": results,
+            "failed": failure_detected,
+        }
+
+    def _record_fingerprints(
+        self,
+        project_id: str,
+        fingerprints: Dict[str, str] | None,
+        results: List[Dict[str, Any]],
+        batch_report_ids: Dict[str, str] | str | None
+    ) -> None:
+        """
+        Record the outcome of completed tests against the script fingerprint they ran, for --changed-only.
+
+        ``batch_report_ids`` maps chat IDs to their batch, or is the one batch
+        all results come from. Does nothing when the results store is disabled.
+        """
+        store = self._results_store
+        if store is None or not fingerprints:
+            return
+        store.put_fingerprints(project_id, (
+            {
+                "chat_id": result["id"],
+                "fingerprint": fingerprints[result["id"]],
+                "status": "failed" if result["failed"] else "passed",
+                "batch_report_id": batch_report_ids.get(result["id"]) if isinstance(batch_report_ids, dict) else batch_report_ids,
+            }
+            for result in results if result["complete"] and result["id"] in fingerprints
+        ))
+
+    def _collect_chat_reports(self, project_id: str, started: List[Dict[str, Any]]) -> Tuple[Dict[str, Tuple[Any, List[Dict[str, Any]]]], str | None]:
+        """
+        Load the report and raw executions of per-chat batches for HTML reports; batches that fail to load are left out.
+
+        Returns:
+            Tuple of (``(batch report, executions)`` by chat ID, project name)
+        """
+        if not started:
+            return {}, None
+        inputs = self._run(self.aio.collect_many_report_inputs([(project_id, state["batch_report_id"]) for state in started]))
+        collected: Dict[str, Tuple[Any, List[Dict[str, Any]]]] = {}
+        project_name = None
+        for state, entry in zip(started, inputs):
+            if isinstance(entry, Exception):
+                self._notice(f"Error collecting the HTML report of {state['chat_id']}: {str(entry)}")
+                continue
+            batch_report, executions, project_name = entry
+            collected[state["chat_id"]] = (batch_report, executions)
+        return collected, project_name
+
+    def _render_chat_reports(self, project_id: str, started: List[Dict[str, Any]], output_filename: Callable[[str], Any]) -> None:
+        """Render one HTML report over per-chat batches; ``output_filename`` maps the project name to the report path."""
+        collected, project_name = self._collect_chat_reports(project_id, started)
+        if collected:
+            reports = [batch_report for batch_report, _ in collected.values()]
+            executions = [execution for _, batch_executions in collected.values() for execution in batch_executions]
+            self._render_html_report(reports, executions, project_name, output_filename(project_name))
+
+    def _poll_chat_batches(self, states: List[Dict[str, Any]], expected: Dict[str, float] | None = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Follow per-chat batches from one loop and one dashboard until every chat completed."""
+        from utils.dashboard import BatchDashboard
+
+        snapshot = BatchSnapshot(self._normalize_execution, expected=expected)
+        interval = AdaptiveInterval()
+
+        with BatchDashboard(self._console, mode=self._display_mode, parallelism=max(1, len(states))) as dashboard:
+            dashboard.update(snapshot)
+            while any(state["status"] == "running" for state in states):
+                changes = self._run(self.aio.advance_chats(states, snapshot))
+                if changes:
+                    self._update_dashboard(dashboard, snapshot)
+                if not any(state["status"] == "running" for state in states):
+                    break
+                time.sleep(interval.next(changes > 0))
+
+        for state in states:
+            if state["error"]:
+                self._notice(f"Error following {state['chat_id']}: {state['error']}")
+        self._notice("\n\x1b[1mAll tests executed!\x1b[0m")
+        return snapshot.completed, snapshot.failure_detected
+
+    def run_many(self, targets: List[Dict[str, Any]], junit: bool = False, html: bool = False, parallelism: int = 1) -> Dict[str, Any]:
+        """
+        Trigger several project/folder batches at once and follow them from one scheduler.
         
-        lines = []
-        lines.append(f"Total: {total}  Passed: [green]{len(passed)}[/green]  Failed: [red]{len(failed)}[/red]  Pending: [yellow]{len(pending)}[/yellow]")
-        lines.append("")
-        lines.append("[bold]FAILED TESTS[/bold]")
-        if not failed:
-            lines.append("  (none)")
-        else:
-            for r in failed:
-                name = escape(r['name'])
-                lines.append(f"  [[bold red]FAILED[/bold red]] {name} ({r['id']}) - {r.get('time', 0):.3f}s")
-        lines.append("")
-        lines.append("[bold]PASSED TESTS[/bold]")
-        if not passed:
-            lines.append("  (none)")
-        else:
-            for r in passed:
-                name = escape(r['name'])
-                lines.append(f"  [[bold green]PASSED[/bold green]] {name} ({r['id']}) - {r.get('time', 0):.3f}s")
-        lines.append("")
-        lines.append("[bold]PENDING TESTS[/bold]")
-        if not pending:
-            lines.append("  (none)")
-        else:
-            for r in pending:
-                name = escape(r['name'])
-                lines.append(f"  [[bold yellow]PENDING[/bold yellow]] {name} ({r['id']})")
+        Args:
+            targets: Dictionaries with ``project_id`` and an optional ``folder_id``
+            junit: Write per-target and combined JUnit XML reports
+            html: Write per-target and combined HTML reports
+            parallelism: Parallelism level passed to every triggered batch
         
-        return "\n".join(lines)
-
-    def _poll_batch_executions(self, batch_report_id: str, html: bool = False, project_id: str = None, chat_id: str = None, is_single: bool = False) -> Tuple[List[Dict[str, Any]], bool, Any]:
-        from rich.live import Live
-        from rich.markup import escape
+        Returns:
+            Summary with one entry per target and an ``exit_code`` (0 all passed,
+            1 at least one test failed, 2 at least one target could not be run)
+        """
+        from utils.dashboard import MultiTargetDashboard
+        
+        self._dashboard_mode = True
+        with MultiTargetDashboard(self._console, mode=self._display_mode) as dashboard:
+            states = self._run(self.aio.run_targets(
+                targets,
+                parallelism=parallelism,
+                on_update=lambda current: self._update_dashboard(dashboard, current)
+            ))
+        self._notice("\n\x1b[1mAll targets executed!\x1b[0m")
+        
+        finished = [state for state in states if state["batch_report_id"] and not state["error"]]
+        path_manager = ReportPathManager()
+        
+        if junit and finished:
+            suites = []
+            for state in finished:
+                target = state["target"]
+                self._generate_junit_xml_report(
+                    results=state["snapshot"].completed,
+                    project_id=target["project_id"],
+                    batch_report_id=state["batch_report_id"],
+                    report_type="folder" if target.get("folder_id") else "all",
+                    folder_name=state["folder_name"]
+                )
+                suites.append({"name": state["label"], "classname": state["label"], "results": state["snapshot"].completed})
+            try:
+                from utils.junit_xml import write_combined_junit_xml
+                with tracer.span("write_combined_junit_xml", "report", suites=len(suites)):
+                    output_path = write_combined_junit_xml(path_manager.get_combined_xml_path(), suites, name="run-many")
+                self._notice(f"\x1b[1mCombined JUnit XML report generated: {output_path}\x1b[0m")
+            except Exception as e:
+                self._notice(f"Error generating combined JUnit XML report: {str(e)}")
         
-        completed: List[Dict[str, Any]] = []
-        seen_ids: set[str] = set()
-        failure_detected = False
-        start_times: Dict[str, float] = {}
-        end_times: Dict[str, float] = {}
+        if html and finished:
+            inputs = self._run(self.aio.collect_many_report_inputs(
+                [(state["target"]["project_id"], state["batch_report_id"]) for state in finished]
+            ))
+            all_reports: List[Dict[str, Any]] = []
+            all_executions: List[Dict[str, Any]] = []
+            for state, collected in zip(finished, inputs):
+                if isinstance(collected, Exception):
+                    self._notice(f"Error generating HTML report for {state['label']}: {str(collected)}")
+                    continue
+                batch_report, executions, project_name = collected
+                if state["target"].get("folder_id"):
+                    output_filename = path_manager.get_folder_report_path(project_name, state["folder_name"] or 'folder', state["batch_report_id"])
+                else:
+                    output_filename = path_manager.get_all_reports_path(project_name, state["batch_report_id"])
+                self._render_html_report([batch_report], executions, project_name, output_filename)
+                all_reports.append(batch_report)
+                all_executions.extend(executions)
+            if all_reports:
+                self._render_html_report(all_reports, all_executions, f"{len(all_reports)} targets", path_manager.get_combined_report_path())
+        
+        summary_targets = []
+        for state in states:
+            snapshot = state["snapshot"]
+            summary_targets.append({
+                "project_id": state["target"]["project_id"],
+                "folder_id": state["target"].get("folder_id"),
+                "batch_report_id": state["batch_report_id"],
+                "status": state["status"],
+                "passed": sum(1 for r in snapshot.completed if not r["failed"]),
+                "failed": sum(1 for r in snapshot.completed if r["failed"]),
+                "error": state["error"],
+            })
+        
+        if any(state["error"] for state in states):
+            exit_code = 2
+        elif any(state["snapshot"].failure_detected for state in states):
+            exit_code = 1
+        else:
+            exit_code = 0
+        return {"exit_code": exit_code, "targets": summary_targets}
 
-        with Live(self._build_dashboard_text([], []), refresh_per_second=4, console=self._console) as live:
-            while True:
-                batch_report = self.get_batch_report_details(batch_report_id)
-                batch_status = batch_report.get("status", "").lower()
-                
-                response = self.get_batch_executions(batch_report_id, limit=200)
-                execution_list = response.get("executions", [])
-                
-                if not execution_list:
-                    break
-                
-                all_tests = []
-                for execution in execution_list:
-                    normalized = self._normalize_execution(execution)
-                    
-                    if chat_id and normalized["id"] != chat_id:
-                        continue
-                        
-                    all_tests.append(normalized)
-                
-                for test in all_tests:
-                    exec_id = test["id"]
+    def _notice(self, message: str) -> None:
+        print(message, file=sys.stdout if self.output_format == "json" else sys.stderr, flush=True)
 
-                    if exec_id not in start_times:
-                        start_times[exec_id] = time.time()
+    @property
+    def _display_mode(self) -> str | None:
+        """Dashboard mode: records as JSON lines with --format=jsonl, otherwise detected from the terminal."""
+        return "jsonl" if self.output_format == "jsonl" else None
 
-                    if exec_id not in seen_ids and test["complete"]:
-                        seen_ids.add(exec_id)
-                        end_times[exec_id] = time.time()
-                        duration = max(0.0, end_times[exec_id] - start_times[exec_id])
-                        test["time"] = duration
-                        completed.append(test)
+    def _update_dashboard(self, dashboard: Any, state: Any) -> None:
+        with tracer.span("dashboard_render", "dashboard"):
+            dashboard.update(state)
 
-                        if test["failed"]:
-                            failure_detected = True
-                
-                pending = [t for t in all_tests if t["id"] not in seen_ids and not t["complete"]]
+    def _poll_batch_executions(
+        self,
+        batch_report_id: str,
+        html: bool = False,
+        project_id: str = None,
+        chat_id: str = None,
+        is_single: bool = False,
+        expected: Dict[str, float] | None = None,
+        parallelism: int = 1
+    ) -> Tuple[List[Dict[str, Any]], bool, Any]:
+        from utils.dashboard import BatchDashboard
+        
+        snapshot = BatchSnapshot(self._normalize_execution, chat_id=chat_id, expected=expected)
+        interval = AdaptiveInterval()
+        prefetch = True
+
+        with BatchDashboard(self._console, mode=self._display_mode, parallelism=parallelism) as dashboard:
+            dashboard.update(snapshot)
+            while True:
+                _, changes, finished = self._run(self.aio.advance_batch(batch_report_id, snapshot, prefetch=prefetch))
+                prefetch = changes > 0
                 
-                live.update(self._build_dashboard_text(completed, pending))
+                if changes:
+                    self._update_dashboard(dashboard, snapshot)
 
-                if batch_status in {"completed", "failed", "partial_failed"}:
+                if finished:
                     break
 
-                time.sleep(2)
+                time.sleep(interval.next(changes > 0))
 
         if is_single:
-            print(f"\n\x1b[1mTest executed!\x1b[0m")
+            self._notice("\n\x1b[1mTest executed!\x1b[0m")
         else:
-            print(f"\n\x1b[1mAll tests executed!\x1b[0m")
+            self._notice("\n\x1b[1mAll tests executed!\x1b[0m")
+
+        return snapshot.completed, snapshot.failure_detected, None
+
+    def _track_single_execution(self, batch_report_id: str, chat_id: str) -> Tuple[List[Dict[str, Any]], bool, str | None]:
+        """
+        Follow the one execution of a single-script run until it completes.
 
-        return completed, failure_detected, None
+        Each tick fetches the batch report and only that execution (see
+        AsyncCLIManager.advance_single), and polling stops as soon as the
+        execution is complete instead of waiting for the batch to close.
+        
+        Returns:
+            Tuple of (results, failure detected, test title)
+        """
+        from utils.dashboard import BatchDashboard
+        
+        snapshot = BatchSnapshot(self._normalize_execution, chat_id=chat_id)
+        # One test finishes at an unknown moment, so keep the interval short
+        interval = AdaptiveInterval(minimum=1.0, initial=1.0, maximum=3.0)
+        tracking: Dict[str, Any] = {}
+
+        with BatchDashboard(self._console, mode=self._display_mode) as dashboard:
+            dashboard.update(snapshot)
+            while True:
+                _, changes, finished = self._run(self.aio.advance_single(batch_report_id, snapshot, tracking))
+                if changes:
+                    self._update_dashboard(dashboard, snapshot)
+                if finished:
+                    break
+                time.sleep(interval.next(changes > 0))
+
+        self._notice("\n\x1b[1mTest executed!\x1b[0m")
+        execution = tracking.get("execution") or {}
+        return snapshot.completed, snapshot.failure_detected, execution.get('title', execution.get('chat_title'))
 
     def _normalize_execution(self, execution: Dict[str, Any]) -> Dict[str, Any]:
         status_value = execution.get("status", "").lower()
@@ -349,72 +920,307 @@ class CLIManager:
 
     def get_test_results(self, project_id: str, payload: list) -> Any:
         # Poll brain_status until ready
-        polling2.poll(
-            lambda: self.get_brain_status(project_id) == True,
-            step=2,
-            poll_forever=True
+        self._run(self.aio.wait_for_brain(project_id))
+        return self._post_test_results(project_id, payload)
+
+    def iter_test_results(self, project_id: str, payload: Iterable[Dict[str, Any]], chunk_size: int = 500) -> Iterator[Any]:
+        """
+        Stream the results of ``{chat_id, task_id}`` items, requested in concurrent chunks.
+
+        The payload is consumed lazily and sent in requests of at most
+        ``chunk_size`` items, up to ``io_concurrency`` of them in flight.
+        Results are yielded in payload order as soon as their chunk arrives.
+
+        Args:
+            project_id: The project ID
+            payload: The items, e.g. from utils.payload_reader.iter_payload()
+            chunk_size: Maximum number of items per request
+        """
+        self._run(self.aio.wait_for_brain(project_id))
+        responses = iter_chunked(
+            lambda chunk: self._post_test_results(project_id, chunk),
+            payload,
+            chunk_size=chunk_size,
+            max_workers=self._io_concurrency
         )
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
+        for response in responses:
+            if isinstance(response, list):
+                yield from response
+            else:
+                yield response
 
-        res = self.requests_session.post(f'{self.__endpoint}/api/chats/script_results?project_id={project_id}', json=payload, headers=headers, timeout=10)
+    def _post_test_results(self, project_id: str, payload: List[Dict[str, Any]]) -> Any:
+        res = self._http.post('/api/chats/script_results', 'results', params={"project_id": project_id}, json=payload)
         res.raise_for_status()
         data = res.json()
         return data
 
     def get_batch_test_reports_list(self, project_id:str, limit: int=20, offset: int=0) -> Any:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-
-        res = self.requests_session.get(f'{self.__endpoint}/api/chats/project_reports/{project_id}?limit={limit}&offet={offset}',headers=headers, timeout=10)
+        res = self._http.get(f'/api/chats/project_reports/{project_id}', 'reports', params={"limit": limit, "offset": offset})
         res.raise_for_status()
         data = res.json()
         return data
 
     def get_batch_report_details(self, batch_report_id: str) -> Any:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
+        return self._conditional_get(f'/api/chats/batch_report/{batch_report_id}', 'reports')
+
+    def get_batch_executions(self, batch_report_id: str, limit: int=20, offset: int=0) -> Any:
+        return self._conditional_get(self._batch_executions_path(batch_report_id, limit, offset), 'executions')
+
+    def find_batch_execution(self, batch_report_id: str, chat_id: str) -> Tuple[Dict[str, Any] | None, bool]:
+        """
+        Fetch the execution of one chat in a batch with a single-item request.
+
+        The chat is passed as a ``chat_id`` filter; servers that ignore the
+        filter simply return the first execution of the batch.
+
+        Returns:
+            Tuple of (the chat's execution or None, whether the batch has any executions yet)
+        """
+        data = self._conditional_get(
+            f'/api/chats/batch_report/{batch_report_id}/executions?limit=1&offset=0&chat_id={quote(chat_id, safe="")}', 'executions')
+        executions = data.get('executions', [])
+        for execution in executions:
+            if execution.get('chat_id') == chat_id:
+                return execution, True
+        return None, bool(executions)
+
+    def _conditional_get(self, path: str, endpoint: str = "default") -> Any:
+        """
+        GET a JSON resource, revalidating with If-None-Match when an ETag was seen before.
 
-        res = self.requests_session.get(
-            f'{self.__endpoint}/api/chats/batch_report/{batch_report_id}', headers=headers, timeout=10)
+        A 304 response returns the previously decoded body, so unchanged batch
+        state is not transferred again on every poll tick. The cache is an LRU
+        bounded by entries and bytes (see ETagCache).
+        """
+        cached = self._etag_cache.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        res = self._http.get(path, endpoint, headers=headers)
+        if res.status_code == 304 and cached:
+            return cached[1]
         res.raise_for_status()
         data = res.json()
+        etag = res.headers.get("ETag")
+        if etag:
+            self._etag_cache.put(path, etag, data, len(res.content))
         return data
 
-    def get_batch_executions(self, batch_report_id: str, limit: int=20, offset: int=0) -> Any:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
+    def _batch_executions_path(self, batch_report_id: str, limit: int, offset: int) -> str:
+        return f'/api/chats/batch_report/{batch_report_id}/executions?limit={limit}&offset={offset}'
 
-        res = self.requests_session.get(
-            f'{self.__endpoint}/api/chats/batch_report/{batch_report_id}/executions?limit={limit}&offet={offset}', headers=headers, timeout=10)
+    def release_batch_pages(self, batch_report_id: str) -> None:
+        """Drop the cached report and execution pages of a batch once its poll finished."""
+        self._polled_pages.pop(batch_report_id, None)
+        self._etag_cache.discard(f'/api/chats/batch_report/{batch_report_id}')
+        self._etag_cache.discard_prefix(f'/api/chats/batch_report/{batch_report_id}/')
+
+    def list_batch_execution_windows(
+        self,
+        batch_report_id: str,
+        windows: List[Tuple[int, int]],
+        start: int = 0
+    ) -> List[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Fetch raw executions of a batch as ``(offset, executions)`` chunks.
+
+        The ``(offset, limit)`` windows are fetched concurrently, then every
+        page from ``start`` on; polls plan both with BatchSnapshot.fetch_plan()
+        so that only ranges still holding pending executions are requested.
+        Cached responses of windows the previous call of the batch requested
+        and this one did not are dropped, as no poll asks for them again.
+        """
+        requested: List[str] = []
+
+        def fetch(limit: int, offset: int) -> Any:
+            requested.append(self._batch_executions_path(batch_report_id, limit, offset))
+            return self.get_batch_executions(batch_report_id, limit=limit, offset=offset)
+
+        head = list(map_bounded(
+            self._page_pool,
+            lambda window: (window[0], fetch(window[1], window[0]).get("executions", [])),
+            windows,
+            self._page_workers
+        ))
+        tail = list(iter_pages(fetch, "executions", page_size=self._page_size, max_workers=self._page_workers, start=start, executor=self._page_pool))
+        chunks = head + tail
+
+        for path in self._polled_pages.get(batch_report_id, set()).difference(requested):
+            self._etag_cache.discard(path)
+        self._polled_pages[batch_report_id] = set(requested)
+        return chunks
+
+    def iter_batch_reports(self, project_id: str) -> Iterator[Dict[str, Any]]:
+        """Stream every batch report of a project, newest first, fetching pages concurrently."""
+        return iter_paginated(
+            lambda limit, offset: self.get_batch_test_reports_list(project_id, limit=limit, offset=offset),
+            items_key="reports",
+            page_size=self._page_size,
+            max_workers=self._page_workers,
+            executor=self._page_pool
+        )
+
+    def iter_batch_executions(self, batch_report_id: str, normalize: bool = True, spill_screenshots: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every execution of a batch report, fetching pages concurrently.
+
+        Args:
+            batch_report_id: The batch report ID
+            normalize: Yield normalized executions instead of the raw API records
+            spill_screenshots: Move inline screenshots of raw records to the screenshot store
+        """
+        pages = iter_paginated(
+            lambda limit, offset: self.get_batch_executions(batch_report_id, limit=limit, offset=offset),
+            items_key="executions",
+            page_size=self._page_size,
+            max_workers=self._page_workers,
+            executor=self._page_pool
+        )
+        for execution in pages:
+            if normalize:
+                yield self._normalize_execution(execution)
+            elif spill_screenshots:
+                yield self._screenshot_store.spill(execution)
+            else:
+                yield execution
+
+    def delete_batch_report(self, batch_report_id: str) -> Any:
+        res = self._http.delete(f'/api/chats/batch_report/{batch_report_id}', 'reports')
         res.raise_for_status()
         data = res.json()
         return data
 
-    def delete_batch_report(self, batch_report_id: str) -> Any:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
+    def prune_reports(
+        self,
+        project_id: str,
+        keep_last: int = 0,
+        older_than: float | None = None,
+        only_passed: bool = False,
+        dry_run: bool = False,
+        workers: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Delete the batch reports of a project selected by a retention policy.
+
+        All report pages are read first (concurrently), so deleting does not
+        shift the pages still being listed. Selected reports are then deleted
+        by a pool of ``workers`` threads, and dropped from the results store
+        and the durations cache as well.
+
+        Args:
+            project_id: The project ID
+            keep_last: Never delete the newest ``keep_last`` reports
+            older_than: Only delete reports started before this epoch time
+            only_passed: Only delete reports without failed tests
+            dry_run: Only list the reports that would be deleted
+            workers: Number of deletes in flight at once
+
+        Returns:
+            Summary with the selected IDs, the number deleted, failures and throughput
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from utils.retention import select_for_pruning
+
+        started = time.perf_counter()
+        scanned = 0
+
+        def listed() -> Iterator[Dict[str, Any]]:
+            nonlocal scanned
+            for report in self.iter_batch_reports(project_id):
+                scanned += 1
+                yield report
+
+        selected = [
+            report["batch_report_id"]
+            for report in select_for_pruning(listed(), keep_last=keep_last, older_than=older_than, only_passed=only_passed)
+        ]
+        failed: List[Dict[str, str]] = []
+        deleted = 0
+        if not dry_run and selected:
+            store = self._results_store
+
+            def delete(batch_report_id: str) -> None:
+                self.delete_batch_report(batch_report_id)
+                self._metadata_cache.invalidate(key=f"report:{batch_report_id}:durations")
+                if store is not None:
+                    store.delete_report(batch_report_id)
+
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="barko-prune") as pool:
+                futures = [(batch_report_id, pool.submit(delete, batch_report_id)) for batch_report_id in selected]
+                for batch_report_id, future in futures:
+                    try:
+                        future.result()
+                        deleted += 1
+                    except Exception as e:
+                        failed.append({"batch_report_id": batch_report_id, "error": str(e)})
+
+        elapsed = time.perf_counter() - started
+        return {
+            "project_id": project_id,
+            "dry_run": dry_run,
+            "scanned": scanned,
+            "selected": len(selected),
+            "deleted": deleted,
+            "failed": failed,
+            "elapsed_s": round(elapsed, 3),
+            "deleted_per_s": round(deleted / elapsed, 1) if deleted and elapsed > 0 else None,
+            "batch_report_ids": selected,
         }
 
-        res = self.requests_session.delete(
-            f'{self.__endpoint}/api/chats/batch_report/{batch_report_id}', headers=headers, timeout=10)
-        res.raise_for_status()
-        data = res.json()
-        return data
+    def perf_report(self, project_id: str, reports: int = 20, recent: int = 3, slowdown_factor: float = 1.5, min_delta: float = 5.0) -> Dict[str, Any]:
+        """
+        Duration statistics per test over the project's latest finished batch reports.
+
+        Args:
+            project_id: The project ID
+            reports: Number of latest batch reports to analyze
+            recent: Number of latest runs compared against the older ones
+            slowdown_factor: Recent median / baseline median ratio that flags a slowdown
+            min_delta: Minimum slowdown in seconds to be flagged
+
+        Returns:
+            Dictionary with the analyzed reports, per-test p50/p95/max and trend,
+            and the IDs of tests that slowed down
+        """
+        from utils.perf_stats import summarize_history
+        
+        history = self._run(self.aio.duration_history(project_id, reports))
+        tests = summarize_history(history, recent=recent, slowdown_factor=slowdown_factor, min_delta=min_delta)
+        return {
+            "project_id": project_id,
+            "reports_analyzed": [entry["batch_report_id"] for entry in history],
+            "tests": tests,
+            "slowdowns": [test["id"] for test in tests if test["slowdown"]],
+        }
+
+    def history_report(self, project_id: str, reports: int = 30) -> Dict[str, Any]:
+        """
+        Write an HTML history page aggregating the project's latest batch reports.
+
+        Per-report test aggregates are cached in the results store, so after
+        the first run only reports added since then are fetched and aggregated.
+
+        Args:
+            project_id: The project ID
+            reports: Number of latest batch reports to include
+
+        Returns:
+            Dictionary with the report path and how many aggregates were cached
+        """
+        from utils.html_report import merge_test_aggregates, write_aggregated_html
+
+        inputs = self._run(self.aio.history_inputs(project_id, reports))
+        tests = merge_test_aggregates(inputs["aggregates"])
+        output_filename = ReportPathManager().get_history_report_path(inputs["project_name"])
+        with tracer.span("render_html_report", "report", reports=len(inputs["reports"]), tests=len(tests)):
+            write_aggregated_html(inputs["reports"], tests, inputs["project_name"], output_filename)
+        return {
+            "project_id": project_id,
+            "output": str(output_filename),
+            "reports": len(inputs["reports"]),
+            "aggregates_cached": inputs["cached"],
+            "aggregates_computed": len(inputs["aggregates"]) - inputs["cached"],
+            "errors": inputs["errors"],
+        }
 
     def _generate_html_report(
         self, 
@@ -426,32 +1232,9 @@ class CLIManager:
         folder_name: str = None
     ) -> None:
         try:
-            batch_report = self.get_batch_report_details(batch_report_id)
-            
-            executions_response = self.get_batch_executions(batch_report_id, limit=200, offset=0)
-            executions = executions_response.get('executions', [])
-            
-            try:
-                project_data = self.get_project_data(project_id)
-                project_name = project_data.get('name', f'Project_{project_id}')
-            except Exception as e:
-                project_name = f"Project_{project_id}"
-            
-            report_data = {
-                'reports': [batch_report],
-                'executions': executions,
-                'projectName': project_name
-            }
-            
-            template_path = Path(__file__).parent / 'utils' / 'report_template.js'
-            
-            if not template_path.exists():
-                click.echo(f"Warning: Report template not found at {template_path}")
-                click.echo("HTML report generation skipped.")
-                return
+            batch_report, executions, project_name = self._run(self.aio.collect_report_inputs(project_id, batch_report_id))
             
             path_manager = ReportPathManager()
-            template_function = 'generateAllReportsHTML'
             
             if report_type == "single":
                 if not test_title and executions:
@@ -461,38 +1244,25 @@ class CLIManager:
                 output_filename = path_manager.get_folder_report_path(project_name, folder_name or 'folder', batch_report_id)
             else:
                 output_filename = path_manager.get_all_reports_path(project_name, batch_report_id)
-            node_script = f'''
-const {{ {template_function} }} = require('{template_path.as_posix()}');
-const fs = require('fs');
-
-const data = {json.dumps(report_data)};
-const html = {template_function}(data.reports, data.executions, data.projectName);
-
-fs.writeFileSync('{output_filename.as_posix()}', html, 'utf-8');
-console.log('HTML report generated: {output_filename}');
-'''
-            output_filename.parent.mkdir(parents=True, exist_ok=True)
-            temp_script_path = Path('temp_generate_html.js')
-            temp_script_path.write_text(node_script)
-            
-            result = subprocess.run(
-                ['node', str(temp_script_path)],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            temp_script_path.unlink()
             
-            if result.returncode == 0:
-                print(f"\x1b[1mHTML report generated: {output_filename}\x1b[0m")
-            else:
-                click.echo(f"Error generating HTML report: {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            click.echo("Error: HTML generation timed out")
+            self._render_html_report([batch_report], executions, project_name, output_filename)
+        except Exception as e:
+            self._notice(f"Error generating HTML report: {str(e)}")
+
+    def _render_html_report(
+        self,
+        reports: List[Dict[str, Any]],
+        executions: List[Dict[str, Any]],
+        project_name: str,
+        output_filename: Path
+    ) -> None:
+        try:
+            from utils.html_report import write_all_reports_html
+            with tracer.span("render_html_report", "report", reports=len(reports), executions=len(executions)):
+                write_all_reports_html(reports, executions, project_name, output_filename)
+            self._notice(f"\x1b[1mHTML report generated: {output_filename}\x1b[0m")
         except Exception as e:
-            click.echo(f"Error generating HTML report: {str(e)}")
+            self._notice(f"Error generating HTML report: {str(e)}")
 
     def _generate_junit_xml_report(
         self,
@@ -510,22 +1280,12 @@ console.log('HTML report generated: {output_filename}');
             results: List of test result dictionaries
             project_id: The project ID
             batch_report_id: The batch report ID
-            report_type: Type of report - "single", "folder", or "all"
+            report_type: Type of report - "single", "folder", "shard", or "all"
             test_title: Title for single test reports
-            folder_name: Name for folder reports
+            folder_name: Name for folder reports, or the shard name for shard reports
         """
         try:
-            try:
-                project_data = self.get_project_data(project_id)
-                project_name = project_data.get('name', f'Project_{project_id}')
-            except Exception:
-                project_name = f"Project_{project_id}"
-            
-            xml_content = generate_junit_xml(
-                results=results,
-                project_name=project_name,
-                batch_report_id=batch_report_id
-            )
+            project_name = self.get_project_name(project_id)
             
             path_manager = ReportPathManager()
             
@@ -541,97 +1301,79 @@ console.log('HTML report generated: {output_filename}');
                     folder_name or 'folder', 
                     batch_report_id
                 )
+            elif report_type == "shard":
+                output_path = path_manager.get_shard_xml_path(project_name, folder_name or 'shard')
             else:
                 output_path = path_manager.get_all_reports_xml_path(
                     project_name, 
                     batch_report_id
                 )
             
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(xml_content, encoding='utf-8')
+            from utils.junit_xml import write_junit_xml
+            with tracer.span("write_junit_xml", "report", results=len(results)):
+                write_junit_xml(
+                    output_path,
+                    results=results,
+                    project_name=project_name,
+                    batch_report_id=batch_report_id
+                )
             
-            print(f"\x1b[1mJUnit XML report generated: {output_path}\x1b[0m")
+            self._notice(f"\x1b[1mJUnit XML report generated: {output_path}\x1b[0m")
             
         except Exception as e:
-            click.echo(f"Error generating JUnit XML report: {str(e)}")
+            self._notice(f"Error generating JUnit XML report: {str(e)}")
 
-    def get_folders(self, project_id: str) -> List[Dict[str, Any]]:
-        headers = {
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-        res = self.requests_session.get(
-            f'{self.__endpoint}/api/folders/{project_id}',
-            headers=headers,
-            timeout=30
-        )
+    def get_folders(self, project_id: str, use_cache: bool = False) -> List[Dict[str, Any]]:
+        """
+        The folders of a project, always fetched fresh unless use_cache is set.
+
+        Internal folder-name lookups use the cached index of find_folder_name instead.
+        """
+        cache_key = f"project:{project_id}:folders"
+        if use_cache:
+            cached = self._metadata_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        res = self._http.get(f'/api/folders/{project_id}', 'folders')
         res.raise_for_status()
-        return res.json()
+        folders = res.json()
+        self._metadata_cache.set(cache_key, folders, self.FOLDERS_TTL)
+        return folders
 
     def run_folder(self, project_id: str, folder_id: str, junit: bool = False, html: bool = False, return_data: bool = True, parallelism: int = 1) -> Any:
-        polling2.poll(
-            lambda: self.get_brain_status(project_id) == True,
-            step=2,
-            poll_forever=True
-        )
+        # Wait for the brain and resolve the folder name concurrently
+        preflight = self._run(self.aio.preflight(
+            project_id,
+            folder_id=folder_id if html else None,
+            history=junit,
+            fingerprints=junit and self._results_store is not None,
+            fingerprint_folder_id=folder_id
+        ))
         self._dashboard_mode = junit
         
-        folder_name = None
-        if html:
-            try:
-                folders_data = self.get_folders(project_id)
-                for folder in folders_data:
-                    if folder.get('id') == folder_id or folder.get('_id') == folder_id:
-                        folder_name = folder.get('name', folder.get('title', 'folder'))
-                        break
-            except Exception:
-                folder_name = 'folder'
+        folder_name = preflight.get("folder_name")
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.__token}",
-            "Accept": "application/json",
-        }
-        
-        res = self.requests_session.post(
-            f'{self.__endpoint}/api/chats/run_folder/{project_id}/{folder_id}',
-            json={"generate_report": True, "parallelism": parallelism},
-            headers=headers,
-            timeout=10
-        )
-        try:
-            res.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            try:
-                error_detail = res.json()
-                raise RuntimeError(f"Server error: {error_detail}") from e
-            except:
-                raise RuntimeError(f"Server error: {res.text}") from e
-        data = res.json()
+        data = self.trigger_run(project_id, folder_id=folder_id, parallelism=parallelism)
         
         batch_report_id = None
         
         if junit or html:
-            batch_report_id = data.get("batch_report_id")
-            if not batch_report_id:
-                time.sleep(2)
-                reports_data = self.get_batch_test_reports_list(project_id, limit=1, offset=0)
-                reports = reports_data.get("reports", [])
-                if not reports:
-                    raise RuntimeError("No batch reports found. The batch report may still be initializing.")
-                batch_report_id = reports[0]["batch_report_id"]
+            batch_report_id = self._resolve_batch_report_id(project_id, data)
         
         if junit:
             results, failure_detected, failure_error = self._poll_batch_executions(
                 batch_report_id,
                 html=html,
-                project_id=project_id
+                project_id=project_id,
+                expected=preflight.get("expected_durations"),
+                parallelism=parallelism
             )
             if failure_error:
                 raise failure_error
             
             data["results"] = results
             data["failed"] = failure_detected
+            self._record_fingerprints(project_id, preflight["fingerprints"], results, batch_report_id)
             
             self._generate_junit_xml_report(
                 results=results,
@@ -653,4 +1395,3 @@ console.log('HTML report generated: {output_filename}');
         
         if return_data:
             return data
-
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+from commands.common import emit
+from utils import agent as agent_client
+
+RUNNER = Path(__file__).resolve().parent.parent / "runner.py"
+
+
+@click.group()
+def agent():
+    """
+    Background agent that runs the commands of this directory with warm connections and caches.
+
+    While an agent is running, runner.py invocations from the same directory
+    and environment are forwarded to it over a local socket.
+    """
+
+
+@agent.command()
+@click.option('--foreground', is_flag=True, help='run the agent in this process instead of in the background')
+@click.option('--idle-timeout', type=float, default=3600, show_default=True, help='stop after this many seconds without a request (0 never)')
+@click.option('--wait', type=float, default=10, show_default=True, help='seconds to wait for a background agent to accept connections')
+@click.pass_context
+def start(ctx, foreground, idle_timeout, wait):
+    """Start the agent for the current directory"""
+    path = agent_client.socket_path()
+    status = agent_client.query("status", path)
+    if status is not None:
+        emit(ctx, dict(status, already_running=True))
+        return
+
+    if foreground:
+        from utils.agent_server import serve
+        serve(path, idle_timeout)
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    log_path = path.with_suffix(".log")
+    with open(log_path, "a") as log:
+        process = subprocess.Popen(
+            [sys.executable, str(RUNNER), "agent", "start", "--foreground", f"--idle-timeout={idle_timeout}"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        status = agent_client.query("status", path)
+        if status is not None:
+            emit(ctx, dict(status, log=str(log_path)))
+            return
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    raise click.ClickException(f"The agent did not start, see {log_path}")
+
+
+@agent.command()
+@click.pass_context
+def stop(ctx):
+    """Stop the agent of the current directory once its running commands finished"""
+    status = agent_client.query("stop")
+    emit(ctx, status if status is not None else {"running": False})
+
+
+@agent.command()
+@click.pass_context
+def status(ctx):
+    """Show whether an agent serves the current directory"""
+    status = agent_client.query("status")
+    emit(ctx, status if status is not None else {"running": False, "socket": str(agent_client.socket_path())})
+    if status is None:
+        ctx.exit(1)
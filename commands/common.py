@@ -0,0 +1,124 @@
+import json
+
+import click
+from utils.payload_reader import PayloadError, check_item
+
+
+def get_manager(ctx):
+    """
+    Return the CLIManager shared by this invocation, creating it on first use.
+
+    cli_manager (and with it requests and the report utilities) is only
+    imported by commands that actually talk to the API. In the agent the
+    manager comes from its pool (``manager_factory``) instead, and is
+    closed by the pool rather than when the command ends.
+    """
+    settings = ctx.find_root().obj
+    manager = settings.get("manager")
+    if manager is None:
+        factory = settings.get("manager_factory")
+        if factory is None:
+            from cli_manager import CLIManager
+            manager = CLIManager()
+            ctx.find_root().call_on_close(manager.close)
+        else:
+            manager = factory()
+        if settings.get("ready_timeout") is not None:
+            manager.ready_timeout = settings["ready_timeout"]
+        manager.output_format = settings.get("format", "json")
+        settings["manager"] = manager
+    return manager
+
+def check_parallel(cli_manager, parallel):
+    if parallel < 1 or parallel > 4:
+        raise click.UsageError("--parallel must be between 1 and 4")
+    
+    if parallel > 1:
+        plan_type = cli_manager.get_user_plan_type()
+        if plan_type == 'free':
+            raise click.UsageError(
+                "Parallel execution (--parallel > 1) is only available for paid plans. "
+                "Please upgrade your plan to use this feature."
+            )
+
+class JSONListOfDicts(click.ParamType):
+    name = "json_list_of_dicts"
+    def convert(self, value, param, ctx):
+        # value could be a string or an already-loaded Python object
+        if isinstance(value, (list, tuple)):
+            data = value
+        else:
+            try:
+                data = json.loads(value)
+            except json.JSONDecodeError as e:
+                self.fail(f"Invalid JSON: {e}", param, ctx)
+        if not isinstance(data, list):
+            self.fail("Value must be a JSON list", param, ctx)
+        for i, item in enumerate(data):
+            try:
+                check_item(item, i)
+            except PayloadError as e:
+                self.fail(str(e), param, ctx)
+        return data
+
+JSON_LIST = JSONListOfDicts()
+
+def output_format(ctx):
+    """The global ``--format`` of this invocation."""
+    return (ctx.find_root().obj or {}).get("format", "json")
+
+def emit(ctx, output):
+    """Print a command result in the global ``--format``."""
+    from utils.output import write_document
+    write_document(output, output_format(ctx))
+
+def emit_records(ctx, records):
+    """Print records in the global ``--format`` as they are produced; returns how many were printed."""
+    from utils.output import write_records
+    return write_records(records, output_format(ctx))
+
+def parse_shard_option(ctx, param, value):
+    """Click callback turning ``--shard i/N`` into ``(i, N)``."""
+    if value is None:
+        return None
+    from utils.sharding import parse_shard
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+def parse_history_before_option(ctx, param, value):
+    """Click callback turning a ``--history-before`` date-time into epoch seconds."""
+    if value is None:
+        return None
+    from utils.perf_stats import parse_timestamp
+    cutoff = parse_timestamp(value.strip())
+    if cutoff is None:
+        raise click.BadParameter(f"Invalid date-time '{value}', expected e.g. 2024-01-31T12:00:00Z or epoch seconds")
+    return cutoff
+
+def parse_target(value):
+    """Parse a ``PROJECT_ID[:FOLDER_ID]`` target specification."""
+    project_id, _, folder_id = value.strip().partition(":")
+    if not project_id:
+        raise click.BadParameter(f"Invalid target '{value}', expected PROJECT_ID[:FOLDER_ID]")
+    return {"project_id": project_id, "folder_id": folder_id or None}
+
+def read_targets_file(targets_file):
+    """Read targets from a JSON list of objects or from PROJECT_ID[:FOLDER_ID] lines."""
+    content = targets_file.read()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return [parse_target(line) for line in content.splitlines() if line.strip() and not line.strip().startswith("#")]
+    if not isinstance(data, list):
+        raise click.BadParameter("Targets file must contain a JSON list")
+    targets = []
+    for i, item in enumerate(data):
+        if isinstance(item, str):
+            targets.append(parse_target(item))
+        elif isinstance(item, dict) and item.get("project_id"):
+            targets.append({"project_id": item["project_id"], "folder_id": item.get("folder_id")})
+        else:
+            raise click.BadParameter(f"Target {i} must be a string or an object with 'project_id'")
+    return targets
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import click
+from commands.common import get_manager
+from utils.env_config import update_env_file
+
+@click.command()
+@click.option("--set-token", "token", help="set the auth token used by the CLI")
+@click.option("--set-url", "url", help="set the BarkoAgent API URL")
+def config(token, url):
+    """Configure the BarkoAgent URL and auth token"""
+    if token is None and url is None:
+        raise click.UsageError("Provide --set-token, --set-url, or both.")
+    updated = update_env_file(Path(".env"), token=token, url=url)
+    click.echo(f"Configuration updated: URL={updated.get('URL','')}, TOKEN set={bool(updated.get('TOKEN'))}")
+
+
+@click.command()
+@click.option('--project-id', help='only clear cached metadata of this project')
+@click.pass_context
+def clear_cache(ctx, project_id):
+    """Clear the local metadata cache (project names, folders, plan type)"""
+    cli_manager = get_manager(ctx)
+    removed = cli_manager.clear_cache(project_id)
+    click.echo(f"Removed {removed} cached entries")
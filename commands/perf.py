@@ -0,0 +1,29 @@
+import click
+from commands.common import emit, get_manager
+
+@click.command()
+@click.option('--project-id', required=True, help='project ID to analyze')
+@click.option('--reports', type=int, default=20, show_default=True, help='number of latest batch reports to analyze')
+@click.option('--recent', type=int, default=3, show_default=True, help='number of latest runs compared against the older ones')
+@click.option('--slowdown-factor', type=float, default=1.5, show_default=True, help='recent/baseline median ratio that flags a slowdown')
+@click.option('--min-delta', type=float, default=5.0, show_default=True, help='minimum slowdown in seconds to be flagged')
+@click.option('--fail-on-slowdown', is_flag=True, help='exit with code 1 when any test slowed down')
+@click.pass_context
+def perf_report(ctx, project_id, reports, recent, slowdown_factor, min_delta, fail_on_slowdown):
+    """Per-test p50/p95/max durations across past batch reports, with slowdowns flagged"""
+    cli_manager = get_manager(ctx)
+    output = cli_manager.perf_report(project_id, reports=reports, recent=recent, slowdown_factor=slowdown_factor, min_delta=min_delta)
+    emit(ctx, output)
+    if fail_on_slowdown and output["slowdowns"]:
+        ctx.exit(1)
+
+
+@click.command()
+@click.option('--project-id', required=True, help='project ID to report on')
+@click.option('--reports', type=int, default=30, show_default=True, help='number of latest batch reports to include')
+@click.pass_context
+def history_report(ctx, project_id, reports):
+    """HTML page aggregating the latest batch reports of a project"""
+    cli_manager = get_manager(ctx)
+    output = cli_manager.history_report(project_id, reports=reports)
+    emit(ctx, output)
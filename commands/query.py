@@ -0,0 +1,165 @@
+import click
+from commands.common import emit, emit_records, get_manager, JSON_LIST
+from utils.payload_reader import PayloadError, iter_payload
+
+@click.command()
+@click.pass_context
+def login_local(ctx):
+    cli_manager = get_manager(ctx)
+    output = cli_manager.get_local_user_token()
+    click.echo(f"User: email - {output['userEmail']},  username - {output['userName']}, message - {output['message']}")
+
+
+@click.command()
+@click.option('--project-id', help='Get project data information')
+@click.pass_context
+def get_project_data(ctx, project_id):
+    cli_manager = get_manager(ctx)
+    output = cli_manager.get_project_data(project_id)
+    emit(ctx, output)
+
+
+@click.command()
+@click.option('--project-id', help='project ID for running single script')
+@click.option("--payload", type=JSON_LIST, help="JSON list string")
+@click.option("--payload-file", type=click.File("r"), help="File with a JSON list, or JSON Lines, of {chat_id, task_id} objects")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=500, show_default=True, help="items per results request")
+@click.pass_context
+def get_all_results(ctx, project_id, payload, payload_file, chunk_size):
+    cli_manager = get_manager(ctx)
+    if payload_file is not None:
+        payload = iter_payload(payload_file)
+    if payload is None:
+        raise click.UsageError("Provide --payload or --payload-file")
+
+    items = 0
+
+    def counted(payload):
+        nonlocal items
+        for item in payload:
+            items += 1
+            yield item
+
+    try:
+        results = emit_records(ctx, cli_manager.iter_test_results(project_id, counted(payload), chunk_size=chunk_size))
+    except PayloadError as e:
+        raise click.BadParameter(str(e), param_hint="'--payload-file'")
+    click.echo(f"Got {items} items, {results} results", err=True)
+
+
+@click.command()
+@click.option('--project-id', help='project ID for getting the batch test reports list')
+@click.option('--limit', type=int, default=20, show_default=True, help='number of reports to return')
+@click.option('--offset', type=int, default=0, show_default=True, help='number of newest reports to skip')
+@click.option('--from-store', is_flag=True, help='read from the local results store (see sync) instead of the API')
+@click.option('--all', 'all_reports', is_flag=True, help='stream every report as a list, fetching pages concurrently (ignores --limit/--offset)')
+@click.pass_context
+def get_batch_test_reports_list(ctx, project_id, limit, offset, from_store, all_reports):
+    cli_manager = get_manager(ctx)
+    if all_reports:
+        if from_store:
+            emit_records(ctx, cli_manager.get_stored_reports(project_id, limit=None)["reports"])
+        else:
+            emit_records(ctx, cli_manager.iter_batch_reports(project_id))
+        return
+    if from_store:
+        output = cli_manager.get_stored_reports(project_id, limit=limit, offset=offset)
+    else:
+        output = cli_manager.get_batch_test_reports_list(project_id, limit=limit, offset=offset)
+    emit(ctx, output)
+
+
+@click.command()
+@click.option('--batch-report-id', help='batch report ID for getting the specific batch test report')
+@click.pass_context
+def get_batch_report_details(ctx, batch_report_id):
+    cli_manager = get_manager(ctx)
+    output = cli_manager.get_batch_report_details(batch_report_id)
+    emit(ctx, output)
+
+
+@click.command()
+@click.option('--batch-report-id', help='Batch report ID for getting batch executions')
+@click.option('--limit', type=int, default=20, show_default=True, help='number of executions to return')
+@click.option('--offset', type=int, default=0, show_default=True, help='number of executions to skip')
+@click.option('--from-store', is_flag=True, help='read from the local results store (see sync) instead of the API')
+@click.option('--all', 'all_executions', is_flag=True, help='stream every execution as a list, fetching pages concurrently (ignores --limit/--offset)')
+@click.pass_context
+def get_batch_executions(ctx, batch_report_id, limit, offset, from_store, all_executions):
+    cli_manager = get_manager(ctx)
+    if all_executions:
+        if from_store:
+            emit_records(ctx, cli_manager.get_stored_executions(batch_report_id, limit=None)["executions"])
+        else:
+            emit_records(ctx, cli_manager.iter_batch_executions(batch_report_id, normalize=False))
+        return
+    if from_store:
+        output = cli_manager.get_stored_executions(batch_report_id, limit=limit, offset=offset)
+    else:
+        output = cli_manager.get_batch_executions(batch_report_id, limit=limit, offset=offset)
+    emit(ctx, output)
+
+
+@click.command()
+@click.option('--batch-report-id', help='Batch report ID for deleting batch executions')
+@click.pass_context
+def delete_batch_report(ctx, batch_report_id):
+    cli_manager = get_manager(ctx)
+    output = cli_manager.delete_batch_report(batch_report_id)
+    emit(ctx, output)
+
+
+@click.command()
+@click.option('--project-id', required=True, help='project ID to prune batch reports of')
+@click.option('--keep-last', type=click.IntRange(min=0), default=0, show_default=True, help='never delete the newest N reports')
+@click.option('--older-than', help='only delete reports started before this date (2024-01-31) or age (30d, 12h)')
+@click.option('--only-passed', is_flag=True, help='only delete reports without failed tests')
+@click.option('--dry-run', is_flag=True, help='list the reports that would be deleted without deleting them')
+@click.option('--workers', type=click.IntRange(1, 32), default=8, show_default=True, help='number of deletes in flight at once')
+@click.pass_context
+def prune_reports(ctx, project_id, keep_last, older_than, only_passed, dry_run, workers):
+    """Delete batch reports selected by retention rules"""
+    from utils.retention import parse_cutoff
+
+    if not keep_last and older_than is None:
+        raise click.UsageError("Provide --keep-last and/or --older-than")
+    cutoff = None
+    if older_than is not None:
+        try:
+            cutoff = parse_cutoff(older_than)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="'--older-than'")
+
+    cli_manager = get_manager(ctx)
+    output = cli_manager.prune_reports(
+        project_id,
+        keep_last=keep_last,
+        older_than=cutoff,
+        only_passed=only_passed,
+        dry_run=dry_run,
+        workers=workers
+    )
+    emit(ctx, output)
+    if output["failed"]:
+        ctx.exit(1)
+
+
+@click.command()
+@click.option('--project-id', required=True, help='project ID for getting folders')
+@click.option('--cached', is_flag=True, help='accept a folder list cached up to 10 minutes ago')
+@click.pass_context
+def get_folders(ctx, project_id, cached):
+    """Get all folders for a project"""
+    cli_manager = get_manager(ctx)
+    output = cli_manager.get_folders(project_id, use_cache=cached)
+    emit(ctx, output)
+
+
+@click.command()
+@click.option('--project-id', required=True, help='project ID whose batch reports are synced')
+@click.pass_context
+def sync(ctx, project_id):
+    """Sync new batch reports and their executions into the local results store"""
+    cli_manager = get_manager(ctx)
+    output = cli_manager.sync_results(project_id)
+    emit(ctx, output)
@@ -0,0 +1,124 @@
+import click
+from commands.common import check_parallel, emit, get_manager, parse_history_before_option, parse_shard_option, parse_target, read_targets_file
+
+@click.command()
+@click.option('--project-id', help='project ID for running single script')
+@click.option('--chat-id', help='chat ID for running single script')
+@click.option('--junit', is_flag=True, help='generate junit xml report')
+@click.option('--html', is_flag=True, help='generate html report')
+@click.pass_context
+def run_single_script(ctx, project_id, chat_id, junit, html):
+    cli_manager = get_manager(ctx)
+    output = cli_manager.run_single_script(project_id, chat_id, junit=junit, html=html, return_data=not junit)
+    if not junit:
+        emit(ctx, output)
+
+
+@click.command()
+@click.option('--project-id', help='project ID for running single script')
+@click.option('--junit', is_flag=True, help='generate junit xml report')
+@click.option('--html', is_flag=True, help='generate html report')
+@click.option('--parallel', type=int, default=1, help='parallelism level (1-4). Values > 1 require a paid plan.')
+@click.option('--shard', callback=parse_shard_option, help='run only shard i of N (e.g. 2/4), balanced by historical test durations')
+@click.option('--history-before', callback=parse_history_before_option, help='with --shard: balance by batches completed before this date-time (e.g. the pipeline start), so nodes started at different times split alike')
+@click.option('--rerun-failed', metavar='BATCH_REPORT_ID|last', help="rerun only the failed tests of a batch (or of the project's latest finished project or folder batch) and merge the reports")
+@click.option('--changed-only', is_flag=True, help='run only new, changed or previously failing tests; the others are reported as skipped')
+@click.pass_context
+def run_all_scripts(ctx, project_id, junit, html, parallel, shard, history_before, rerun_failed, changed_only):
+    cli_manager = get_manager(ctx)
+    
+    if history_before is not None and not shard:
+        raise click.UsageError("--history-before only applies to --shard")
+    
+    if changed_only:
+        if shard or rerun_failed or parallel != 1:
+            raise click.UsageError("--changed-only cannot be combined with --shard, --rerun-failed or --parallel")
+        output = cli_manager.run_changed(project_id, junit=junit, html=html, return_data=not junit)
+        if not junit:
+            emit(ctx, output)
+        return
+    
+    if rerun_failed:
+        if shard or parallel != 1:
+            raise click.UsageError("--rerun-failed cannot be combined with --shard or --parallel")
+        output = cli_manager.rerun_failed(project_id, rerun_failed, junit=junit, html=html, return_data=not junit)
+        if not junit:
+            emit(ctx, output)
+        return
+    
+    if shard:
+        if parallel != 1:
+            raise click.UsageError("--shard runs one batch per test and cannot be combined with --parallel")
+        output = cli_manager.run_shard(project_id, *shard, junit=junit, html=html, return_data=not junit, history_before=history_before)
+        if not junit:
+            emit(ctx, output)
+        return
+    
+    check_parallel(cli_manager, parallel)
+    
+    output = cli_manager.run_all_scripts(project_id, junit=junit, html=html, return_data=not junit, parallelism=parallel)
+    if not junit:
+        emit(ctx, output)
+
+
+@click.command()
+@click.option('--target', 'target_specs', multiple=True, help='target to run as PROJECT_ID[:FOLDER_ID] (repeatable)')
+@click.option('--targets-file', type=click.File('r'), help='file with a JSON list of targets or one PROJECT_ID[:FOLDER_ID] per line')
+@click.option('--junit', is_flag=True, help='generate per-target and combined junit xml reports')
+@click.option('--html', is_flag=True, help='generate per-target and combined html reports')
+@click.option('--parallel', type=int, default=1, help='parallelism level (1-4) for every target. Values > 1 require a paid plan.')
+@click.pass_context
+def run_many(ctx, target_specs, targets_file, junit, html, parallel):
+    """Run many projects/folders concurrently with one combined dashboard"""
+    cli_manager = get_manager(ctx)
+    
+    targets = [parse_target(spec) for spec in target_specs]
+    if targets_file is not None:
+        targets.extend(read_targets_file(targets_file))
+    if not targets:
+        raise click.UsageError("Provide at least one --target or a --targets-file")
+    
+    check_parallel(cli_manager, parallel)
+    
+    output = cli_manager.run_many(targets, junit=junit, html=html, parallelism=parallel)
+    emit(ctx, output)
+    ctx.exit(output["exit_code"])
+
+
+@click.command()
+@click.option('--project-id', required=True, help='project ID for running folder scripts')
+@click.option('--folder-id', required=True, help='folder ID to run all scripts from')
+@click.option('--junit', is_flag=True, help='generate junit xml report')
+@click.option('--html', is_flag=True, help='generate html report')
+@click.option('--parallel', type=int, default=1, help='parallelism level (1-4). Values > 1 require a paid plan.')
+@click.option('--shard', callback=parse_shard_option, help='run only shard i of N (e.g. 2/4), balanced by historical test durations')
+@click.option('--history-before', callback=parse_history_before_option, help='with --shard: balance by batches completed before this date-time (e.g. the pipeline start), so nodes started at different times split alike')
+@click.option('--changed-only', is_flag=True, help='run only new, changed or previously failing tests; the others are reported as skipped')
+@click.pass_context
+def run_folder(ctx, project_id, folder_id, junit, html, parallel, shard, history_before, changed_only):
+    cli_manager = get_manager(ctx)
+    
+    if history_before is not None and not shard:
+        raise click.UsageError("--history-before only applies to --shard")
+    
+    if changed_only:
+        if shard or parallel != 1:
+            raise click.UsageError("--changed-only cannot be combined with --shard or --parallel")
+        output = cli_manager.run_changed(project_id, folder_id=folder_id, junit=junit, html=html, return_data=not junit)
+        if not junit:
+            emit(ctx, output)
+        return
+    
+    if shard:
+        if parallel != 1:
+            raise click.UsageError("--shard runs one batch per test and cannot be combined with --parallel")
+        output = cli_manager.run_shard(project_id, *shard, folder_id=folder_id, junit=junit, html=html, return_data=not junit, history_before=history_before)
+        if not junit:
+            emit(ctx, output)
+        return
+    
+    check_parallel(cli_manager, parallel)
+    
+    output = cli_manager.run_folder(project_id, folder_id, junit=junit, html=html, return_data=not junit, parallelism=parallel)
+    if not junit:
+        emit(ctx, output)
@@ -1,194 +1,91 @@
-import json
+import importlib
+import sys
 
-import click
-from cli_manager import CLIManager
-
-class JSONListOfDicts(click.ParamType):
-    name = "json_list_of_dicts"
-    def convert(self, value, param, ctx):
-        # value could be a string or an already-loaded Python object
-        if isinstance(value, (list, tuple)):
-            data = value
-        else:
-            try:
-                data = json.loads(value)
-            except json.JSONDecodeError as e:
-                self.fail(f"Invalid JSON: {e}", param, ctx)
-        if not isinstance(data, list):
-            self.fail("Value must be a JSON list", param, ctx)
-        for i, item in enumerate(data):
-            if not isinstance(item, dict):
-                self.fail(f"Item {i} is not an object", param, ctx)
-            if "chat_id" not in item or "task_id" not in item:
-                self.fail(f"Item {i} must contain 'chat_id' and 'task_id'", param, ctx)
-        return data
+if __name__ == '__main__':
+    # Hand the invocation to a running agent (see utils.agent) before importing anything heavier
+    from utils.agent import forward
+    forwarded = forward(sys.argv[1:])
+    if forwarded is not None:
+        sys.exit(forwarded)
 
-JSON_LIST = JSONListOfDicts()
+import click
 
-@click.group()
+# Command name -> (module, function, short help). Command modules, and the
+# dependencies they pull in, are only imported when that command is run, so
+# `--help` and `config` start without loading requests, rich or asyncio.
+COMMANDS = {
+    "config": ("commands.config", "config", "Configure the BarkoAgent URL and auth token"),
+    "clear-cache": ("commands.config", "clear_cache", "Clear the local metadata cache"),
+    "login-local": ("commands.query", "login_local", "Log in against a local BarkoAgent"),
+    "get-project-data": ("commands.query", "get_project_data", "Get project data information"),
+    "get-all-results": ("commands.query", "get_all_results", "Get the results of a list of tasks"),
+    "get-batch-test-reports-list": ("commands.query", "get_batch_test_reports_list", "List the batch test reports of a project"),
+    "get-batch-report-details": ("commands.query", "get_batch_report_details", "Get a specific batch test report"),
+    "get-batch-executions": ("commands.query", "get_batch_executions", "Get the executions of a batch report"),
+    "delete-batch-report": ("commands.query", "delete_batch_report", "Delete a batch report"),
+    "prune-reports": ("commands.query", "prune_reports", "Delete batch reports by retention rules"),
+    "get-folders": ("commands.query", "get_folders", "Get all folders for a project"),
+    "sync": ("commands.query", "sync", "Sync batch reports into the local results store"),
+    "perf-report": ("commands.perf", "perf_report", "Per-test duration statistics and slowdowns"),
+    "history-report": ("commands.perf", "history_report", "HTML history of the latest batch reports"),
+    "run-single-script": ("commands.run", "run_single_script", "Run a single script"),
+    "run-all-scripts": ("commands.run", "run_all_scripts", "Run all scripts of a project"),
+    "run-folder": ("commands.run", "run_folder", "Run all scripts of a folder"),
+    "run-many": ("commands.run", "run_many", "Run many projects/folders concurrently"),
+    "agent": ("commands.agent", "agent", "Start, stop or inspect the background agent"),
+}
+
+
+class LazyGroup(click.Group):
+    def list_commands(self, ctx):
+        return sorted(COMMANDS)
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in COMMANDS:
+            return None
+        module_name, attribute, _ = COMMANDS[cmd_name]
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def format_commands(self, ctx, formatter):
+        # Use the registry's short help so listing commands imports nothing
+        rows = [(name, COMMANDS[name][2]) for name in self.list_commands(ctx)]
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+    def invoke(self, ctx):
+        try:
+            return super().invoke(ctx)
+        except Exception as e:
+            # Only look for ReadinessTimeoutError when a command actually loaded it
+            readiness = sys.modules.get("utils.readiness")
+            if readiness is not None and isinstance(e, readiness.ReadinessTimeoutError):
+                raise click.ClickException(str(e)) from e
+            raise
+
+@click.group(cls=LazyGroup)
 @click.option('--config', default='config.yml')
+@click.option('--ready-timeout', type=float, default=None, help='seconds to wait for the project brain to become ready (default 900, env BARKO_READY_TIMEOUT)')
+@click.option('--trace', 'trace_file', type=click.Path(dir_okay=False), default=None, help='record HTTP calls, poll ticks and report stages to FILE as Chrome trace-event JSON')
+@click.option('--profile', 'profile_file', type=click.Path(dir_okay=False), default=None, help='profile the command with cProfile/tracemalloc and write a summary to FILE')
+@click.option('--format', 'output_format', type=click.Choice(["json", "compact", "jsonl"]), default="json", show_default=True, help='output format: indented JSON, one-line JSON, or one record per line as records arrive')
 @click.pass_context
-def cli(ctx, config):
-    if ctx.invoked_subcommand != 'config':
-        ctx.ensure_object(CLIManager)
-
-@cli.command()
-@click.option("--set-token", "token", help="set the auth token used by the CLI")
-@click.option("--set-url", "url", help="set the BarkoAgent API URL")
-def config(token, url):
-    if token is None and url is None:
-        raise click.UsageError("Provide --set-token, --set-url, or both.")
-    cli_manager = CLIManager(skip_validation=True)
-    updated = cli_manager.configure(token=token, url=url)
-    click.echo(f"Configuration updated: URL={updated.get('URL','')}, TOKEN set={bool(updated.get('TOKEN'))}")
-
-@cli.command()
-@click.pass_context
-def login_local(ctx):
-    cli_manager = ctx.obj
-    output = cli_manager.get_local_user_token()
-    click.echo(f"User: email - {output['userEmail']},  username - {output['userName']}, message - {output['message']}")
-
-
-@cli.command()
-@click.option('--project-id', help='Get project data information')
-@click.pass_context
-def get_project_data(ctx, project_id):
-    cli_manager = ctx.obj
-    output = cli_manager.get_project_data(project_id)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-@cli.command()
-@click.option('--project-id', help='project ID for running single script')
-@click.option('--chat-id', help='chat ID for running single script')
-@click.option('--junit', is_flag=True, help='generate junit xml report')
-@click.option('--html', is_flag=True, help='generate html report')
-@click.pass_context
-def run_single_script(ctx, project_id, chat_id, junit, html):
-    cli_manager = ctx.obj
-    output = cli_manager.run_single_script(project_id, chat_id, junit=junit, html=html, return_data=not junit)
-    if not junit:
-        pretty = json.dumps(output, indent=2, ensure_ascii=False)
-        click.echo(pretty)
-
-
-@cli.command()
-@click.option('--project-id', help='project ID for running single script')
-@click.option('--junit', is_flag=True, help='generate junit xml report')
-@click.option('--html', is_flag=True, help='generate html report')
-@click.option('--parallel', type=int, default=1, help='parallelism level (1-4). Values > 1 require a paid plan.')
-@click.pass_context
-def run_all_scripts(ctx, project_id, junit, html, parallel):
-    cli_manager = ctx.obj
-    
-    if parallel < 1 or parallel > 4:
-        raise click.UsageError("--parallel must be between 1 and 4")
-    
-    if parallel > 1:
-        plan_type = cli_manager.get_user_plan_type()
-        if plan_type == 'free':
-            raise click.UsageError(
-                "Parallel execution (--parallel > 1) is only available for paid plans. "
-                "Please upgrade your plan to use this feature."
-            )
-    
-    output = cli_manager.run_all_scripts(project_id, junit=junit, html=html, return_data=not junit, parallelism=parallel)
-    if not junit:
-        pretty = json.dumps(output, indent=2, ensure_ascii=False)
-        click.echo(pretty)
-
-
-@cli.command()
-@click.option('--project-id', help='project ID for running single script')
-@click.option("--payload", type=JSON_LIST, help="JSON list string")
-@click.option("--payload-file", type=click.File("r"), help="File with JSON list")
-@click.pass_context
-def get_all_results(ctx, project_id, payload, payload_file):
-    cli_manager = ctx.obj
-    if payload_file is not None:
-        payload = JSON_LIST.convert(payload_file.read(), param=None, ctx=None)
-    if payload is None:
-        raise click.UsageError("Provide --payload or --payload-file")
-    click.echo(f"Got {len(payload)} items")
-
-
-    output = cli_manager.get_test_results(project_id, payload)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-@cli.command()
-@click.option('--project-id', help='project ID for getting the batch test reports list')
-@click.pass_context
-def get_batch_test_reports_list(ctx, project_id):
-    cli_manager = ctx.obj
-    output = cli_manager.get_batch_test_reports_list(project_id)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-
-@cli.command()
-@click.option('--batch-report-id', help='batch report ID for getting the specific batch test report')
-@click.pass_context
-def get_batch_report_details(ctx, batch_report_id):
-    cli_manager = ctx.obj
-    output = cli_manager.get_batch_report_details(batch_report_id)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-@cli.command()
-@click.option('--batch-report-id', help='Batch report ID for getting batch executions')
-@click.pass_context
-def get_batch_executions(ctx, batch_report_id):
-    cli_manager = ctx.obj
-    output = cli_manager.get_batch_executions(batch_report_id)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-@cli.command()
-@click.option('--batch-report-id', help='Batch report ID for deleting batch executions')
-@click.pass_context
-def delete_batch_report(ctx, batch_report_id):
-    cli_manager = ctx.obj
-    output = cli_manager.delete_batch_report(batch_report_id)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-@cli.command()
-@click.option('--project-id', required=True, help='project ID for getting folders')
-@click.pass_context
-def get_folders(ctx, project_id):
-    """Get all folders for a project"""
-    cli_manager = ctx.obj
-    output = cli_manager.get_folders(project_id)
-    pretty = json.dumps(output, indent=2, ensure_ascii=False)
-    click.echo(pretty)
-
-@cli.command()
-@click.option('--project-id', required=True, help='project ID for running folder scripts')
-@click.option('--folder-id', required=True, help='folder ID to run all scripts from')
-@click.option('--junit', is_flag=True, help='generate junit xml report')
-@click.option('--html', is_flag=True, help='generate html report')
-@click.option('--parallel', type=int, default=1, help='parallelism level (1-4). Values > 1 require a paid plan.')
-@click.pass_context
-def run_folder(ctx, project_id, folder_id, junit, html, parallel):
-    cli_manager = ctx.obj
-    
-    if parallel < 1 or parallel > 4:
-        raise click.UsageError("--parallel must be between 1 and 4")
-    
-    if parallel > 1:
-        plan_type = cli_manager.get_user_plan_type()
-        if plan_type == 'free':
-            raise click.UsageError(
-                "Parallel execution (--parallel > 1) is only available for paid plans. "
-                "Please upgrade your plan to use this feature."
-            )
-    
-    output = cli_manager.run_folder(project_id, folder_id, junit=junit, html=html, return_data=not junit, parallelism=parallel)
-    if not junit:
-        pretty = json.dumps(output, indent=2, ensure_ascii=False)
-        click.echo(pretty)
+def cli(ctx, config, ready_timeout, trace_file, profile_file, output_format):
+    # The CLIManager itself is created lazily by commands.common.get_manager;
+    # the agent passes an obj with the factory of its pooled managers
+    ctx.ensure_object(dict).update({"ready_timeout": ready_timeout, "format": output_format})
+
+    # Resources are released in reverse order: the command span closes, then
+    # the trace is exported, then the profile is written
+    if profile_file:
+        from utils.profiling import start_profiling
+        stop_profiling = start_profiling(profile_file)
+        ctx.call_on_close(lambda: click.echo(f"Profile written to {stop_profiling()}", err=True))
+    if trace_file:
+        from utils.tracing import tracer
+        tracer.enable()
+        ctx.call_on_close(lambda: click.echo(f"Trace written to {tracer.export(trace_file)}", err=True))
+        ctx.with_resource(tracer.span(ctx.invoked_subcommand or "cli", "command"))
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
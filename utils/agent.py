@@ -0,0 +1,150 @@
+"""
+Background agent serving CLI invocations over a Unix socket (``runner.py agent start``).
+
+The agent runs commands in-process with warm imports, HTTP connection pools
+and metadata caches. ``runner.py`` forwards an invocation to the agent of
+its working directory when one is running, streams the output back and
+exits with the command's exit code. Invocations run locally instead when
+there is no agent, when ``BARKO_NO_AGENT`` is set, or when the agent was
+started with different settings (environment, ``.env`` or directory).
+
+The client side of this module only uses the standard library, so a
+forwarded invocation imports neither click nor requests.
+
+Protocol: one JSON request line per connection, then JSON response lines
+``{"out": text}``, ``{"err": text}`` and a final ``{"exit": code}``,
+``{"fallback": reason}`` (run locally) or a single status document.
+"""
+import hashlib
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.metadata_cache import default_cache_dir
+
+# Commands that must run in the invoking process
+LOCAL_COMMANDS = frozenset({"agent", "config"})
+# Global options taking a value, to find the command name in argv
+_GLOBAL_VALUE_OPTIONS = frozenset({"--config", "--ready-timeout", "--trace", "--profile", "--format"})
+# Environment variables the agent must agree on with the invoking process
+_AGENT_VARIABLES = frozenset({"BARKO_AGENT_SOCKET", "BARKO_NO_AGENT"})
+
+
+def socket_path(cwd: Optional[str] = None) -> Path:
+    """The agent socket for a working directory (``BARKO_AGENT_SOCKET`` overrides it)."""
+    configured = os.getenv("BARKO_AGENT_SOCKET")
+    if configured:
+        return Path(configured)
+    directory = os.path.realpath(cwd or os.getcwd())
+    return default_cache_dir() / "agent" / f"{hashlib.sha256(directory.encode('utf-8')).hexdigest()[:16]}.sock"
+
+
+def relevant_environment() -> Dict[str, str]:
+    """The environment variables that change what a command does."""
+    return {
+        key: value for key, value in os.environ.items()
+        if (key in ("URL", "TOKEN") or key.startswith("BARKO_")) and key not in _AGENT_VARIABLES
+    }
+
+
+def env_file_state(cwd: Optional[str] = None) -> Optional[List[float]]:
+    try:
+        stat = (Path(cwd or os.getcwd()) / ".env").stat()
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def command_name(argv: List[str]) -> Optional[str]:
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in _GLOBAL_VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def should_forward(argv: List[str]) -> bool:
+    """
+    Whether an invocation may run in the agent.
+
+    Commands that configure the CLI or manage the agent, invocations that
+    read stdin (``-`` arguments) and ``--trace``/``--profile`` runs, which
+    measure the process itself, always run locally.
+    """
+    if os.getenv("BARKO_NO_AGENT"):
+        return False
+    if command_name(argv) in LOCAL_COMMANDS:
+        return False
+    return not any(arg == "-" or arg.startswith(("--trace", "--profile")) for arg in argv)
+
+
+def request(message: Dict[str, Any], path: Optional[Path] = None, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """Connect to the agent and send a request; returns None when no agent is listening."""
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(str(path))
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+
+def query(op: str, path: Optional[Path] = None, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """Send a control request (``status``, ``stop``) and return the agent's answer, or None when it is not running."""
+    connection = request({"op": op}, path, timeout)
+    if connection is None:
+        return None
+    with connection, connection.makefile("r", encoding="utf-8") as responses:
+        line = responses.readline()
+    return json.loads(line) if line else None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Run an invocation in the agent of the working directory.
+
+    Returns:
+        The command's exit code, or None when it has to run locally
+    """
+    if not should_forward(argv):
+        return None
+    cwd = os.getcwd()
+    connection = request({
+        "op": "run",
+        "argv": argv,
+        "cwd": cwd,
+        "env": relevant_environment(),
+        "env_file": env_file_state(cwd),
+    })
+    if connection is None:
+        return None
+    streams = {"out": sys.stdout, "err": sys.stderr}
+    with connection, connection.makefile("r", encoding="utf-8") as responses:
+        try:
+            for line in responses:
+                message = json.loads(line)
+                if "fallback" in message:
+                    return None
+                if "exit" in message:
+                    return message["exit"]
+                for key, stream in streams.items():
+                    if key in message:
+                        stream.write(message[key])
+                        stream.flush()
+        except KeyboardInterrupt:
+            # The command keeps running in the agent, so its reports are still written
+            return 130
+    print("The BarkoAgent CLI agent closed the connection before the command finished", file=sys.stderr)
+    return 1
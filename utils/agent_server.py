@@ -0,0 +1,282 @@
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+from utils import agent
+
+_local = threading.local()
+
+
+class _ThreadStream:
+    """
+    Stand-in for sys.stdout/sys.stderr that writes to the client of the current thread.
+
+    Commands run on the request thread, so their output goes to the client
+    that invoked them; output from any other thread goes to the agent's own
+    stream (its log).
+    """
+
+    def __init__(self, original: TextIO, name: str):
+        self._original = original
+        self._name = name
+
+    def _target(self) -> TextIO:
+        return getattr(_local, self._name, None) or self._original
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._target().isatty()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+
+class _ClientStream:
+    """Text stream sending each write to the client as one ``{key: text}`` line."""
+
+    encoding = "utf-8"
+    errors = "strict"
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None], key: str):
+        self._send = send
+        self._key = key
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            # Like any text stream; click probes streams with write(b"") to tell binary ones apart
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text:
+            self._send({self._key: text})
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        # Forwarded output is not a terminal, so dashboards use their plain form
+        return False
+
+    def writable(self) -> bool:
+        return True
+
+
+class ManagerPool:
+    """
+    CLIManagers kept warm between invocations.
+
+    Each running invocation gets a manager of its own, so concurrent
+    invocations never share per-invocation state such as the output format;
+    sequential invocations reuse the same manager with its open connections
+    and caches.
+    """
+
+    def __init__(self):
+        self._idle: List[Any] = []
+        self._defaults: Dict[int, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def acquire(self) -> Any:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        from cli_manager import CLIManager
+        manager = CLIManager()
+        with self._lock:
+            self._defaults[id(manager)] = manager.ready_timeout
+            self.created += 1
+        return manager
+
+    def close(self) -> None:
+        """Close the idle managers, releasing their event loops, thread pools and connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for manager in idle:
+            manager.close()
+
+    def release(self, manager: Any) -> None:
+        # Options of the finished invocation must not leak into the next one
+        manager.ready_timeout = self._defaults[id(manager)]
+        manager.output_format = "json"
+        with self._lock:
+            self._idle.append(manager)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "AgentServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return
+        op = message.get("op")
+        if op == "run":
+            self.server.run(message, self._send)
+        elif op == "status":
+            self._send(self.server.status())
+        elif op == "stop":
+            self._send(dict(self.server.status(), stopping=True))
+            self.server.stop()
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            self.wfile.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError:
+            # The client went away; the command still runs to completion so its reports are written
+            pass
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves CLI invocations of one working directory.
+
+    Invocations run concurrently, one thread each, through the same click
+    group as ``runner.py``. The agent refuses (and the client runs the
+    command itself) when the invocation's relevant environment, ``.env``
+    file or working directory differ from the agent's, since the pooled
+    managers were created with the agent's settings.
+
+    Args:
+        path: Socket path
+        idle_timeout: Stop after this many seconds without a request (0 never)
+    """
+
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, path: Path, idle_timeout: float = 3600.0):
+        self.path = Path(path)
+        self.idle_timeout = idle_timeout
+        self.cwd = os.getcwd()
+        # Taken before any manager loads .env into the environment
+        self.environment = agent.relevant_environment()
+        self.env_file = agent.env_file_state(self.cwd)
+        self.managers = ManagerPool()
+        self.started_at = time.time()
+        self.last_activity = self.started_at
+        self.requests = 0
+        self.active = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if self.path.exists():
+            if agent.query("status", self.path) is not None:
+                raise RuntimeError(f"An agent is already running on {self.path}")
+            self.path.unlink()
+        super().__init__(str(self.path), _Handler)
+
+    def server_bind(self) -> None:
+        # The agent acts with the user's token, so only the user may connect. The
+        # umask has bind() create the socket owner-only, leaving no window in which
+        # another user could connect before the chmod
+        previous = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(previous)
+        os.chmod(self.path, 0o600)
+
+    def incompatibility(self, message: Dict[str, Any]) -> Optional[str]:
+        if message.get("cwd") != self.cwd:
+            return "working directory differs from the agent's"
+        if message.get("env") != self.environment:
+            return "environment differs from the agent's"
+        if message.get("env_file") != self.env_file:
+            return ".env changed since the agent started"
+        return None
+
+    def run(self, message: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> None:
+        reason = self.incompatibility(message)
+        if reason:
+            send({"fallback": reason})
+            return
+        from runner import cli
+
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+        leased: List[Any] = []
+
+        def lease() -> Any:
+            leased.append(self.managers.acquire())
+            return leased[-1]
+
+        _local.stdout = _ClientStream(send, "out")
+        _local.stderr = _ClientStream(send, "err")
+        exit_code = 0
+        try:
+            cli.main(args=list(message.get("argv") or []), prog_name="runner.py", obj={"manager_factory": lease})
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            _local.stdout = _local.stderr = None
+            for manager in leased:
+                self.managers.release(manager)
+            with self._lock:
+                self.active -= 1
+                self.last_activity = time.time()
+        send({"exit": exit_code})
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": True,
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "cwd": self.cwd,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "active": self.active,
+            "managers": self.managers.created,
+        }
+
+    def stop(self) -> None:
+        # shutdown() waits for serve_forever, so it cannot run on a request or signal handler's thread
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def service_actions(self) -> None:
+        if self.idle_timeout and not self.active and time.time() - self.last_activity > self.idle_timeout:
+            self.stop()
+
+    def server_close(self) -> None:
+        # Waits for running invocations to finish, so every manager is back in the pool
+        super().server_close()
+        self.managers.close()
+        self.path.unlink(missing_ok=True)
+
+
+def serve(path: Path, idle_timeout: float = 3600.0) -> None:
+    """Run an agent in the current process until it is stopped, idles out or gets SIGTERM/SIGINT."""
+    server = AgentServer(path, idle_timeout)
+    sys.stdout = _ThreadStream(sys.stdout, "stdout")
+    sys.stderr = _ThreadStream(sys.stderr, "stderr")
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: server.stop())
+    print(f"Agent {os.getpid()} listening on {path}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever(poll_interval=1.0)
+    finally:
+        server.server_close()
+        print(f"Agent {os.getpid()} stopped", file=sys.stderr, flush=True)
@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncTransport:
+    """
+    Asyncio front for blocking HTTP calls.
+
+    Calls are dispatched to a dedicated thread pool so that independent
+    requests made from coroutines overlap, while a semaphore bounds how many
+    are in flight at once. Synchronous code drives coroutines with run(),
+    which reuses one event loop, so a command polling for minutes does not
+    build a loop per tick. Both live until close().
+    """
+
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="barko-io")
+        self._semaphores: dict[int, asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(id(loop))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores = {id(loop): semaphore}
+        return semaphore
+
+    async def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine to completion on the transport's event loop, from synchronous code."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("run() cannot be called from a running event loop; await the coroutine instead")
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        if self._loop is not None:
+            try:
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            finally:
+                self._loop.close()
+                self._loop = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
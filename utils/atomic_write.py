@@ -0,0 +1,28 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Callable
+
+
+def write_atomically(output_path: str | Path, write: Callable[[IO], None], binary: bool = False) -> Path:
+    """
+    Write a file through ``write(handle)`` without ever exposing a partial file.
+
+    The content goes to a temporary file in the target directory, which is
+    renamed over ``output_path`` once complete and removed on failure, so
+    concurrent readers see either the old or the new file.
+
+    Returns:
+        The output path
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(prefix=f".{output_path.name}.", suffix=".tmp", dir=output_path.parent)
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8")) as handle:
+            write(handle)
+        os.replace(temp_name, output_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return output_path
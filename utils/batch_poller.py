@@ -0,0 +1,157 @@
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.perf_stats import server_duration
+
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "partial_failed"}
+
+
+class BatchSnapshot:
+    """
+    Local snapshot of a running batch used to poll it incrementally.
+
+    Executions are diffed against the last seen status so that only changed
+    records are normalized, and completed executions are frozen the first time
+    they are seen (their output is never read again). The batch report counters
+    decide whether the execution list needs to be fetched at all on a tick,
+    and the positions of the executions in the listing let later ticks
+    request only the ranges that still hold pending executions.
+
+    Test durations come from the server's execution timestamps when present;
+    otherwise they are measured from the first time the execution was seen.
+    With ``expected`` (historical duration per chat ID) the snapshot also
+    keeps the expected remaining run time of its pending tests.
+    """
+
+    def __init__(self, normalize: Callable[[Dict[str, Any]], Dict[str, Any]], chat_id: str = None, expected: Optional[Dict[str, float]] = None):
+        self.chat_id = chat_id
+        self.expected = expected or {}
+        self.expected_remaining = 0.0
+        self._expected_default = sum(self.expected.values()) / len(self.expected) if self.expected else 0.0
+        self._expected_pending: Dict[str, float] = {}
+        self.completed: List[Dict[str, Any]] = []
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.failure_detected = False
+        self._normalize = normalize
+        self._done: Set[str] = set()
+        self._statuses: Dict[str, str] = {}
+        self._start_times: Dict[str, float] = {}
+        self._counters: Optional[Tuple[Any, ...]] = None
+        self._positions: Dict[int, str] = {}
+
+    @staticmethod
+    def _report_counters(batch_report: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (
+            batch_report.get("status"),
+            batch_report.get("total_chats"),
+            batch_report.get("total_passed"),
+            batch_report.get("total_failed"),
+        )
+
+    def needs_executions(self, batch_report: Dict[str, Any]) -> bool:
+        """Return True when the execution list may have changed since the last fetch."""
+        counters = self._report_counters(batch_report)
+        if self._counters is None or counters[2] is None or counters[3] is None:
+            return True
+        if len(self._statuses) < (counters[1] or 0) and not self.chat_id:
+            return True
+        return counters != self._counters
+
+    def is_complete(self, exec_id: str) -> bool:
+        return exec_id in self._done
+
+    @property
+    def known_executions(self) -> int:
+        return len(self._positions)
+
+    def record_positions(self, chunks: Iterable[Tuple[int, List[Dict[str, Any]]]]) -> None:
+        """Remember the listing position of every execution in ``(offset, executions)`` chunks."""
+        for offset, executions in chunks:
+            for index, execution in enumerate(executions):
+                self._positions[offset + index] = execution.get("chat_id", "")
+
+    def fetch_plan(self, page_size: int) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Plan the next fetch of the execution list.
+
+        Every full page of known positions is narrowed to the window between
+        its first and last pending execution and skipped once none is left,
+        so completed executions are not downloaded again. Everything after
+        the known full pages is listed page by page.
+
+        Returns:
+            Tuple of (``(offset, limit)`` windows, offset the paginated listing starts at)
+        """
+        windows: List[Tuple[int, int]] = []
+        offset = 0
+        while all(i in self._positions for i in range(offset, offset + page_size)):
+            pending = [
+                i for i in range(offset, offset + page_size)
+                if self._positions[i] not in self._done and (not self.chat_id or self._positions[i] == self.chat_id)
+            ]
+            if pending:
+                windows.append((pending[0], pending[-1] + 1 - pending[0]))
+            offset += page_size
+        return windows, offset
+
+    def record_report(self, batch_report: Dict[str, Any]) -> None:
+        self._counters = self._report_counters(batch_report)
+
+    def apply(self, executions: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Merge raw executions into the snapshot.
+
+        Returns:
+            Tuple of (executions seen, executions whose status changed)
+        """
+        seen = 0
+        changes = 0
+        now = time.time()
+        for execution in executions:
+            seen += 1
+            exec_id = execution.get("chat_id", "")
+            if self.chat_id and exec_id != self.chat_id:
+                continue
+            if exec_id in self._done:
+                continue
+
+            self._start_times.setdefault(exec_id, now)
+            status = (execution.get("status") or "").lower()
+            if self._statuses.get(exec_id) == status:
+                continue
+            self._statuses[exec_id] = status
+            changes += 1
+
+            test = self._normalize(execution)
+            if test["complete"]:
+                self._done.add(exec_id)
+                self.pending.pop(exec_id, None)
+                self.expected_remaining -= self._expected_pending.pop(exec_id, 0.0)
+                duration = server_duration(execution)
+                test["time"] = duration if duration is not None else max(0.0, now - self._start_times[exec_id])
+                self.completed.append(test)
+                if test["failed"]:
+                    self.failure_detected = True
+            else:
+                self.pending[exec_id] = test
+                if self.expected and exec_id not in self._expected_pending:
+                    self._expected_pending[exec_id] = self.expected.get(exec_id, self._expected_default)
+                    self.expected_remaining += self._expected_pending[exec_id]
+        return seen, changes
+
+
+class AdaptiveInterval:
+    """Poll interval that tightens while a batch is changing and backs off while it is idle."""
+
+    def __init__(self, minimum: float = 1.0, initial: float = 2.0, maximum: float = 10.0, backoff: float = 1.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.current = initial
+
+    def next(self, changed: bool) -> float:
+        if changed:
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * self.backoff)
+        return self.current
@@ -0,0 +1,291 @@
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from rich.console import Console
+from rich.live import Live
+from rich.markup import escape
+from rich.text import Text
+
+from utils.batch_poller import BatchSnapshot
+
+# Batches up to this many tests list every test; larger ones get the windowed view
+FULL_VIEW_LIMIT = 40
+
+
+def dashboard_mode(console: Console) -> str:
+    """
+    Pick how progress is shown: ``live`` (redrawn in place) on a terminal,
+    ``plain`` (one log line per change) otherwise. BARKO_DASHBOARD=live|plain
+    overrides the detection. The third mode, ``jsonl`` (each completed test
+    as a JSON line on stdout), is only used when requested explicitly.
+    """
+    configured = (os.getenv("BARKO_DASHBOARD") or "").lower()
+    if configured in ("live", "plain"):
+        return configured
+    return "live" if console.is_terminal else "plain"
+
+
+def _result_line(result: Dict[str, Any]) -> str:
+    if result["failed"]:
+        return f"  [[bold red]FAILED[/bold red]] {escape(result['name'])} ({escape(result['id'])}) - {result.get('time', 0):.3f}s"
+    return f"  [[bold green]PASSED[/bold green]] {escape(result['name'])} ({escape(result['id'])}) - {result.get('time', 0):.3f}s"
+
+
+def format_eta(seconds: float) -> str:
+    seconds = max(0, int(round(seconds)))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def _pending_line(test: Dict[str, Any]) -> str:
+    return f"  [[bold yellow]PENDING[/bold yellow]] {escape(test['name'])} ({escape(test['id'])})"
+
+
+class BatchTally:
+    """
+    Incremental summary of a BatchSnapshot.
+
+    ``BatchSnapshot.completed`` only ever grows, so each sync reads just the
+    results added since the previous one. Counters, the failed list and a
+    bounded window of recent results are updated in O(changes); the markup
+    of a result is built once, when it arrives.
+    """
+
+    def __init__(self, recent: int = 10):
+        self.passed = 0
+        self.failed: List[Dict[str, Any]] = []
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+        self.pending = 0
+        self.lines: Dict[int, str] = {}
+        # Passed results in full, only while the batch is small enough for the full view
+        self._passed_results: Optional[List[Dict[str, Any]]] = []
+        self._consumed = 0
+
+    @property
+    def completed(self) -> int:
+        return self.passed + len(self.failed)
+
+    @property
+    def total(self) -> int:
+        return self.completed + self.pending
+
+    def sync(self, snapshot: BatchSnapshot) -> List[Dict[str, Any]]:
+        """Take in results completed since the last sync and return them."""
+        new = snapshot.completed[self._consumed:]
+        self._consumed = len(snapshot.completed)
+        self.pending = len(snapshot.pending)
+        for result in new:
+            self.lines[id(result)] = _result_line(result)
+            self.recent.append(result)
+            if result["failed"]:
+                self.failed.append(result)
+                continue
+            self.passed += 1
+            if self._passed_results is not None:
+                if self.passed > FULL_VIEW_LIMIT:
+                    self._passed_results = None
+                else:
+                    self._passed_results.append(result)
+        return new
+
+    def full_view_available(self) -> bool:
+        return self._passed_results is not None and self.total <= FULL_VIEW_LIMIT
+
+    def counts_markup(self) -> str:
+        return (
+            f"Passed: [green]{self.passed}[/green]  Failed: [red]{len(self.failed)}[/red]  "
+            f"Pending: [yellow]{self.pending}[/yellow]"
+        )
+
+    def render(self, snapshot: BatchSnapshot, window: int, eta: Optional[str] = None) -> str:
+        """Full listing for small batches, otherwise counts plus bounded windows."""
+        if self.full_view_available():
+            text = self._render_full(snapshot)
+        else:
+            text = self._render_windowed(snapshot, window)
+        if eta:
+            header, _, rest = text.partition("\n")
+            text = f"{header}  ETA: [cyan]{eta}[/cyan]\n{rest}"
+        return text
+
+    def _section(self, lines: List[str], title: str, items: Iterable[str], hidden: int = 0) -> None:
+        lines.append("")
+        lines.append(f"[bold]{title}[/bold]")
+        before = len(lines)
+        lines.extend(items)
+        if len(lines) == before:
+            lines.append("  (none)")
+        if hidden > 0:
+            lines.append(f"  ... and {hidden} more")
+
+    def _render_full(self, snapshot: BatchSnapshot) -> str:
+        lines = [f"Total: {self.total}  {self.counts_markup()}"]
+        failed = sorted(self.failed, key=lambda r: r["name"])
+        passed = sorted(self._passed_results, key=lambda r: r["name"])
+        self._section(lines, "FAILED TESTS", (self.lines[id(r)] for r in failed))
+        self._section(lines, "PASSED TESTS", (self.lines[id(r)] for r in passed))
+        self._section(lines, "PENDING TESTS", (_pending_line(t) for t in snapshot.pending.values()))
+        return "\n".join(lines)
+
+    def _render_windowed(self, snapshot: BatchSnapshot, window: int) -> str:
+        total = self.total
+        share = f" ({self.completed * 100 // total}%)" if total else ""
+        lines = [f"Total: {total}  Completed: {self.completed}{share}  {self.counts_markup()}"]
+        latest_failed = self.failed[-window:]
+        self._section(lines, "FAILED TESTS", (self.lines[id(r)] for r in latest_failed), len(self.failed) - len(latest_failed))
+        recent = list(self.recent)[-window:]
+        self._section(lines, "RECENTLY COMPLETED", (self.lines[id(r)] for r in reversed(recent)))
+        pending = []
+        for test in snapshot.pending.values():
+            if len(pending) == window:
+                break
+            pending.append(_pending_line(test))
+        self._section(lines, "PENDING TESTS", pending, self.pending - len(pending))
+        return "\n".join(lines)
+
+
+class _Display:
+    """Shared live/plain output handling of the dashboards."""
+
+    def __init__(self, console: Console, mode: Optional[str] = None):
+        self.console = console
+        self.mode = mode or dashboard_mode(console)
+        self._live: Optional[Live] = None
+
+    @property
+    def window(self) -> int:
+        """Rows per windowed section so the whole dashboard fits the terminal."""
+        return max(3, (self.console.size.height - 12) // 3)
+
+    def __enter__(self):
+        if self.mode == "live":
+            # Redraw only when the state changed instead of on a fixed refresh timer
+            self._live = Live(Text(""), console=self.console, auto_refresh=False)
+            self._live.__enter__()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._live is not None:
+            self._live.__exit__(*exc)
+            self._live = None
+
+    def _draw(self, markup: str) -> None:
+        self._live.update(Text.from_markup(markup), refresh=True)
+
+    def _log(self, line: str) -> None:
+        # Plain lines go where the console writes, so they stay off stdout when it carries the command result
+        print(f"[{time.strftime('%H:%M:%S')}] {line}", file=self.console.file, flush=True)
+
+    @staticmethod
+    def _record(record: Dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        sys.stdout.flush()
+
+
+class BatchDashboard(_Display):
+    """Progress display of one batch, fed with its BatchSnapshot after every poll tick."""
+
+    def __init__(self, console: Console, mode: Optional[str] = None, parallelism: int = 1):
+        super().__init__(console, mode)
+        self.parallelism = max(1, parallelism)
+        self.tally = BatchTally(recent=50)
+        self._last_counts = None
+
+    def eta(self, snapshot: BatchSnapshot) -> Optional[str]:
+        """Remaining time estimated from historical durations of the pending tests."""
+        if not snapshot.expected or not self.tally.pending:
+            return None
+        return "~" + format_eta(snapshot.expected_remaining / self.parallelism)
+
+    def update(self, snapshot: BatchSnapshot) -> None:
+        new = self.tally.sync(snapshot)
+        if self.mode == "jsonl":
+            for result in new:
+                self._record(result)
+            return
+        if self.mode == "live":
+            self._draw(self.tally.render(snapshot, self.window, self.eta(snapshot)))
+            return
+
+        for result in new:
+            if result["failed"]:
+                self._log(f"FAILED {result['name']} ({result['id']}) - {result.get('time', 0):.3f}s")
+        counts = (self.tally.passed, len(self.tally.failed), self.tally.pending)
+        if counts != self._last_counts and self.tally.total:
+            self._last_counts = counts
+            eta = self.eta(snapshot)
+            self._log(
+                f"{self.tally.completed}/{self.tally.total} completed  passed={counts[0]} failed={counts[1]} pending={counts[2]}"
+                + (f"  eta={eta}" if eta else "")
+            )
+
+
+class MultiTargetDashboard(_Display):
+    """Progress display of several batches (run-many), fed with the scheduler's target states."""
+
+    def __init__(self, console: Console, mode: Optional[str] = None):
+        super().__init__(console, mode)
+        self._tallies: Dict[int, BatchTally] = {}
+        self._last_lines: Dict[int, str] = {}
+
+    def _tally(self, state: Dict[str, Any]) -> BatchTally:
+        tally = self._tallies.get(id(state))
+        if tally is None:
+            tally = self._tallies[id(state)] = BatchTally(recent=1)
+        return tally
+
+    def update(self, states: List[Dict[str, Any]]) -> None:
+        updates = [(state, self._tally(state), self._tally(state).sync(state["snapshot"])) for state in states]
+        if self.mode == "jsonl":
+            for state, _, new in updates:
+                for result in new:
+                    self._record({"target": state["label"], **result})
+            return
+        if self.mode == "live":
+            self._draw(self._render(updates))
+            return
+
+        for state, tally, new in updates:
+            for result in new:
+                if result["failed"]:
+                    self._log(f"{state['label']}: FAILED {result['name']} ({result['id']}) - {result.get('time', 0):.3f}s")
+            status = state["error"] or state["batch_status"] or state["status"]
+            line = f"{state['label']} [{status}] passed={tally.passed} failed={len(tally.failed)} pending={tally.pending}"
+            if self._last_lines.get(id(state)) != line:
+                self._last_lines[id(state)] = line
+                self._log(line)
+
+    def _render(self, updates: List[Any]) -> str:
+        window = self.window
+        passed = sum(tally.passed for _, tally, _ in updates)
+        failed = sum(len(tally.failed) for _, tally, _ in updates)
+        pending = sum(tally.pending for _, tally, _ in updates)
+        lines = [
+            f"Targets: {len(updates)}  Passed: [green]{passed}[/green]  "
+            f"Failed: [red]{failed}[/red]  Pending: [yellow]{pending}[/yellow]",
+            "",
+            "[bold]TARGETS[/bold]",
+        ]
+        for state, tally, _ in updates:
+            status = state["error"] or state["batch_status"] or state["status"]
+            lines.append(f"  {escape(state['label'])} {escape(f'[{status}]')}  {tally.counts_markup()}")
+
+        lines.append("")
+        lines.append("[bold]FAILED TESTS[/bold]")
+        shown = 0
+        for state, tally, _ in updates:
+            for result in tally.failed[:max(0, window - shown)]:
+                lines.append(f"  [[bold red]FAILED[/bold red]] {escape(state['label'])} / {escape(result['name'])} ({escape(result['id'])}) - {result.get('time', 0):.3f}s")
+                shown += 1
+        if not failed:
+            lines.append("  (none)")
+        elif failed > shown:
+            lines.append(f"  ... and {failed - shown} more")
+        return "\n".join(lines)
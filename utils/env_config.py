@@ -0,0 +1,21 @@
+from pathlib import Path
+from typing import Dict
+
+
+def update_env_file(env_path: Path, token: str | None = None, url: str | None = None) -> Dict[str, str]:
+    """Update the URL/TOKEN entries of a .env file, keeping the values that are not given."""
+    current: Dict[str, str] = {}
+    if env_path.exists():
+        for line in env_path.read_text().splitlines():
+            if "=" in line:
+                key, value = line.split("=", 1)
+                current[key.strip()] = value.strip()
+
+    if url is not None:
+        current["URL"] = url
+    if token is not None:
+        current["TOKEN"] = token
+
+    lines = [f"URL={current.get('URL', '')}", f"TOKEN={current.get('TOKEN', '')}"]
+    env_path.write_text("\n".join(lines))
+    return current
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class ETagCache:
+    """
+    In-memory cache of decoded GET responses keyed by path, for If-None-Match revalidation.
+
+    The least recently used entries are evicted once the cache holds more
+    than ``max_entries`` responses or ``max_bytes`` of response bodies, so
+    long-lived managers (the background agent) do not keep every page they
+    ever polled. Entries are shared by the transport's worker threads.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[str, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> Optional[Tuple[str, Any]]:
+        """Return ``(etag, data)`` for ``path``, or None when it is not cached."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            self._entries.move_to_end(path)
+            return entry[0], entry[1]
+
+    def put(self, path: str, etag: str, data: Any, size: int) -> None:
+        """Cache a response body of ``size`` bytes; bodies larger than the whole cache are not kept."""
+        with self._lock:
+            self._pop(path)
+            if size > self.max_bytes:
+                return
+            self._entries[path] = (etag, data, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def discard(self, path: str) -> None:
+        with self._lock:
+            self._pop(path)
+
+    def discard_prefix(self, prefix: str) -> int:
+        """Drop every entry whose path starts with ``prefix``; returns the number dropped."""
+        with self._lock:
+            paths = [path for path in self._entries if path.startswith(prefix)]
+            for path in paths:
+                self._pop(path)
+            return len(paths)
+
+    def _pop(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.size -= entry[2]
@@ -0,0 +1,54 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Bookkeeping fields that change without the script itself changing
+_VOLATILE_KEYS = frozenset({"idx", "created_at", "updated_at", "timestamp", "last_run", "last_run_at", "status"})
+
+
+def _canonical(record: Dict[str, Any]) -> bytes:
+    stable = {key: value for key, value in record.items() if key not in _VOLATILE_KEYS}
+    return json.dumps(stable, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def script_fingerprints(chat_ids: Iterable[str], entries: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    SHA-256 fingerprint of each chat's script, i.e. of its chat entries in server order.
+
+    Volatile bookkeeping fields are left out, so only a change to the
+    script content gives a chat a new fingerprint.
+    """
+    hashes = {chat_id: hashlib.sha256() for chat_id in chat_ids}
+    for entry in entries:
+        digest = hashes.get(entry.get("chat_id"))
+        if digest is not None:
+            digest.update(_canonical(entry))
+            digest.update(b"\n")
+    return {chat_id: digest.hexdigest() for chat_id, digest in hashes.items()}
+
+
+def select_changed(
+    chats: List[Dict[str, Any]],
+    recorded: Dict[str, Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split chats into those to run and those whose last pass still applies.
+
+    A chat is run when it has no recorded outcome, its fingerprint changed
+    since the outcome was recorded, or its last recorded run did not pass.
+
+    Args:
+        chats: Chats with a ``fingerprint`` key
+        recorded: Recorded outcomes by chat ID, with ``fingerprint`` and ``status`` keys
+
+    Returns:
+        Tuple of (chats to run, chats carried forward)
+    """
+    run, carried = [], []
+    for chat in chats:
+        previous = recorded.get(chat["chat_id"])
+        if previous and previous["fingerprint"] == chat["fingerprint"] and previous["status"] == "passed":
+            carried.append(chat)
+        else:
+            run.append(chat)
+    return run, carried
@@ -0,0 +1,382 @@
+"""
+In-process port of ``generateAllReportsHTML`` from ``report_template.js``.
+
+The markup, layout and date formatting follow the JavaScript template (with
+Node's default en-US locale), but the document is written piece by piece to
+a file handle instead of being built as one string, and text taken from test
+data is HTML-escaped.
+"""
+import math
+import os
+from datetime import datetime, timezone
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from utils.atomic_write import write_atomically
+
+STYLE = """        :root {
+            --color-pass: #1e8e3e; --color-fail: #d93025; --color-other: #5f6368;
+            --bg-pass: #e6f4ea; --bg-fail: #fce8e6; --bg-other: #f1f3f4;
+            --border-color: #dadce0; --text-color: #202124; --text-color-light: #5f6368;
+            --panel-bg: #f8f9fa; --body-bg: #ffffff;
+        }
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: var(--body-bg); color: var(--text-color); }
+        .container { max-width: 1200px; margin: auto; background: #fff; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        h1, h2, h3 { color: var(--text-color); border-bottom: 2px solid #eee; padding-bottom: 10px; margin-top: 25px; }
+        table { width: 100%; border-collapse: collapse; margin-bottom: 20px; font-size: 14px; }
+        th, td { padding: 12px; border: 1px solid var(--border-color); text-align: left; }
+        th { background-color: var(--panel-bg); }
+        .status-passed { color: var(--color-pass); font-weight: bold; }
+        .status-failed { color: var(--color-fail); font-weight: bold; }
+        .screenshot { max-width: 80px; max-height: 60px; border-radius: 4px; border: 1px solid var(--border-color); }
+        .header-stats { display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 15px; margin-bottom: 20px; }
+        .stat-box { background: var(--panel-bg); padding: 15px; border-radius: 8px; border: 1px solid var(--border-color); }
+        .stat-title { font-weight: bold; color: var(--text-color-light); }
+        .stat-value { font-size: 1.8em; font-weight: bold; color: var(--text-color); margin-top: 5px; }
+        .footer { font-size: 0.9em; color: #777; margin-top: 20px; text-align: center; }
+        pre { white-space: pre-wrap; word-break: break-all; font-size: 0.9em; max-height: 100px; overflow-y: auto; background: #f1f3f4; padding: 5px; border-radius: 4px; }
+        .chart-container { background-color: var(--panel-bg); padding: 20px; border-radius: 8px; margin-top: 20px; text-align: center; border: 1px solid var(--border-color); }
+"""
+
+
+def _js_number(value: float) -> str:
+    """Format a number the way a JavaScript template literal does."""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if value.is_integer() and abs(value) < 1e21:
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+def _js_field(record: Dict[str, Any], key: str) -> str:
+    """Interpolate a record field like JavaScript does for missing and null values."""
+    if key not in record:
+        return "undefined"
+    value = record[key]
+    return "null" if value is None else _js_number(value)
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    """Parse an API timestamp into a local datetime, mirroring ``new Date(value)``."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    # Date-only ISO strings are UTC in JavaScript, date-time strings without an offset are local
+    if parsed.tzinfo is None:
+        if len(value) == 10:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        else:
+            return parsed.astimezone()
+    return parsed.astimezone()
+
+
+def _timestamp(value: Any) -> float:
+    parsed = _parse_date(value)
+    return parsed.timestamp() if parsed else math.nan
+
+
+def _locale_date(value: Any) -> str:
+    parsed = _parse_date(value)
+    if parsed is None:
+        return "Invalid Date"
+    return f"{parsed.month}/{parsed.day}/{parsed.year}"
+
+
+def _locale_datetime(parsed: datetime) -> str:
+    hour = parsed.hour % 12 or 12
+    meridiem = "AM" if parsed.hour < 12 else "PM"
+    return f"{parsed.month}/{parsed.day}/{parsed.year}, {hour}:{parsed.minute:02d}:{parsed.second:02d} {meridiem}"
+
+
+def _utc_string(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+
+def _format_date(value: Any) -> str:
+    if not value:
+        return "N/A"
+    parsed = _parse_date(value)
+    return _locale_datetime(parsed) if parsed else "Invalid Date"
+
+
+def _bar_chart_svg(reports: List[Dict[str, Any]]) -> str:
+    if not reports:
+        return '<p>No data available for chart.</p>'
+
+    chart_width = 900
+    chart_height = 400
+    margin = {"top": 40, "right": 20, "bottom": 80, "left": 60}
+    width = chart_width - margin["left"] - margin["right"]
+    height = chart_height - margin["top"] - margin["bottom"]
+
+    max_count = max([1] + [r.get("total_chats") or 0 for r in reports])
+    tick_count = min(5, math.ceil(max_count))
+
+    band_width = width / len(reports)
+    bar_width = band_width * 0.8
+    bar_padding = band_width * 0.2
+
+    def y_scale(value: float) -> float:
+        return height - (value / max_count) * height
+
+    y_axis = []
+    for i in range(tick_count + 1):
+        tick = (max_count / tick_count) * i
+        tick_value = _js_number(tick) if float(tick).is_integer() else f"{tick:.1f}"
+        y_axis.append(f"""
+        <g transform="translate(0, {_js_number(y_scale(tick))})">
+            <line x2="{width}" stroke="#e0e0e0" stroke-width="0.5" />
+            <text x="-10" y="5" text-anchor="end" font-size="12" fill="#5f6368">{tick_value}</text>
+        </g>
+    """)
+
+    bars = []
+    for i, report in enumerate(reports):
+        passed = report.get("total_passed") or 0
+        failed = report.get("total_failed") or 0
+        x = i * band_width + bar_padding / 2
+        bars.append(f"""
+            <g transform="translate({_js_number(x)}, 0)">
+                <rect y="{_js_number(y_scale(passed))}" width="{_js_number(bar_width)}" height="{_js_number((passed / max_count) * height)}" fill="rgba(75, 192, 75, 0.85)" />
+                <rect y="{_js_number(y_scale(passed + failed))}" width="{_js_number(bar_width)}" height="{_js_number((failed / max_count) * height)}" fill="rgba(255, 99, 132, 0.85)" />
+                <text x="{_js_number(bar_width / 2)}" y="{height + 20}" transform="rotate(45, {_js_number(bar_width / 2)}, {height + 20})" text-anchor="start" font-size="10" fill="#5f6368">{_locale_date(report.get("timestamp_started"))}</text>
+            </g>
+        """)
+
+    return f"""
+        <svg width="{chart_width}" height="{chart_height}" font-family="Arial, sans-serif" style="background-color: transparent;">
+            <text x="{_js_number(chart_width / 2)}" y="25" text-anchor="middle" font-size="16" fill="#202124">Report Passed / Failed Counts</text>
+            <g transform="translate({margin["left"]}, {margin["top"]})">
+                <line x1="0" y1="0" x2="0" y2="{height}" stroke="#5f6368" />
+                <line x1="0" y1="{height}" x2="{width}" y2="{height}" stroke="#5f6368" />
+                <text transform="rotate(-90)" y="-45" x="{_js_number(-height / 2)}" text-anchor="middle" fill="#202124" font-size="14">Number of tests</text>
+                {"".join(y_axis)}
+                {"".join(bars)}
+            </g>
+            <g transform="translate({_js_number(chart_width / 2 - 60)}, {chart_height - 15})">
+                <rect x="0" y="0" width="12" height="12" fill="rgba(75, 192, 75, 0.85)" />
+                <text x="18" y="11" font-size="12" fill="#5f6368">Passed</text>
+                <rect x="80" y="0" width="12" height="12" fill="rgba(255, 99, 132, 0.85)" />
+                <text x="98" y="11" font-size="12" fill="#5f6368">Failed</text>
+            </g>
+        </svg>
+    """
+
+
+def aggregate_tests(executions: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-test run counts and latest failure of a set of executions, keyed by test title."""
+    tests: Dict[str, Dict[str, Any]] = {}
+    for execution in executions:
+        title = execution.get("chat_title") or "Untitled Test"
+        test = tests.get(title)
+        if test is None:
+            test = tests[title] = {"title": title, "runs": 0, "passed": 0, "failed": 0}
+        test["runs"] += 1
+        if execution.get("status") == "failed":
+            test["failed"] += 1
+            test["lastError"] = execution.get("error_message")
+            images = execution.get("images") or []
+            test["lastErrorScreenshot"] = images[0] if images else None
+        else:
+            test["passed"] += 1
+    return tests
+
+
+def merge_test_aggregates(aggregates: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Combine aggregate_tests() results of several reports, oldest first.
+
+    Counts are summed and the latest failure wins, exactly as if the
+    executions of all reports had been aggregated in one pass.
+    """
+    tests: Dict[str, Dict[str, Any]] = {}
+    for aggregate in aggregates:
+        for title, entry in aggregate.items():
+            test = tests.get(title)
+            if test is None:
+                test = tests[title] = {"title": title, "runs": 0, "passed": 0, "failed": 0}
+            test["runs"] += entry["runs"]
+            test["passed"] += entry["passed"]
+            test["failed"] += entry["failed"]
+            if entry["failed"]:
+                test["lastError"] = entry.get("lastError")
+                test["lastErrorScreenshot"] = entry.get("lastErrorScreenshot")
+    return tests
+
+
+def _screenshot_html(image: Optional[Dict[str, Any]], asset_base: Optional[Path]) -> str:
+    """Render an inline screenshot, or a link to one stored by the ScreenshotStore."""
+    if not image:
+        return 'N/A'
+    if image.get("b64"):
+        return f'<img src="data:image/png;base64,{image["b64"]}" class="screenshot" alt="Screenshot">'
+    if image.get("path"):
+        src = Path(image["path"])
+        if asset_base is not None:
+            src = Path(os.path.relpath(Path(image["path"]).resolve(), Path(asset_base).resolve()))
+        href = escape(src.as_posix(), quote=True)
+        return f'<a href="{href}"><img src="{href}" class="screenshot" alt="Screenshot" loading="lazy"></a>'
+    return 'N/A'
+
+
+def render_all_reports_html(
+    reports: List[Dict[str, Any]],
+    executions: Iterable[Dict[str, Any]],
+    project_name: str,
+    out: TextIO,
+    asset_base: Optional[Path] = None
+) -> None:
+    """
+    Write the all-reports HTML page for ``reports`` and their ``executions`` to ``out``.
+
+    Executions are consumed once, so a generator can be passed to avoid
+    holding them all in memory. Screenshots that were moved to disk are
+    linked relative to ``asset_base`` (the directory of the report file).
+    """
+    render_aggregated_html(reports, aggregate_tests(executions), project_name, out, asset_base)
+
+
+def render_aggregated_html(
+    reports: List[Dict[str, Any]],
+    tests: Dict[str, Dict[str, Any]],
+    project_name: str,
+    out: TextIO,
+    asset_base: Optional[Path] = None
+) -> None:
+    """Write the all-reports HTML page from per-test aggregates (see aggregate_tests()) to ``out``."""
+    generation_timestamp = _utc_string(datetime.now(timezone.utc))
+    sorted_reports = sorted(reports, key=lambda r: _timestamp(r.get("timestamp_started")))
+    if sorted_reports:
+        last_run = max(_timestamp(r.get("timestamp_completed") or r.get("timestamp_started")) for r in sorted_reports)
+        last_run_timestamp = "Invalid Date" if math.isnan(last_run) else _utc_string(datetime.fromtimestamp(last_run, timezone.utc))
+    else:
+        last_run_timestamp = "N/A"
+
+    total_reports = len(sorted_reports)
+    total_passed = sum(r.get("total_passed") or 0 for r in sorted_reports)
+    total_failed = sum(r.get("total_failed") or 0 for r in sorted_reports)
+    total_runs = total_passed + total_failed
+
+    unique_tests = list(tests.values())
+    tests_failed_once = [t for t in unique_tests if t["failed"] > 0]
+    top_failing_tests = sorted(tests_failed_once, key=lambda t: -t["failed"])[:5]
+
+    name = escape(str(project_name))
+    out.write(f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+      <meta charset="UTF-8">
+      <title>All Test Reports - {name}</title>
+      <style>
+{STYLE}      </style>
+    </head>
+    <body>
+      <div class="container">
+        <h1>All Test Reports for {name}</h1>
+        <p>Generated on: {generation_timestamp}</p>
+        <p>Last Run Timestamp: {last_run_timestamp}</p>
+        
+        <h2>Aggregated Statistics</h2>
+        <div class="header-stats">
+          <div class="stat-box"><div class="stat-title">Total Reports</div><div class="stat-value">{total_reports}</div></div>
+          <div class="stat-box"><div class="stat-title">Total Test Runs</div><div class="stat-value">{total_runs}</div></div>
+          <div class="stat-box"><div class="stat-title">Passed Runs</div><div class="stat-value status-passed">{total_passed}</div></div>
+          <div class="stat-box"><div class="stat-title">Failed Runs</div><div class="stat-value status-failed">{total_failed}</div></div>
+          <div class="stat-box"><div class="stat-title">Unique Tests</div><div class="stat-value">{len(unique_tests)}</div></div>
+          <div class="stat-box"><div class="stat-title">Tests Failing</div><div class="stat-value status-failed">{len(tests_failed_once)}</div></div>
+        </div>
+
+        <div class="chart-container">
+            <h3>Pass / Fail Chart</h3>
+            {_bar_chart_svg(sorted_reports)}
+        </div>
+
+        <h2>Top Failing Tests</h2>
+        <table>
+          <thead><tr><th>Test Title</th><th>Total Runs</th><th>Failed</th><th>Passed</th><th>Last Error</th><th>Screenshot</th></tr></thead>
+          <tbody>
+            """)
+
+    for test in top_failing_tests:
+        screenshot_html = _screenshot_html(test.get("lastErrorScreenshot"), asset_base)
+        out.write(f"""
+              <tr>
+                <td>{escape(test["title"])}</td>
+                <td>{test["runs"]}</td>
+                <td class="status-failed">{test["failed"]}</td>
+                <td class="status-passed">{test["passed"]}</td>
+                <td><pre>{escape(str(test.get("lastError") or 'N/A'))}</pre></td>
+                <td>{screenshot_html}</td>
+              </tr>
+            """)
+
+    out.write("""
+          </tbody>
+        </table>
+
+        <h2>Reports Overview</h2>
+        <table>
+          <thead><tr><th>Report Name/Date</th><th>Total Tests</th><th>Passed</th><th>Failed</th></tr></thead>
+          <tbody>
+            """)
+
+    for report in reversed(sorted_reports):
+        out.write(f"""
+              <tr>
+                <td>Report from {_format_date(report.get("timestamp_started"))}</td>
+                <td>{_js_field(report, "total_chats")}</td>
+                <td class="status-passed">{_js_field(report, "total_passed")}</td>
+                <td class="status-failed">{_js_field(report, "total_failed")}</td>
+              </tr>
+            """)
+
+    out.write("""
+          </tbody>
+        </table>
+
+        <div class="footer">
+          <p>Barko Agent Report</p>
+        </div>
+      </div>
+    </body>
+    </html>
+  """)
+
+
+def write_all_reports_html(
+    reports: List[Dict[str, Any]],
+    executions: Iterable[Dict[str, Any]],
+    project_name: str,
+    output_path: Path
+) -> Path:
+    """
+    Render the all-reports page straight into ``output_path``.
+
+    The page is streamed to a temporary file in the target directory and
+    renamed into place, so concurrent runs never see a partial report.
+    """
+    return write_atomically(
+        output_path,
+        lambda out: render_all_reports_html(reports, executions, project_name, out, asset_base=Path(output_path).parent)
+    )
+
+
+def write_aggregated_html(
+    reports: List[Dict[str, Any]],
+    tests: Dict[str, Dict[str, Any]],
+    project_name: str,
+    output_path: Path
+) -> Path:
+    """Like write_all_reports_html(), from per-test aggregates instead of executions."""
+    return write_atomically(
+        output_path,
+        lambda out: render_aggregated_html(reports, tests, project_name, out, asset_base=Path(output_path).parent)
+    )
+
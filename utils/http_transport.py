@@ -0,0 +1,132 @@
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from utils.tracing import tracer
+
+# (connect, read) timeouts in seconds per endpoint group. Triggering runs and
+# listing folders are slow server-side; small status reads should fail fast.
+DEFAULT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "default": (3.05, 10.0),
+    "status": (3.05, 10.0),
+    "reports": (3.05, 15.0),
+    "executions": (3.05, 30.0),
+    "results": (3.05, 30.0),
+    "run": (3.05, 30.0),
+    "folders": (3.05, 30.0),
+}
+
+# Only requests that can be repeated without side effects are retried.
+# DELETE is left out on purpose: retrying a delete whose response was lost
+# would turn a success into a 404.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class HTTPTransport:
+    """
+    The single path every BarkoAgent API request goes through.
+
+    Owns one keep-alive ``requests.Session`` whose connection pool is sized
+    to the number of requests the CLI keeps in flight, sends the
+    authorization and content negotiation headers once, applies
+    per-endpoint timeouts and retries idempotent requests with exponential
+    backoff (honouring ``Retry-After``). Responses are requested with gzip
+    and, when a brotli decoder is installed, br encoding; urllib3 decodes
+    them transparently.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str],
+        token: Optional[str],
+        pool_size: int = 16,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeouts: Optional[Mapping[str, Tuple[float, float]]] = None
+    ):
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        })
+        self.set_token(token)
+        self.resize(pool_size)
+
+    def set_token(self, token: Optional[str]) -> None:
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def set_base_url(self, base_url: Optional[str]) -> None:
+        self.base_url = (base_url or "").rstrip("/")
+
+    def resize(self, pool_size: int) -> None:
+        """(Re)mount adapters whose pool holds ``pool_size`` connections per host."""
+        self.pool_size = max(1, pool_size)
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def timeout_for(self, endpoint: str) -> Tuple[float, float]:
+        return self.timeouts.get(endpoint, self.timeouts["default"])
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str = "default",
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send a request to ``path`` below the API base URL.
+
+        Args:
+            method: HTTP method
+            path: Path starting with ``/api/``
+            endpoint: Endpoint group used to pick the timeout
+            headers: Extra headers for this request only
+            **kwargs: Passed on to ``requests.Session.request`` (``json``, ``params`` ...)
+        """
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        if not tracer.enabled:
+            return self.session.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+
+        with tracer.span(f"{method} {path.split('?', 1)[0]}", "http", endpoint=endpoint) as span:
+            res = self.session.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+            span["status"] = res.status_code
+            span["bytes"] = len(res.content)
+            span["wire_bytes"] = int(res.headers.get("Content-Length") or span["bytes"])
+            span["encoding"] = res.headers.get("Content-Encoding", "identity")
+            span["retries"] = len(res.raw.retries.history) if getattr(res.raw, "retries", None) else 0
+        return res
+
+    def get(self, path: str, endpoint: str = "default", **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, endpoint, **kwargs)
+
+    def post(self, path: str, endpoint: str = "default", **kwargs: Any) -> requests.Response:
+        return self.request("POST", path, endpoint, **kwargs)
+
+    def delete(self, path: str, endpoint: str = "default", **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", path, endpoint, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
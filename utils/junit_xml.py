@@ -1,80 +1,150 @@
-import xml.etree.ElementTree as ET
+import io
+import re
 from datetime import datetime
-from typing import Any, Dict, List
-from xml.dom import minidom
+from pathlib import Path
+from typing import Any, Dict, List, TextIO
+from xml.sax.saxutils import escape, quoteattr
 
+from utils.atomic_write import write_atomically
+
+# Characters that are not allowed in XML 1.0 documents (C0 controls other than tab/LF/CR, surrogates, U+FFFE/U+FFFF)
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]+")
+# str.translate has a C fast path for pure-ASCII text, which is what agent output usually is
+_ASCII_CONTROL_CHARS = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20)])
+
+
+class JUnitXMLGenerator:
+    """
+    Streaming JUnit XML writer.
+
+    Test cases are written to the file handle one at a time, so memory use
+    does not grow with the size of the document. Each test output is
+    sanitized once and written once: in <failure> for failed tests and in
+    <system-out> otherwise. Results with a ``skipped`` message (tests that
+    were not run) are written with a <skipped> element.
+    """
 
-class JUnitXMLGenerator:    
     def __init__(self, testsuite_name: str = "BarkoAgent Tests"):
         self.testsuite_name = testsuite_name
-    
+
     def generate_xml(
         self,
         results: List[Dict[str, Any]],
         project_name: str = None,
         batch_report_id: str = None
     ) -> str:
-        total_tests = len(results)
-        failures = sum(1 for r in results if r.get("failed", False))
-        errors = 0
-        total_time = sum(r.get("time", 0.0) for r in results)
-        
-        testsuites = ET.Element("testsuites")
-        testsuites.set("name", project_name or self.testsuite_name)
-        testsuites.set("tests", str(total_tests))
-        testsuites.set("failures", str(failures))
-        testsuites.set("errors", str(errors))
-        testsuites.set("time", f"{total_time:.3f}")
-        
+        buffer = io.StringIO()
+        self.write_xml(buffer, results, project_name, batch_report_id)
+        return buffer.getvalue()
+
+    def write_xml(
+        self,
+        out: TextIO,
+        results: List[Dict[str, Any]],
+        project_name: str = None,
+        batch_report_id: str = None
+    ) -> None:
         testsuite_name = project_name or self.testsuite_name
         if batch_report_id:
             testsuite_name = f"{testsuite_name}_{batch_report_id[:8]}"
-        
-        testsuite = ET.SubElement(testsuites, "testsuite")
-        testsuite.set("name", testsuite_name)
-        testsuite.set("tests", str(total_tests))
-        testsuite.set("failures", str(failures))
-        testsuite.set("errors", str(errors))
-        testsuite.set("time", f"{total_time:.3f}")
-        testsuite.set("timestamp", datetime.utcnow().isoformat())
-        
-        for result in results:
-            testcase = ET.SubElement(testsuite, "testcase")
-            testcase.set("name", result.get("name", result.get("id", "unknown")))
-            testcase.set("classname", project_name or "BarkoAgent")
-            testcase.set("time", f"{result.get('time', 0.0):.3f}")
-            
-            if result.get("id"):
-                testcase.set("id", result["id"])
-            
-            if result.get("failed", False):
-                failure = ET.SubElement(testcase, "failure")
-                failure.set("message", "Test failed")
-                failure.set("type", "AssertionError")
-                
-                output = result.get("output", "")
-                if output:
-                    failure.text = self._sanitize_output(output)
-            
-            if result.get("output"):
-                system_out = ET.SubElement(testcase, "system-out")
-                system_out.text = self._sanitize_output(result["output"])
-        
-        return self._prettify(testsuites)
-    
+
+        self.write_suites_xml(
+            out,
+            [{"name": testsuite_name, "classname": project_name or "BarkoAgent", "results": results}],
+            name=project_name or self.testsuite_name
+        )
+
+    def generate_suites_xml(self, suites: List[Dict[str, Any]], name: str = None) -> str:
+        buffer = io.StringIO()
+        self.write_suites_xml(buffer, suites, name)
+        return buffer.getvalue()
+
+    def write_suites_xml(self, out: TextIO, suites: List[Dict[str, Any]], name: str = None) -> None:
+        """
+        Write a document with one <testsuite> per entry of ``suites`` to ``out``.
+
+        Args:
+            out: Text file handle the document is written to
+            suites: Dictionaries with ``name``, ``classname`` and ``results`` keys
+            name: Name of the enclosing <testsuites> element
+        """
+        suite_totals = [self._totals(suite["results"]) for suite in suites]
+        totals = tuple(sum(t[i] for t in suite_totals) for i in range(4))
+
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<testsuites name={quoteattr(self._sanitize_output(name or self.testsuite_name))} {self._totals_attrs(*totals)}>\n')
+        timestamp = datetime.utcnow().isoformat()
+        for suite, suite_total in zip(suites, suite_totals):
+            out.write(
+                f'  <testsuite name={quoteattr(self._sanitize_output(suite["name"]))} {self._totals_attrs(*suite_total)}'
+                f' timestamp="{timestamp}">\n'
+            )
+            classname = quoteattr(self._sanitize_output(suite.get("classname") or "BarkoAgent"))
+            for result in suite["results"]:
+                self._write_testcase(out, result, classname)
+            out.write('  </testsuite>\n')
+        out.write('</testsuites>\n')
+
+    @staticmethod
+    def _totals(results: List[Dict[str, Any]]) -> tuple:
+        tests = 0
+        failures = 0
+        total_time = 0.0
+        skipped = 0
+        for r in results:
+            tests += 1
+            failures += bool(r.get("failed", False))
+            total_time += r.get("time", 0.0)
+            skipped += bool(r.get("skipped"))
+        return tests, failures, total_time, skipped
+
+    @staticmethod
+    def _totals_attrs(tests: int, failures: int, total_time: float, skipped: int = 0) -> str:
+        attrs = f'tests="{tests}" failures="{failures}" errors="0"'
+        if skipped:
+            attrs += f' skipped="{skipped}"'
+        return f'{attrs} time="{total_time:.3f}"'
+
+    def _write_testcase(self, out: TextIO, result: Dict[str, Any], classname: str) -> None:
+        name = quoteattr(self._sanitize_output(result.get("name", result.get("id", "unknown"))))
+        attrs = f'name={name} classname={classname} time="{result.get("time", 0.0):.3f}"'
+        if result.get("id"):
+            attrs += f' id={quoteattr(self._sanitize_output(result["id"]))}'
+
+        if result.get("skipped"):
+            out.write(f'    <testcase {attrs}>\n')
+            out.write(f'      <skipped message={quoteattr(self._sanitize_output(result["skipped"]))}/>\n')
+            out.write('    </testcase>\n')
+            return
+
+        output = self._sanitize_output(result.get("output", ""))
+        failed = result.get("failed", False)
+        if not failed and not output:
+            out.write(f'    <testcase {attrs}/>\n')
+            return
+
+        out.write(f'    <testcase {attrs}>\n')
+        if failed:
+            if output:
+                out.write('      <failure message="Test failed" type="AssertionError">')
+                out.write(escape(output))
+                out.write('</failure>\n')
+            else:
+                out.write('      <failure message="Test failed" type="AssertionError"/>\n')
+        elif output:
+            out.write('      <system-out>')
+            out.write(escape(output))
+            out.write('</system-out>\n')
+        out.write('    </testcase>\n')
+
     def _sanitize_output(self, output: str) -> str:
         if not output:
             return ""
-        sanitized = "".join(
-            char for char in str(output)
-            if ord(char) >= 32 or char in "\n\r\t"
-        )
-        return sanitized
-    
-    def _prettify(self, elem: ET.Element) -> str:
-        rough_string = ET.tostring(elem, encoding="unicode")
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ", encoding=None)
+        text = str(output)
+        if text.isascii():
+            return text.translate(_ASCII_CONTROL_CHARS)
+        return _INVALID_XML_CHARS.sub("", text)
+
 
 
 def generate_junit_xml(
@@ -85,3 +155,31 @@ def generate_junit_xml(
 ) -> str:
     generator = JUnitXMLGenerator(testsuite_name)
     return generator.generate_xml(results, project_name, batch_report_id)
+
+
+def write_junit_xml(
+    output_path: Path,
+    results: List[Dict[str, Any]],
+    project_name: str = None,
+    batch_report_id: str = None,
+    testsuite_name: str = "BarkoAgent Tests"
+) -> Path:
+    generator = JUnitXMLGenerator(testsuite_name)
+    return write_atomically(output_path, lambda out: generator.write_xml(out, results, project_name, batch_report_id))
+
+
+def generate_combined_junit_xml(
+    suites: List[Dict[str, Any]],
+    name: str = "BarkoAgent Tests"
+) -> str:
+    generator = JUnitXMLGenerator(name)
+    return generator.generate_suites_xml(suites, name)
+
+
+def write_combined_junit_xml(
+    output_path: Path,
+    suites: List[Dict[str, Any]],
+    name: str = "BarkoAgent Tests"
+) -> Path:
+    generator = JUnitXMLGenerator(name)
+    return write_atomically(output_path, lambda out: generator.write_suites_xml(out, suites, name))
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from utils.atomic_write import write_atomically
+
+
+def default_cache_dir() -> Path:
+    configured = os.getenv("BARKO_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "barkoagent"
+
+
+class MetadataCache:
+    """
+    Persistent key/value cache for slowly changing API metadata.
+
+    Entries are small JSON files shared by every CLI invocation on the
+    machine. Each entry has its own TTL; the least recently used entries
+    are evicted once the cache grows past ``max_entries`` or ``max_bytes``.
+    Entries are namespaced (normally by API URL and token) so that
+    different accounts or environments never see each other's data.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "default",
+        cache_dir: Optional[Path] = None,
+        max_entries: int = 512,
+        max_bytes: int = 8 * 1024 * 1024,
+        enabled: bool = True
+    ):
+        self.directory = Path(cache_dir or default_cache_dir()) / "metadata" / namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    @staticmethod
+    def namespace_for(*parts: Optional[str]) -> str:
+        return hashlib.sha256("\0".join(p or "" for p in parts).encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None when it is missing or expired."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        if entry.get("expires", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            # The modification time doubles as the last access time for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if not self.enabled:
+            return
+        try:
+            write_atomically(
+                self._path(key),
+                lambda handle: json.dump({"key": key, "expires": time.time() + ttl, "value": value}, handle)
+            )
+            self._evict()
+        except OSError:
+            # A cache that cannot be written must never fail the command
+            pass
+
+    def get_or_set(self, key: str, ttl: float, compute) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        """
+        Remove one entry, every entry whose key starts with ``prefix``, or (with
+        neither argument) the whole namespace. Returns the number of entries removed.
+        """
+        if key is not None:
+            path = self._path(key)
+            existed = path.exists()
+            path.unlink(missing_ok=True)
+            return int(existed)
+
+        removed = 0
+        for path in self._entries():
+            if prefix is not None:
+                try:
+                    entry_key = json.loads(path.read_text(encoding="utf-8")).get("key", "")
+                except (OSError, ValueError):
+                    entry_key = ""
+                if not entry_key.startswith(prefix):
+                    continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def _entries(self) -> list:
+        if not self.directory.exists():
+            return []
+        return [p for p in self.directory.iterdir() if p.suffix == ".json"]
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        count = len(entries)
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Least recently used first
+        entries.sort()
+        for _, size, path in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            count -= 1
+            total -= size
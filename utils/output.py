@@ -0,0 +1,72 @@
+"""
+Output formats of the command results (the global ``--format`` option).
+
+``json`` is indented JSON, ``compact`` is the same document on one line and
+``jsonl`` writes one record per line: the items of a list, or of the record
+list of a response such as ``{"reports": [...], "total": 42}``, so the output
+can be piped into line-oriented tools while it is being produced.
+"""
+import json
+import sys
+from typing import Any, Iterable, Optional, TextIO
+
+FORMATS = ("json", "compact", "jsonl")
+
+# Keys under which API responses carry their records
+RECORD_KEYS = ("executions", "reports", "results", "targets", "tests", "folders")
+
+
+def dumps(value: Any, fmt: str = "json") -> str:
+    if fmt == "json":
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def records_of(value: Any) -> Optional[list]:
+    """The record list of a response, or None when it is a single document."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        lists = [key for key in RECORD_KEYS if isinstance(value.get(key), list)]
+        if len(lists) == 1:
+            return value[lists[0]]
+    return None
+
+
+def write_document(value: Any, fmt: str = "json", out: Optional[TextIO] = None) -> None:
+    """Write a complete command result in the given format."""
+    out = out or sys.stdout
+    if fmt == "jsonl":
+        records = records_of(value)
+        if records is not None:
+            write_records(records, fmt, out)
+            return
+    out.write(dumps(value, fmt) + "\n")
+    out.flush()
+
+
+def write_records(records: Iterable[Any], fmt: str = "json", out: Optional[TextIO] = None) -> int:
+    """
+    Write records as a JSON list (``json``/``compact``) or one per line (``jsonl``) while they are produced.
+
+    The ``json`` output is the same as ``json.dumps(list(records), indent=2)``
+    without holding the list. Returns the number of records written.
+    """
+    out = out or sys.stdout
+    count = 0
+    for record in records:
+        if fmt == "jsonl":
+            out.write(dumps(record, fmt) + "\n")
+            # Flush per record so consumers see each one as soon as it arrives
+            out.flush()
+        elif fmt == "compact":
+            out.write(("[" if count == 0 else ",") + dumps(record, fmt))
+        else:
+            out.write(("[\n  " if count == 0 else ",\n  ") + dumps(record, fmt).replace("\n", "\n  "))
+        count += 1
+    if fmt == "compact":
+        out.write("]\n" if count else "[]\n")
+    elif fmt == "json":
+        out.write("\n]\n" if count else "[]\n")
+    out.flush()
+    return count
@@ -0,0 +1,142 @@
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def iter_paginated(
+    fetch_page: Callable[[int, int], Dict[str, Any]],
+    items_key: str,
+    page_size: int = 200,
+    max_workers: int = 4,
+    executor: Optional[Executor] = None
+) -> Iterator[Any]:
+    """
+    Yield every item of a limit/offset paginated endpoint.
+
+    The first page is fetched on its own. If the response carries a ``total``
+    count the remaining pages are fetched concurrently, otherwise pages are
+    fetched in windows of ``max_workers`` until a short page is returned.
+    Items are always yielded in server order.
+
+    Args:
+        fetch_page: Callable taking (limit, offset) and returning the decoded response
+        items_key: Key of the item list inside each response
+        page_size: Number of items requested per page
+        max_workers: Maximum number of pages in flight at once
+        executor: Pool to fetch pages on; a private one is created per call when omitted
+    """
+    for _, items in iter_pages(fetch_page, items_key, page_size=page_size, max_workers=max_workers, executor=executor):
+        yield from items
+
+
+def iter_pages(
+    fetch_page: Callable[[int, int], Dict[str, Any]],
+    items_key: str,
+    page_size: int = 200,
+    max_workers: int = 4,
+    start: int = 0,
+    executor: Optional[Executor] = None
+) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    Yield ``(offset, items)`` for every page of a limit/offset paginated endpoint from ``start`` on.
+
+    Pages are fetched like in iter_paginated(): the first one on its own,
+    then concurrently up to the server's ``total``, or in windows of
+    ``max_workers`` until a short page is returned. At most ``max_workers``
+    pages are in flight, also on a larger shared ``executor``.
+    """
+    first = fetch_page(page_size, start)
+    items = first.get(items_key, [])
+    yield start, items
+    if len(items) < page_size:
+        return
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            yield from _remaining_pages(pool, fetch_page, items_key, page_size, max_workers, start, first.get("total"))
+        return
+    yield from _remaining_pages(executor, fetch_page, items_key, page_size, max_workers, start, first.get("total"))
+
+
+def _remaining_pages(
+    pool: Executor,
+    fetch_page: Callable[[int, int], Dict[str, Any]],
+    items_key: str,
+    page_size: int,
+    max_workers: int,
+    start: int,
+    total: Any
+) -> Iterator[Tuple[int, List[Any]]]:
+    def fetch(offset: int) -> Dict[str, Any]:
+        return fetch_page(page_size, offset)
+
+    if isinstance(total, int):
+        offsets = range(start + page_size, total, page_size)
+        for offset, page in zip(offsets, map_bounded(pool, fetch, offsets, max_workers)):
+            yield offset, page.get(items_key, [])
+        return
+
+    offset = start + page_size
+    while True:
+        window: List[int] = [offset + i * page_size for i in range(max(1, max_workers))]
+        pages = map_bounded(pool, fetch, window, max_workers)
+        for page_offset, page in zip(window, pages):
+            page_items = page.get(items_key, [])
+            yield page_offset, page_items
+            if len(page_items) < page_size:
+                return
+        offset = window[-1] + page_size
+
+
+def map_bounded(pool: Executor, fn: Callable[[T], R], items: Iterable[T], max_in_flight: int = 4) -> Iterator[R]:
+    """
+    Like ``pool.map`` but with at most ``max_in_flight`` calls submitted at once.
+
+    Lets callers share one long-lived pool while each keeps its own bound on
+    concurrent requests. Results are yielded in input order.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append(pool.submit(fn, item))
+        if len(in_flight) >= max(1, max_in_flight):
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def iter_chunked(
+    fetch_chunk: Callable[[List[Any]], Any],
+    items: Iterable[Any],
+    chunk_size: int = 500,
+    max_workers: int = 4
+) -> Iterator[Any]:
+    """
+    Call ``fetch_chunk`` on consecutive chunks of ``items`` concurrently.
+
+    Responses are yielded in chunk order. Items are consumed lazily and at
+    most ``max_workers`` chunks are in flight, so neither the input nor the
+    responses are ever held whole.
+
+    Args:
+        fetch_chunk: Callable taking a list of items and returning the decoded response
+        items: The items to split, e.g. a generator over a large file
+        chunk_size: Maximum number of items per call
+        max_workers: Maximum number of calls in flight at once
+    """
+    source = iter(items)
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = deque()
+        while True:
+            chunk = list(islice(source, chunk_size))
+            if not chunk:
+                break
+            in_flight.append(pool.submit(fetch_chunk, chunk))
+            if len(in_flight) >= max_workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
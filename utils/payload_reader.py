@@ -0,0 +1,113 @@
+"""
+Streaming reader for ``get-all-results`` payload files.
+
+A payload is a list of ``{"chat_id": ..., "task_id": ...}`` objects, given
+either as one JSON list or as JSON Lines (one object per line). Files are
+read in chunks and items are yielded one at a time, so payloads with tens of
+thousands of tasks never have to be held in memory at once.
+"""
+import itertools
+import json
+from typing import Any, Dict, Iterator, TextIO
+
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+
+
+class PayloadError(ValueError):
+    """Raised for a malformed payload file or payload item."""
+
+
+def check_item(item: Any, index: int) -> Dict[str, Any]:
+    """Return ``item`` if it is a valid payload entry, raise PayloadError otherwise."""
+    if not isinstance(item, dict):
+        raise PayloadError(f"Item {index} is not an object")
+    if "chat_id" not in item or "task_id" not in item:
+        raise PayloadError(f"Item {index} must contain 'chat_id' and 'task_id'")
+    return item
+
+
+def iter_payload(fp: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the items of a payload file, validated, in file order.
+
+    Raises:
+        PayloadError: On malformed JSON or an item without chat_id/task_id
+    """
+    head = fp.read(_CHUNK_SIZE)
+    while head and not head.strip():
+        head = fp.read(_CHUNK_SIZE)
+    stripped = head.lstrip()
+    if not stripped:
+        return
+    if stripped.startswith("["):
+        items = _iter_json_list(fp, stripped[1:])
+    else:
+        items = _iter_json_lines(fp, head)
+    for index, item in enumerate(items):
+        yield check_item(item, index)
+
+
+def _iter_json_lines(fp: TextIO, head: str) -> Iterator[Any]:
+    lines = head.split("\n")
+    # The head may end in the middle of a line
+    lines[-1] += fp.readline()
+    for number, line in enumerate(itertools.chain(lines, fp), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise PayloadError(f"Invalid JSON on line {number}: {e}") from None
+
+
+def _iter_json_list(fp: TextIO, buffer: str) -> Iterator[Any]:
+    """Decode the elements of a JSON list whose opening bracket was already read."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = "" if eof else fp.read(_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                raise PayloadError("Invalid JSON: the list is not closed")
+
+    if next_char() == "]":
+        return
+    while True:
+        next_char()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # The value may just be cut off at the end of the buffer
+                if read_more():
+                    continue
+                raise PayloadError(f"Invalid JSON: {e}") from None
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(buffer) and read_more():
+                continue
+            break
+        pos = end
+        yield item
+        separator = next_char()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise PayloadError(f"Invalid JSON: expected ',' or ']' but found {separator!r}")
@@ -0,0 +1,131 @@
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+_START_KEYS = ("timestamp_started", "started_at", "start_time")
+_END_KEYS = ("timestamp_completed", "completed_at", "end_time", "timestamp_finished")
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Parse an API timestamp (ISO 8601 string or epoch seconds/milliseconds) into epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        # Anything past the year 2286 in seconds is really milliseconds
+        return value / 1000 if value > 1e10 else float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def server_duration(execution: Dict[str, Any]) -> Optional[float]:
+    """
+    Duration of an execution according to the server, in seconds.
+
+    Uses an explicit ``duration`` field when present, otherwise the
+    difference of the start and completion timestamps. Returns None when
+    the execution carries neither.
+    """
+    duration = execution.get("duration")
+    if isinstance(duration, (int, float)) and duration >= 0:
+        return float(duration)
+    started = next((parse_timestamp(execution.get(k)) for k in _START_KEYS if execution.get(k)), None)
+    completed = next((parse_timestamp(execution.get(k)) for k in _END_KEYS if execution.get(k)), None)
+    if started is None or completed is None or completed < started:
+        return None
+    return completed - started
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (0-100) of an already sorted, non-empty list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def execution_durations(executions: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map chat ID to ``{"name", "status", "duration"}`` for completed executions with server timing."""
+    durations = {}
+    for execution in executions:
+        status = (execution.get("status") or "").lower()
+        if status not in ("passed", "failed"):
+            continue
+        duration = server_duration(execution)
+        if duration is None:
+            continue
+        chat_id = execution.get("chat_id", "")
+        durations[chat_id] = {
+            "name": execution.get("chat_title", chat_id),
+            "status": status,
+            "duration": round(duration, 3),
+        }
+    return durations
+
+
+def expected_durations(history: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Median historical duration per chat ID."""
+    samples: Dict[str, List[float]] = {}
+    for report in history:
+        for chat_id, entry in report["durations"].items():
+            samples.setdefault(chat_id, []).append(entry["duration"])
+    return {chat_id: percentile(sorted(values), 50) for chat_id, values in samples.items()}
+
+
+def summarize_history(
+    history: List[Dict[str, Any]],
+    recent: int = 3,
+    slowdown_factor: float = 1.5,
+    min_delta: float = 5.0
+) -> List[Dict[str, Any]]:
+    """
+    Per-test duration statistics over a list of past batch reports.
+
+    Args:
+        history: Reports oldest first, each ``{"batch_report_id", "timestamp_started", "durations"}``
+            where ``durations`` comes from execution_durations()
+        recent: Number of latest runs compared against the older ones
+        slowdown_factor: Flag a test when its recent median exceeds the baseline median by this factor
+        min_delta: ... and by at least this many seconds, so short tests do not flap
+
+    Returns:
+        One entry per test, slowest p95 first
+    """
+    runs: Dict[str, List[float]] = {}
+    names: Dict[str, str] = {}
+    for report in history:
+        for chat_id, entry in report["durations"].items():
+            runs.setdefault(chat_id, []).append(entry["duration"])
+            names[chat_id] = entry["name"]
+
+    summary = []
+    for chat_id, durations in runs.items():
+        ordered = sorted(durations)
+        entry = {
+            "id": chat_id,
+            "name": names[chat_id],
+            "runs": len(durations),
+            "p50": round(percentile(ordered, 50), 3),
+            "p95": round(percentile(ordered, 95), 3),
+            "max": round(ordered[-1], 3),
+            "latest": durations[-1],
+            "trend": durations[-10:],
+            "slowdown": False,
+        }
+        if len(durations) > recent:
+            baseline = percentile(sorted(durations[:-recent]), 50)
+            current = percentile(sorted(durations[-recent:]), 50)
+            entry["baseline_p50"] = round(baseline, 3)
+            entry["recent_p50"] = round(current, 3)
+            entry["slowdown"] = current > baseline * slowdown_factor and current - baseline >= min_delta
+        summary.append(entry)
+    summary.sort(key=lambda e: e["p95"], reverse=True)
+    return summary
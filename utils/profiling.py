@@ -0,0 +1,84 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+
+def start_profiling(output_path: str | Path, top: int = 30) -> Callable[[], Path]:
+    """
+    Start cProfile and tracemalloc for the rest of the command.
+
+    Returns a function that stops both and writes a text summary (wall time,
+    peak traced memory, the slowest functions by cumulative time and the
+    largest allocation sites) to ``output_path``. The raw profile is saved
+    next to it as ``<output_path>.pstats`` for tools like snakeviz.
+
+    HTTP calls, JSON decoding and page fetches run in worker threads. Before
+    Python 3.12 a profiler only sees its own thread, so every thread started
+    from now on gets a profiler of its own and all of them are merged into
+    the summary. From 3.12 cProfile is built on sys.monitoring, which
+    allows one profiler per process and that one already covers every
+    thread. Either way cumulative times add up across threads and can
+    exceed the wall time.
+    """
+    output_path = Path(output_path)
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    thread_profilers: List[cProfile.Profile] = []
+    lock = threading.Lock()
+
+    per_thread = sys.version_info < (3, 12)
+
+    def profile_thread(*_) -> None:
+        # Runs on the first profiling event of a new thread; enable() replaces this hook in that thread
+        thread_profiler = cProfile.Profile()
+        try:
+            thread_profiler.enable()
+        except ValueError:
+            # "Another profiling tool is already active": the main profiler covers this thread
+            threading.setprofile(None)
+            sys.setprofile(None)
+            return
+        with lock:
+            thread_profilers.append(thread_profiler)
+
+    if per_thread:
+        threading.setprofile(profile_thread)
+    started = time.perf_counter()
+    profiler.enable()
+
+    def stop() -> Path:
+        profiler.disable()
+        if per_thread:
+            threading.setprofile(None)
+        wall = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        buffer = io.StringIO()
+        stats = pstats.Stats(profiler, stream=buffer)
+        with lock:
+            profiled = list(thread_profilers)
+        if profiled:
+            stats.add(*profiled)
+        stats.dump_stats(f"{output_path}.pstats")
+
+        buffer.write(f"wall time: {wall:.3f}s\n")
+        buffer.write(f"profiled threads: {len(profiled) + 1}\n" if per_thread else "profiled threads: all (one process-wide profiler)\n")
+        buffer.write(f"traced memory: current {current / 1024 / 1024:.1f} MiB, peak {peak / 1024 / 1024:.1f} MiB\n\n")
+        buffer.write(f"Top {top} functions by cumulative time (summed over threads)\n")
+        stats.sort_stats("cumulative").print_stats(top)
+        buffer.write(f"Top {top} allocation sites\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            buffer.write(f"  {stat}\n")
+        output_path.write_text(buffer.getvalue(), encoding="utf-8")
+        return output_path
+
+    return stop
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from utils.metadata_cache import MetadataCache
+
+
+class ReadinessTimeoutError(RuntimeError):
+    """Raised when a readiness check does not succeed before its deadline."""
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this PID exists; assumed alive where that cannot be told."""
+    if os.name != "posix":
+        # os.kill() would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class ReadinessGate:
+    """
+    Wait for a remote resource to become ready, sharing the result across processes.
+
+    Checks are retried with jittered exponential backoff until an overall
+    deadline. A successful check is recorded in the metadata cache for a
+    short time so back-to-back invocations skip the wait entirely, and a lock
+    file elects one process per key to call the endpoint while concurrent
+    invocations only watch for that record.
+
+    The lock file holds the leader's PID and its mtime is the leader's
+    heartbeat, refreshed while a check is in flight too. It is taken over
+    when that process is gone or the heartbeat is older than three backoff
+    steps, so a slow check is not mistaken for a crashed leader.
+    """
+
+    def __init__(
+        self,
+        cache: MetadataCache,
+        record_ttl: float = 30.0,
+        initial_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: Optional[float] = 900.0
+    ):
+        self.cache = cache
+        self.record_ttl = record_ttl
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def _lock_path(self, key: str) -> Path:
+        return self.cache.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.lock"
+
+    def _try_lock(self, key: str) -> bool:
+        """Become the process that polls ``key``; stale locks of crashed processes are taken over."""
+        lock_path = self._lock_path(key)
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            if self._is_stale(lock_path):
+                lock_path.unlink(missing_ok=True)
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            return True
+        except FileExistsError:
+            return False
+        except OSError:
+            # Without a writable cache every process simply polls on its own
+            return True
+
+    def _is_stale(self, lock_path: Path) -> bool:
+        """Whether the lock's holder is gone or has stopped refreshing its heartbeat."""
+        try:
+            heartbeat_age = time.time() - lock_path.stat().st_mtime
+            holder = lock_path.read_text(encoding="ascii", errors="replace").strip()
+        except FileNotFoundError:
+            return False
+        if heartbeat_age > self.max_delay * 3:
+            return True
+        # An empty lock is one whose holder has not written its PID yet
+        return holder.isdigit() and not _process_alive(int(holder))
+
+    async def _check_with_heartbeat(self, key: str, check: Callable[[], Awaitable[bool]]) -> bool:
+        """Run ``check`` while refreshing the lock, however long the check's retries and timeouts take."""
+        async def heartbeat() -> None:
+            while True:
+                self._touch_lock(key)
+                await asyncio.sleep(self.max_delay)
+
+        beat = asyncio.ensure_future(heartbeat())
+        try:
+            return await check()
+        finally:
+            beat.cancel()
+
+    def _touch_lock(self, key: str) -> None:
+        try:
+            os.utime(self._lock_path(key))
+        except OSError:
+            pass
+
+    def _release_lock(self, key: str) -> None:
+        self._lock_path(key).unlink(missing_ok=True)
+
+    async def wait(self, key: str, check: Callable[[], Awaitable[bool]], description: str = "resource") -> None:
+        """
+        Return once ``check`` succeeds or a fresh readiness record for ``key`` exists.
+
+        Raises:
+            ReadinessTimeoutError: If the deadline passes first
+        """
+        if self.cache.get(key):
+            return
+
+        started = time.monotonic()
+        delay = self.initial_delay
+        attempts = 0
+        is_leader = False
+        try:
+            while True:
+                if not is_leader:
+                    if attempts and self.cache.get(key):
+                        return
+                    is_leader = self._try_lock(key)
+                if is_leader:
+                    if await self._check_with_heartbeat(key, check):
+                        self.cache.set(key, True, self.record_ttl)
+                        return
+                attempts += 1
+
+                elapsed = time.monotonic() - started
+                if self.deadline is not None and elapsed >= self.deadline:
+                    raise ReadinessTimeoutError(
+                        f"{description} was not ready after {elapsed:.1f}s ({attempts} attempts); "
+                        f"increase --ready-timeout or try again later"
+                    )
+                sleep_for = random.uniform(delay / 2, delay)
+                if self.deadline is not None:
+                    sleep_for = min(sleep_for, max(0.0, self.deadline - elapsed))
+                await asyncio.sleep(sleep_for)
+                delay = min(self.max_delay, delay * 2)
+        finally:
+            if is_leader:
+                self._release_lock(key)
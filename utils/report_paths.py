@@ -33,6 +33,17 @@ class ReportPathManager:
         
         return self.base_dir / safe_project / "html" / "all.html"
     
+    def get_shard_report_path(self, project_name: str, shard_name: str) -> Path:
+        safe_project = self.sanitize_name(project_name)
+        safe_shard = self.sanitize_name(shard_name)
+        
+        return self.base_dir / safe_project / "html" / "shard" / f"{safe_shard}.html"
+    
+    def get_history_report_path(self, project_name: str) -> Path:
+        safe_project = self.sanitize_name(project_name)
+        
+        return self.base_dir / safe_project / "html" / "history.html"
+    
     def get_single_xml_path(self, project_name: str, test_title: str, batch_id: str = None) -> Path:
         safe_project = self.sanitize_name(project_name)
         safe_title = self.sanitize_name(test_title)
@@ -45,11 +56,30 @@ class ReportPathManager:
         
         return self.base_dir / safe_project / "junit" / "folder" / f"{safe_folder}.xml"
     
+    def get_shard_xml_path(self, project_name: str, shard_name: str) -> Path:
+        safe_project = self.sanitize_name(project_name)
+        safe_shard = self.sanitize_name(shard_name)
+        
+        return self.base_dir / safe_project / "junit" / "shard" / f"{safe_shard}.xml"
+    
     def get_all_reports_xml_path(self, project_name: str, batch_id: str = None) -> Path:
         safe_project = self.sanitize_name(project_name)
         
         return self.base_dir / safe_project / "junit" / "all.xml"
     
+    def get_combined_report_path(self, run_name: str = "run-many") -> Path:
+        safe_name = self.sanitize_name(run_name)
+        
+        return self.base_dir / "combined" / "html" / f"{safe_name}.html"
+    
+    def get_combined_xml_path(self, run_name: str = "run-many") -> Path:
+        safe_name = self.sanitize_name(run_name)
+        
+        return self.base_dir / "combined" / "junit" / f"{safe_name}.xml"
+    
+    def get_screenshot_dir(self) -> Path:
+        return self.base_dir / "assets" / "screenshots"
+    
     def ensure_report_dirs(self, project_name: str) -> None:
         safe_project = self.sanitize_name(project_name)
         (self.base_dir / safe_project / "html" / "single").mkdir(parents=True, exist_ok=True)
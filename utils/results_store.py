@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.batch_poller import TERMINAL_BATCH_STATUSES
+from utils.perf_stats import parse_timestamp, server_duration
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    batch_report_id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    status TEXT,
+    started REAL,
+    total_chats INTEGER,
+    total_passed INTEGER,
+    total_failed INTEGER,
+    complete INTEGER NOT NULL DEFAULT 0,
+    raw TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_by_project ON reports (project_id, started DESC);
+
+CREATE TABLE IF NOT EXISTS executions (
+    batch_report_id TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    title TEXT,
+    status TEXT,
+    duration REAL,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (batch_report_id, chat_id)
+);
+CREATE INDEX IF NOT EXISTS executions_by_chat ON executions (chat_id);
+
+CREATE TABLE IF NOT EXISTS report_aggregates (
+    batch_report_id TEXT PRIMARY KEY,
+    aggregate TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chat_fingerprints (
+    project_id TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    batch_report_id TEXT,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (project_id, chat_id)
+);
+
+CREATE TABLE IF NOT EXISTS batch_origins (
+    batch_report_id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    folder_id TEXT,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    project_id TEXT PRIMARY KEY,
+    cursor REAL,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+class ResultsStore:
+    """
+    Local SQLite store of batch reports and their executions.
+
+    Reports are kept as returned by the API, executions with their
+    screenshots already moved to the screenshot store. A report is marked
+    ``complete`` once it finished and all of its executions were stored;
+    complete reports never change again and are served from the store
+    instead of the API. A per-project sync cursor (start time of the oldest
+    report that still needs refreshing) lets ``sync`` stop paging as soon as
+    it reaches reports it already has. Per-test aggregates of complete
+    reports are kept alongside, so history reports only aggregate the
+    executions of reports they have not seen before. The script fingerprint
+    of each chat's latest run is recorded with its outcome for
+    ``--changed-only`` runs. The API does not say what started a batch, so
+    the origin (project, folder or single chat) of every batch this CLI
+    triggers is recorded too.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as db:
+            db.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads, and the async layer uses a pool
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    # -- writes -------------------------------------------------------------
+
+    def put_report(self, project_id: str, report: Dict[str, Any], executions: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """
+        Insert or replace a report and, when given, all of its executions.
+
+        The report is marked complete when it finished and its executions were given.
+        """
+        status = (report.get("status") or "").lower()
+        complete = executions is not None and status in TERMINAL_BATCH_STATUSES
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    report["batch_report_id"],
+                    project_id,
+                    status,
+                    parse_timestamp(report.get("timestamp_started")),
+                    report.get("total_chats"),
+                    report.get("total_passed"),
+                    report.get("total_failed"),
+                    int(complete),
+                    json.dumps(report, separators=(",", ":")),
+                    time.time(),
+                )
+            )
+            if executions is not None:
+                db.execute("DELETE FROM executions WHERE batch_report_id = ?", (report["batch_report_id"],))
+                db.execute("DELETE FROM report_aggregates WHERE batch_report_id = ?", (report["batch_report_id"],))
+                db.executemany(
+                    "INSERT OR REPLACE INTO executions VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            report["batch_report_id"],
+                            execution.get("chat_id", ""),
+                            execution.get("title", execution.get("chat_title")),
+                            (execution.get("status") or "").lower(),
+                            server_duration(execution),
+                            json.dumps(execution, separators=(",", ":")),
+                        )
+                        for execution in executions
+                    )
+                )
+
+    def delete_report(self, batch_report_id: str) -> None:
+        with self._connection() as db:
+            db.execute("DELETE FROM executions WHERE batch_report_id = ?", (batch_report_id,))
+            db.execute("DELETE FROM report_aggregates WHERE batch_report_id = ?", (batch_report_id,))
+            db.execute("DELETE FROM reports WHERE batch_report_id = ?", (batch_report_id,))
+            db.execute("DELETE FROM batch_origins WHERE batch_report_id = ?", (batch_report_id,))
+
+    def put_aggregate(self, batch_report_id: str, aggregate: Dict[str, Any]) -> None:
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO report_aggregates VALUES (?, ?)",
+                (batch_report_id, json.dumps(aggregate, separators=(",", ":")))
+            )
+
+    def put_fingerprints(self, project_id: str, outcomes: Iterable[Dict[str, Any]]) -> None:
+        """Record the script fingerprint and outcome (``chat_id``, ``fingerprint``, ``status``, ``batch_report_id``) of chats that ran."""
+        now = time.time()
+        with self._connection() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO chat_fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (project_id, o["chat_id"], o["fingerprint"], o["status"], o.get("batch_report_id"), now)
+                    for o in outcomes
+                )
+            )
+
+    def put_batch_origin(self, batch_report_id: str, project_id: str, kind: str, folder_id: Optional[str] = None) -> None:
+        """Record what started a batch: ``kind`` is "project", "folder" (with folder_id) or "chat"."""
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO batch_origins VALUES (?, ?, ?, ?, ?)",
+                (batch_report_id, project_id, kind, folder_id, time.time())
+            )
+
+    def set_cursor(self, project_id: str, cursor: Optional[float]) -> None:
+        with self._connection() as db:
+            db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (project_id, cursor, time.time()))
+
+    # -- reads --------------------------------------------------------------
+
+    def get_cursor(self, project_id: str) -> Optional[float]:
+        row = self._connection().execute("SELECT cursor FROM sync_state WHERE project_id = ?", (project_id,)).fetchone()
+        return row["cursor"] if row else None
+
+    def is_complete(self, batch_report_id: str) -> bool:
+        row = self._connection().execute("SELECT complete FROM reports WHERE batch_report_id = ?", (batch_report_id,)).fetchone()
+        return bool(row and row["complete"])
+
+    def get_report(self, batch_report_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT raw FROM reports WHERE batch_report_id = ?", (batch_report_id,)).fetchone()
+        return json.loads(row["raw"]) if row else None
+
+    def get_aggregate(self, batch_report_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT aggregate FROM report_aggregates WHERE batch_report_id = ?", (batch_report_id,)).fetchone()
+        return json.loads(row["aggregate"]) if row else None
+
+    def get_fingerprints(self, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """Recorded outcomes of a project's chats by chat ID."""
+        rows = self._connection().execute(
+            "SELECT chat_id, fingerprint, status, batch_report_id, recorded_at FROM chat_fingerprints WHERE project_id = ?",
+            (project_id,)
+        )
+        return {row["chat_id"]: dict(row) for row in rows}
+
+    def get_batch_origins(self, batch_report_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Recorded origins (``kind``, ``folder_id``) of the given batches by batch report ID; unknown ones are left out."""
+        ids = list(batch_report_ids)
+        origins: Dict[str, Dict[str, Any]] = {}
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._connection().execute(
+                f"SELECT batch_report_id, kind, folder_id FROM batch_origins WHERE batch_report_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            origins.update((row["batch_report_id"], {"kind": row["kind"], "folder_id": row["folder_id"]}) for row in rows)
+        return origins
+
+    def list_reports(self, project_id: str, limit: Optional[int] = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Stored reports of a project, newest first."""
+        rows = self._connection().execute(
+            "SELECT raw FROM reports WHERE project_id = ? ORDER BY started DESC LIMIT ? OFFSET ?",
+            (project_id, -1 if limit is None else limit, offset)
+        )
+        return [json.loads(row["raw"]) for row in rows]
+
+    def count_reports(self, project_id: str) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM reports WHERE project_id = ?", (project_id,)).fetchone()[0]
+
+    def list_executions(self, batch_report_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT raw FROM executions WHERE batch_report_id = ? ORDER BY rowid LIMIT ? OFFSET ?",
+            (batch_report_id, -1 if limit is None else limit, offset)
+        )
+        return [json.loads(row["raw"]) for row in rows]
+
+    def count_executions(self, batch_report_id: str) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM executions WHERE batch_report_id = ?", (batch_report_id,)).fetchone()[0]
+
+    def close(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
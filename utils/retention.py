@@ -0,0 +1,60 @@
+import re
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from utils.batch_poller import TERMINAL_BATCH_STATUSES
+from utils.perf_stats import parse_timestamp
+
+_AGE = re.compile(r"^(\d+(?:\.\d+)?)\s*([dhm])$")
+_AGE_SECONDS = {"d": 24 * 60 * 60, "h": 60 * 60, "m": 60}
+
+
+def parse_cutoff(value: str, now: Optional[float] = None) -> float:
+    """
+    Parse an ``--older-than`` value into epoch seconds.
+
+    Accepts an age such as ``30d``, ``12h`` or ``90m``, or an ISO 8601 date
+    or date-time (dates without an offset are taken as UTC).
+
+    Raises:
+        ValueError: When the value is neither
+    """
+    age = _AGE.match(value.strip().lower())
+    if age:
+        return (time.time() if now is None else now) - float(age.group(1)) * _AGE_SECONDS[age.group(2)]
+    cutoff = parse_timestamp(value.strip())
+    if cutoff is None:
+        raise ValueError(f"Invalid date or age '{value}', expected e.g. 30d, 12h or 2024-01-31")
+    return cutoff
+
+
+def select_for_pruning(
+    reports: Iterable[Dict[str, Any]],
+    keep_last: int = 0,
+    older_than: Optional[float] = None,
+    only_passed: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pick the reports a retention policy removes.
+
+    Args:
+        reports: A project's batch reports, newest first
+        keep_last: Never remove the newest ``keep_last`` reports
+        older_than: Only remove reports started before this epoch time
+        only_passed: Only remove reports without failed tests
+
+    Reports that are still running, or whose start time is unknown while
+    ``older_than`` is given, are always kept.
+    """
+    for index, report in enumerate(reports):
+        if index < keep_last:
+            continue
+        if (report.get("status") or "").lower() not in TERMINAL_BATCH_STATUSES:
+            continue
+        if older_than is not None:
+            started = parse_timestamp(report.get("timestamp_started"))
+            if started is None or started >= older_than:
+                continue
+        if only_passed and ((report.get("total_failed") or 0) > 0 or report["status"].lower() != "completed"):
+            continue
+        yield report
@@ -0,0 +1,72 @@
+import base64
+import binascii
+import hashlib
+from pathlib import Path
+from typing import Any, Dict
+
+from utils.atomic_write import write_atomically
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"GIF87a", ".gif", "image/gif"),
+    (b"GIF89a", ".gif", "image/gif"),
+)
+
+
+def _image_type(data: bytes) -> tuple:
+    for signature, extension, mime in _SIGNATURES:
+        if data.startswith(signature):
+            return extension, mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp", "image/webp"
+    return ".png", "image/png"
+
+
+class ScreenshotStore:
+    """
+    Content-addressed on-disk store for execution screenshots.
+
+    Base64 images are decoded once and written under their SHA-256 digest,
+    so the same screenshot seen in many executions or runs is stored once.
+    Execution records keep a small reference instead of the image data.
+    """
+
+    def __init__(self, base_dir: str | Path):
+        self.base_dir = Path(base_dir)
+
+    def put(self, b64: str) -> Dict[str, Any]:
+        """Store a base64 encoded image and return its reference."""
+        if "," in b64[:64] and b64.startswith("data:"):
+            b64 = b64.split(",", 1)[1]
+        data = base64.b64decode(b64)
+        digest = hashlib.sha256(data).hexdigest()
+        extension, mime = _image_type(data)
+        path = self.base_dir / digest[:2] / f"{digest}{extension}"
+        if not path.exists():
+            write_atomically(path, lambda handle: handle.write(data), binary=True)
+        return {"sha256": digest, "path": str(path), "mime": mime, "size": len(data)}
+
+    def spill(self, execution: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return a copy of an execution whose inline ``images[].b64`` payloads are replaced with store references.
+
+        The execution itself is left untouched: it may be the decoded
+        response the ETag cache holds for the next revalidation.
+        """
+        images = execution.get("images")
+        if not images:
+            return execution
+        spilled = []
+        for image in images:
+            b64 = image.get("b64") if isinstance(image, dict) else None
+            if not b64:
+                spilled.append(image)
+                continue
+            try:
+                reference = self.put(b64)
+            except (binascii.Error, ValueError):
+                spilled.append(image)
+                continue
+            spilled.append({**{k: v for k, v in image.items() if k != "b64"}, **reference})
+        return {**execution, "images": spilled}
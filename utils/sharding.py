@@ -0,0 +1,59 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from utils.perf_stats import percentile
+
+# Assumed duration of a test no past run has timing for, when nothing else is known
+DEFAULT_TEST_SECONDS = 60.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a ``--shard`` value ``i/N`` (1-based) into ``(i, N)``.
+
+    Raises:
+        ValueError: When the value is malformed or i is not within 1..N
+    """
+    index, _, total = value.strip().partition("/")
+    try:
+        shard, shards = int(index), int(total)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N such as 2/4") from None
+    if shards < 1 or not 1 <= shard <= shards:
+        raise ValueError(f"Invalid shard '{value}', i must be between 1 and N")
+    return shard, shards
+
+
+def balance_shards(chat_ids: List[str], expected: Optional[Dict[str, float]], shards: int) -> List[Dict[str, object]]:
+    """
+    Split tests into ``shards`` groups of similar total duration.
+
+    Longest-processing-time-first: tests are taken longest first and each
+    goes to the currently lightest shard. Tests without history count as
+    the median known duration. Ties are broken by chat ID and shard number,
+    so every node computes the same split from the same inputs, and the
+    shards are disjoint and together cover every test.
+
+    Returns:
+        One ``{"chat_ids", "expected_seconds"}`` entry per shard
+
+    Raises:
+        RuntimeError: When the split does not cover every test exactly once
+    """
+    expected = expected or {}
+    known = sorted(expected[chat_id] for chat_id in chat_ids if chat_id in expected)
+    default = percentile(known, 50) if known else DEFAULT_TEST_SECONDS
+    durations = {chat_id: expected.get(chat_id, default) for chat_id in set(chat_ids)}
+
+    result = [{"chat_ids": [], "expected_seconds": 0.0} for _ in range(shards)]
+    loads = [(0.0, index) for index in range(shards)]
+    for chat_id in sorted(durations, key=lambda c: (-durations[c], c)):
+        load, index = heapq.heappop(loads)
+        result[index]["chat_ids"].append(chat_id)
+        heapq.heappush(loads, (load + durations[chat_id], index))
+    for load, index in loads:
+        result[index]["expected_seconds"] = round(load, 3)
+    assigned = [chat_id for entry in result for chat_id in entry["chat_ids"]]
+    if len(assigned) != len(durations) or set(assigned) != set(durations):
+        raise RuntimeError("shards must be disjoint and cover every test")
+    return result
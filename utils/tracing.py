@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from utils.atomic_write import write_atomically
+
+
+class Tracer:
+    """
+    Collects timing spans and exports them as Chrome trace-event JSON.
+
+    The resulting file opens in chrome://tracing or https://ui.perfetto.dev.
+    Tracing is off by default; a disabled tracer only pays for a context
+    manager per span, so instrumentation can stay in hot paths.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._ids = count(1)
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._origin = time.perf_counter()
+
+    def _microseconds(self, instant: float) -> float:
+        return round((instant - self._origin) * 1_000_000, 1)
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        event["pid"] = os.getpid()
+        event["tid"] = thread.ident
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "cli", **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block as one complete event.
+
+        The yielded dict is recorded as the event's ``args``, so callers can
+        attach results (status codes, counts) that are only known at the end.
+        """
+        if not self.enabled:
+            yield args
+            return
+        started = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            finished = time.perf_counter()
+            self._record({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self._microseconds(started),
+                "dur": self._microseconds(finished) - self._microseconds(started),
+                "args": args,
+            })
+
+    @contextmanager
+    def async_span(self, name: str, category: str = "async", **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Like span(), but recorded as a begin/end pair with its own id.
+
+        Use this for work awaited on the event loop, where concurrent spans
+        overlap without nesting and would be drawn wrongly as complete events.
+        """
+        if not self.enabled:
+            yield args
+            return
+        span_id = next(self._ids)
+        self._record({"name": name, "cat": category, "ph": "b", "id": span_id, "ts": self._microseconds(time.perf_counter())})
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self._record({"name": name, "cat": category, "ph": "e", "id": span_id, "ts": self._microseconds(time.perf_counter()), "args": args})
+
+    def instant(self, name: str, category: str = "cli", **args: Any) -> None:
+        if self.enabled:
+            self._record({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self._microseconds(time.perf_counter()), "args": args})
+
+    def export(self, output_path: str | Path) -> Path:
+        """Write every recorded event to ``output_path`` in the Chrome trace-event format."""
+        output_path = Path(output_path)
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        return write_atomically(
+            output_path,
+            lambda out: json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, out, default=str)
+        )
+
+
+# Process-wide tracer, enabled by the global --trace option
+tracer = Tracer()